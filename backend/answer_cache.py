@@ -0,0 +1,189 @@
+"""Answer cache for the AI tutor keyed on (topic_id, normalized question)
+
+A question is answered from the cache when its normalized form matches a
+stored question on the same topic exactly, or when the cosine similarity of
+their local embeddings is at least `similarity_threshold`. Embeddings are
+hashed word/bigram/character-trigram vectors, so no model or network
+call is needed to compare questions. A single "not" barely moves such a
+vector, so questions only count as near-duplicates when they also carry the
+same negation words.
+"""
+import hashlib
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set, Tuple
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that change the phrasing of a question but not what is being asked
+FILLER_WORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "what", "whats", "please", "can", "could", "you",
+    "me", "tell", "explain", "describe", "about", "do", "does", "of", "to", "i", "would", "like",
+}
+
+# Words that flip what is being asked; "isn't" normalizes to "isn t", hence "t"
+NEGATION_WORDS = {
+    "not", "no", "never", "without", "none", "nor", "neither", "nothing", "cannot", "t",
+    "dont", "doesnt", "isnt", "arent", "wasnt", "werent", "cant", "wont", "didnt", "shouldnt",
+}
+
+EMBEDDING_DIMENSIONS = 1024
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return " ".join(WORD_RE.findall(question.lower()))
+
+
+def negations(normalized: str) -> frozenset:
+    """Negation words in a normalized question; contractions and cannot count as not"""
+    return frozenset(
+        word if word in {"no", "never", "without", "none", "nor", "neither", "nothing"} else "not"
+        for word in normalized.split()
+        if word in NEGATION_WORDS
+    )
+
+
+def _bucket(feature: str) -> int:
+    digest = hashlib.blake2b(feature.encode(), digest_size=4).digest()
+    return int.from_bytes(digest, "big") % EMBEDDING_DIMENSIONS
+
+
+def embed(normalized: str) -> Dict[int, float]:
+    """Sparse, L2-normalized hashed embedding of a normalized question"""
+    words = [word for word in normalized.split() if word not in FILLER_WORDS] or normalized.split()
+    features = []
+    features.extend(f"w:{word}" for word in words)
+    features.extend(f"n:{word}" for word in negations(normalized))
+    features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    for word in words:
+        padded = f"#{word}#"
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+    vector: Dict[int, float] = {}
+    for feature in features:
+        bucket = _bucket(feature)
+        vector[bucket] = vector.get(bucket, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    if norm:
+        for bucket in vector:
+            vector[bucket] /= norm
+    return vector
+
+
+def cosine(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(bucket, 0.0) for bucket, value in a.items())
+
+
+@dataclass
+class CachedAnswer:
+    answer: str
+    topic_title: Optional[str]
+    embedding: Dict[int, float] = field(repr=False)
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class AnswerCache:
+    """Bounded LRU of tutor answers with exact and near-duplicate lookup per topic"""
+
+    def __init__(self, max_entries: int = 5000, similarity_threshold: float = 0.9, ttl_seconds: float = 86400.0):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], CachedAnswer]" = OrderedDict()
+        self._by_topic: Dict[str, Set[str]] = {}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _topic_key(topic_id: Optional[str]) -> str:
+        return topic_id or ""
+
+    def _drop(self, key: Tuple[str, str]):
+        self._entries.pop(key, None)
+        questions = self._by_topic.get(key[0])
+        if questions is not None:
+            questions.discard(key[1])
+            if not questions:
+                del self._by_topic[key[0]]
+
+    def _fresh(self, entry: CachedAnswer) -> bool:
+        return time.monotonic() - entry.created_at < self.ttl_seconds
+
+    def get(self, topic_id: Optional[str], question: str) -> Optional[CachedAnswer]:
+        """Cached answer for an identical or near-identical question on the same topic"""
+        topic_key = self._topic_key(topic_id)
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+
+        key = (topic_key, normalized)
+        entry = self._entries.get(key)
+        if entry is not None and self._fresh(entry):
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry
+
+        embedding = embed(normalized)
+        negated = negations(normalized)
+        best_key, best_score = None, self.similarity_threshold
+        for other in self._by_topic.get(topic_key, ()):
+            if negations(other) != negated:
+                continue
+            candidate = self._entries[(topic_key, other)]
+            if not self._fresh(candidate):
+                continue
+            score = cosine(embedding, candidate.embedding)
+            if score >= best_score:
+                best_key, best_score = (topic_key, other), score
+        if best_key is not None:
+            self._entries.move_to_end(best_key)
+            self.similar_hits += 1
+            return self._entries[best_key]
+
+        self.misses += 1
+        return None
+
+    def put(self, topic_id: Optional[str], question: str, answer: str, topic_title: Optional[str] = None):
+        topic_key = self._topic_key(topic_id)
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        key = (topic_key, normalized)
+        self._entries[key] = CachedAnswer(answer=answer, topic_title=topic_title, embedding=embed(normalized))
+        self._entries.move_to_end(key)
+        self._by_topic.setdefault(topic_key, set()).add(normalized)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def invalidate_topic(self, topic_id: Optional[str]):
+        """Forget every answer for a topic, e.g. after its content changed"""
+        topic_key = self._topic_key(topic_id)
+        for normalized in list(self._by_topic.get(topic_key, ())):
+            self._drop((topic_key, normalized))
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "similarity_threshold": self.similarity_threshold,
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
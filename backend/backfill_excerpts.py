@@ -0,0 +1,60 @@
+"""One-off migration: store list-view excerpts on topics written before the field existed
+
+Run ``python backfill_excerpts.py`` once per database, after
+``python db_indexes.py --ensure``. Topics written since the excerpt field was
+added get it from the PsychologyTopic model, so the API does not run this on
+startup. Re-running it is safe; it only touches topics still missing an excerpt.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+# Length of the plain-text teaser stored with each topic for list views
+EXCERPT_LENGTH = 120
+
+# Topics without an excerpt; has no index, so it reads the whole collection
+MISSING_EXCERPT = {"excerpt": {"$exists": False}}
+
+
+def make_excerpt(content: str) -> str:
+    """Collapse whitespace and cut the content down to a short teaser"""
+    return " ".join(content.split())[:EXCERPT_LENGTH]
+
+
+async def backfill_excerpts(collection, batch_size: int = 500) -> int:
+    """Set the excerpt on every topic missing one, one bulk_write per batch; returns the count"""
+    updated = 0
+    operations = []
+    async for topic in collection.find(MISSING_EXCERPT, {"_id": 0, "id": 1, "content": 1}):
+        operations.append(UpdateOne({"id": topic["id"]}, {"$set": {"excerpt": make_excerpt(topic.get("content", ""))}}))
+        if len(operations) == batch_size:
+            updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+            operations = []
+    if operations:
+        updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+    return updated
+
+
+async def _main(args) -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        updated = await backfill_excerpts(db.psychology_topics, args.batch_size)
+        print(f"Backfilled excerpts for {updated} topics")
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store list-view excerpts on topics that lack one")
+    parser.add_argument("--batch-size", type=int, default=500, help="updates per bulk_write (default 500)")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,163 @@
+"""Write-behind persistence for chat messages
+
+Request handlers enqueue ChatMessage documents and return immediately; a
+background task writes them with unordered `insert_many`, flushing when a
+batch is full or when the oldest queued message has waited `flush_interval`
+seconds. A full queue makes `put()` wait (backpressure) instead of growing
+without bound. `pending(session_id)` returns a session's messages that are
+queued or mid-write, for readers that must see them before they reach MongoDB.
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ChatWriteBehind:
+    """Bounded async queue that batches chat message inserts"""
+
+    def __init__(self, collection, max_queue: int = 10000, batch_size: int = 100, flush_interval: float = 0.5):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self.enqueued = 0
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.backpressure_waits = 0
+        # Queued or mid-write documents, so flush() can tell whether anything is outstanding
+        self._pending = 0
+        # session_id -> queued or mid-write documents by id
+        self._by_session: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, document: Dict[str, Any]):
+        """Queue a document for insertion, waiting if the queue is full"""
+        if not self.running:
+            # No writer (e.g. outside the app lifespan): write synchronously
+            await self.collection.insert_one(document)
+            self.written += 1
+            return
+        if self._queue.full():
+            self.backpressure_waits += 1
+        self._pending += 1
+        self._by_session.setdefault(document.get("session_id"), {})[document.get("id")] = document
+        await self._queue.put(document)
+        self.enqueued += 1
+
+    def pending(self, session_id: str) -> List[Dict[str, Any]]:
+        """A session's documents that are queued or being written, oldest first"""
+        return list(self._by_session.get(session_id, {}).values())
+
+    async def flush(self):
+        """Wait until everything queued so far has been written"""
+        if not self.running or not self._pending:
+            return
+        done = asyncio.Event()
+        await self._queue.put(done)
+        await done.wait()
+
+    async def stop(self):
+        """Write everything still queued, then stop the background task"""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            batch: List[Dict[str, Any]] = []
+            waiters: List[asyncio.Event] = []
+            deadline = loop.time() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, asyncio.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stopping or waiters or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                    continue
+                except asyncio.QueueEmpty:
+                    pass
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            if stopping:
+                # Drain whatever was queued behind the stop marker
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if isinstance(item, asyncio.Event):
+                        waiters.append(item)
+                    elif item is not _STOP:
+                        batch.append(item)
+            await self._write(batch)
+            for waiter in waiters:
+                waiter.set()
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        for start in range(0, len(batch), self.batch_size):
+            chunk = batch[start:start + self.batch_size]
+            inserted = 0
+            try:
+                await self.collection.insert_many(chunk, ordered=False)
+                inserted = len(chunk)
+            except BulkWriteError as e:
+                # With ordered=False the rest of the chunk was still attempted
+                inserted = e.details.get("nInserted", 0)
+                logger.error(f"Error writing chat messages: {e}")
+            except Exception as e:
+                logger.error(f"Error writing chat messages: {e}")
+            self.written += inserted
+            self.failed += len(chunk) - inserted
+            self.batches += 1
+            self._pending -= len(chunk)
+            for document in chunk:
+                self._forget(document)
+
+    def _forget(self, document: Dict[str, Any]):
+        documents = self._by_session.get(document.get("session_id"))
+        if documents is not None:
+            documents.pop(document.get("id"), None)
+            if not documents:
+                del self._by_session[document.get("session_id")]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "backpressure_waits": self.backpressure_waits,
+        }
@@ -0,0 +1,249 @@
+"""Token-budgeted multi-turn memory for tutor sessions
+
+Each turn's prompt carries the session's recent question/answer pairs and a
+rolling summary of the turns before them. When the rendered memory would go
+over the token budget, the oldest turns are folded into the summary. The
+summary is persisted to `chat_summaries`, so a restarted worker (or another
+worker) picks it up instead of re-summarizing; a summary only replaces one that
+covers fewer turns. Sessions are cached in-process as an LRU and loaded from
+MongoDB on a miss. A cache hit still reads the turns stored after the newest
+cached one, so turns answered by other workers are not lost.
+"""
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pymongo.errors import DuplicateKeyError
+
+from pagination import after_keyset
+from passages import CHARS_PER_TOKEN, estimate_tokens
+
+SUMMARY_COLLECTION = "chat_summaries"
+
+# Chat messages are read newest first when loading a session's recent turns
+RECENT_SORT = [("created_at", -1), ("id", -1)]
+CHAT_SORT = [("created_at", 1), ("id", 1)]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+@dataclass
+class Turn:
+    question: str
+    answer: str
+    created_at: datetime
+    id: str
+
+    def render(self) -> str:
+        return f"Student: {self.question}\nTutor: {self.answer}"
+
+
+@dataclass
+class SessionMemory:
+    summary: str = ""
+    summarized_turns: int = 0
+    # (created_at, id) of the newest message folded into the summary
+    summarized_through: Optional[list] = None
+    turns: List[Turn] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        return not self.turns and not self.summary
+
+    def render_summary(self) -> str:
+        return f"Summary of earlier conversation:\n{self.summary}" if self.summary else ""
+
+    def render_turns(self) -> str:
+        return "Recent conversation:\n" + "\n\n".join(turn.render() for turn in self.turns) if self.turns else ""
+
+    def render(self) -> str:
+        """Memory block for the prompt: the summary, then the recent turns verbatim"""
+        return "\n\n".join(filter(None, [self.render_summary(), self.render_turns()]))
+
+    def last_seen(self) -> Optional[list]:
+        """(created_at, id) of the newest message this memory covers, if any"""
+        if self.turns:
+            return [self.turns[-1].created_at, self.turns[-1].id]
+        return self.summarized_through
+
+
+def summarize_turn(turn: Turn, max_chars: int = 200) -> str:
+    """One summary line for a turn: the question and the gist of the answer"""
+    answer = " ".join(turn.answer.split())
+    gist = _SENTENCE_END.split(answer, 1)[0]
+    line = f"- Asked: {' '.join(turn.question.split())} / Answer: {gist}"
+    return line if len(line) <= max_chars else line[:max_chars - 3] + "..."
+
+
+class ConversationMemory:
+    """LRU of session memories, compacted to a token budget and backed by MongoDB"""
+
+    def __init__(
+        self,
+        messages,
+        summaries,
+        max_sessions: int = 10000,
+        token_budget: int = 600,
+        summary_token_budget: int = 200,
+        min_recent_turns: int = 2,
+        load_turns: int = 20,
+        pending: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+    ):
+        self.messages = messages
+        self.summaries = summaries
+        self.max_sessions = max_sessions
+        self.token_budget = token_budget
+        self.summary_token_budget = summary_token_budget
+        self.min_recent_turns = min_recent_turns
+        self.load_turns = load_turns
+        # Returns a session's messages not yet in chat_messages, e.g. from a write-behind queue
+        self.pending = pending
+        self._sessions: "OrderedDict[str, SessionMemory]" = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+        self.evicted = 0
+        self.compactions = 0
+        self.caught_up_turns = 0
+        self.stale_summaries = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _remember(self, session_id: str, memory: SessionMemory):
+        self._sessions[session_id] = memory
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+
+    async def load(self, session_id: str, new_session: bool = False) -> SessionMemory:
+        """Memory for a session; new_session skips the database for sessions known to have no history"""
+        memory = self._sessions.get(session_id)
+        if memory is not None:
+            self._sessions.move_to_end(session_id)
+            self.hits += 1
+            # Catch up with turns other workers answered since this one last saw the session
+            newer = await self._turns_after(session_id, memory.last_seen(), {turn.id for turn in memory.turns})
+            if newer:
+                memory.turns.extend(newer)
+                self.caught_up_turns += len(newer)
+                if self.compact(memory):
+                    await self._persist(session_id, memory)
+            return memory
+        memory = SessionMemory()
+        if not new_session:
+            memory = await self._load_from_db(session_id)
+            self.loads += 1
+            if self.compact(memory):
+                await self._persist(session_id, memory)
+        self._remember(session_id, memory)
+        return memory
+
+    async def _load_from_db(self, session_id: str) -> SessionMemory:
+        memory = SessionMemory()
+        saved = await self.summaries.find_one({"session_id": session_id}, {"_id": 0})
+        if saved:
+            memory.summary = saved.get("summary", "")
+            memory.summarized_turns = saved.get("summarized_turns", 0)
+            memory.summarized_through = saved.get("summarized_through")
+        memory.turns = await self._turns_after(session_id, memory.summarized_through)
+        return memory
+
+    async def _turns_after(self, session_id: str, after: Optional[list], known: Set[str] = frozenset()) -> List[Turn]:
+        """The session's most recent turns after the (created_at, id) key, stored or still pending"""
+        messages = await self.messages.find(
+            after_keyset({"session_id": session_id}, CHAT_SORT, after),
+            {"_id": 0, "id": 1, "question": 1, "answer": 1, "created_at": 1},
+        ).sort(RECENT_SORT).limit(self.load_turns).to_list(self.load_turns)
+        by_id = {message["id"]: message for message in messages}
+        for message in self.pending(session_id) if self.pending is not None else []:
+            if after is None or (message["created_at"], message["id"]) > tuple(after):
+                by_id.setdefault(message["id"], message)
+        ordered = sorted(
+            (message for message in by_id.values() if message["id"] not in known),
+            key=lambda message: (message["created_at"], message["id"]),
+        )[-self.load_turns:]
+        return [Turn(message["question"], message["answer"], message["created_at"], message["id"]) for message in ordered]
+
+    async def append(self, session_id: str, message: Dict[str, Any]):
+        """Add an answered turn to a cached session, compacting and persisting the summary if needed"""
+        memory = self._sessions.get(session_id)
+        if memory is None:
+            # Not cached (or evicted); the next load reads the turn back from MongoDB
+            return
+        memory.turns.append(Turn(message["question"], message["answer"], message["created_at"], message["id"]))
+        if self.compact(memory):
+            await self._persist(session_id, memory)
+
+    def compact(self, memory: SessionMemory) -> bool:
+        """Fold the oldest turns into the summary until the memory fits the token budget"""
+        folded = 0
+        while (
+            len(memory.turns) > self.min_recent_turns
+            and estimate_tokens(memory.render()) > self.token_budget
+        ):
+            turn = memory.turns.pop(0)
+            memory.summary = self._trim_summary("\n".join(filter(None, [memory.summary, summarize_turn(turn)])))
+            memory.summarized_through = [turn.created_at, turn.id]
+            memory.summarized_turns += 1
+            folded += 1
+        if folded:
+            self.compactions += 1
+        return bool(folded)
+
+    def render(self, memory: SessionMemory) -> str:
+        """Prompt block for a session's memory, cut to the token budget"""
+        summary, turns = memory.render_summary(), memory.render_turns()
+        # Only the kept recent turns can still be over budget; the newest text matters most
+        room = max(0, self.token_budget * CHARS_PER_TOKEN - len(summary))
+        if len(turns) > room:
+            turns = "..." + turns[-room:] if room else ""
+        return "\n\n".join(filter(None, [summary, turns]))
+
+    def _trim_summary(self, summary: str) -> str:
+        # Rolling: the oldest summary lines go first once the summary itself is over budget
+        lines = summary.split("\n")
+        max_chars = self.summary_token_budget * CHARS_PER_TOKEN
+        while len(lines) > 1 and len("\n".join(lines)) > max_chars:
+            lines.pop(0)
+        return "\n".join(lines)[-max_chars:]
+
+    async def _persist(self, session_id: str, memory: SessionMemory):
+        """Save the summary unless another worker has already saved one that covers more turns"""
+        at, message_id = memory.summarized_through
+        try:
+            await self.summaries.update_one(
+                {"session_id": session_id, "$or": [
+                    {"summarized_through": None},
+                    {"summarized_through.0": {"$lt": at}},
+                    {"summarized_through.0": at, "summarized_through.1": {"$lt": message_id}},
+                ]},
+                {"$set": {
+                    "summary": memory.summary,
+                    "summarized_turns": memory.summarized_turns,
+                    "summarized_through": memory.summarized_through,
+                    "updated_at": datetime.utcnow(),
+                }},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # The stored summary is newer; drop this view so the next load reads it
+            self.stale_summaries += 1
+            self.discard(session_id)
+
+    def discard(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "token_budget": self.token_budget,
+            "hits": self.hits,
+            "loads": self.loads,
+            "evicted": self.evicted,
+            "compactions": self.compactions,
+            "caught_up_turns": self.caught_up_turns,
+            "stale_summaries": self.stale_summaries,
+        }
@@ -0,0 +1,272 @@
+"""Declarative MongoDB index registry, startup verification and query-plan benchmark
+
+Run ``python db_indexes.py --check`` to list missing or extra indexes, or
+``python db_indexes.py --explain`` to explain every query the API routes issue
+and exit non-zero if any winning plan falls back to a COLLSCAN.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, IndexModel, TEXT
+
+from backfill_excerpts import MISSING_EXCERPT
+from pagination import keyset_condition
+from conversation_memory import SUMMARY_COLLECTION
+from platform_stats import STATS_COLLECTION, STATS_ID, STATS_PIPELINE
+
+
+# Index registry: collection name -> indexes that collection must have
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "psychology_topics": [
+        # get_topic, ask_question and search result hydration look topics up by id
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Category / difficulty filters and distinct("category")
+        IndexModel([("category", ASCENDING), ("difficulty_level", ASCENDING)], name="category_difficulty"),
+        # Keyset-paginated listing sorted by (created_at, id), with and without a difficulty filter
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_id"),
+        IndexModel(
+            [("difficulty_level", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="difficulty_created_id",
+        ),
+        # distinct("subcategory")
+        IndexModel([("subcategory", ASCENDING)], name="subcategory"),
+        # Workers poll for topics changed since their last poll (topic_sync.py)
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+        # Startup seeding looks seed topics up by slug; user-created topics have none
+        IndexModel(
+            [("seed_slug", ASCENDING)],
+            name="seed_slug_unique",
+            unique=True,
+            # Sparse: topics without a slug are left out of the index, so they never collide
+            sparse=True,
+        ),
+        IndexModel(
+            [
+                ("title", TEXT),
+                ("key_concepts", TEXT),
+                ("psychologists", TEXT),
+                ("experiments", TEXT),
+                ("content", TEXT),
+            ],
+            name="topic_text",
+            weights={"title": 10, "key_concepts": 5, "psychologists": 5, "experiments": 3, "content": 1},
+        ),
+    ],
+    "chat_messages": [
+        # get_chat_history: find({"session_id"}) sorted and paginated by (created_at, id)
+        IndexModel(
+            [("session_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="session_created_id",
+        ),
+    ],
+    SUMMARY_COLLECTION: [
+        # Conversation memory loads a session's rolling summary by session_id
+        IndexModel([("session_id", ASCENDING)], name="session_id_unique", unique=True),
+    ],
+}
+
+
+@dataclass
+class RouteQuery:
+    """A query issued by an API route, described as a database command to explain"""
+    route: str
+    command: Dict[str, Any]
+    # Some queries read the whole collection by design; a COLLSCAN there is expected
+    allow_collscan: bool = False
+
+
+def _find(collection: str, filter_: dict, sort: Optional[dict] = None, limit: int = 0) -> Dict[str, Any]:
+    command: Dict[str, Any] = {"find": collection, "filter": filter_}
+    if sort:
+        command["sort"] = sort
+    if limit:
+        command["limit"] = limit
+    return command
+
+
+def _distinct(collection: str, key: str) -> Dict[str, Any]:
+    return {"distinct": collection, "key": key, "query": {}}
+
+
+def _aggregate(collection: str, pipeline: List[dict]) -> Dict[str, Any]:
+    return {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+
+
+def route_queries(sample_id: str = "sample-id", sample_session: str = "sample-session") -> List[RouteQuery]:
+    """Every query the API routes issue, with representative arguments"""
+    topics = "psychology_topics"
+    topic_sort = {"created_at": 1, "id": 1}
+    after = keyset_condition([("created_at", 1), ("id", 1)], [datetime(2024, 1, 1), sample_id])
+    category = {"category": {"$regex": "Cognitive", "$options": "i"}}
+    difficulty = {"difficulty_level": "introductory"}
+    return [
+        RouteQuery("GET /api/topics", _find(topics, {}, sort=topic_sort, limit=51)),
+        RouteQuery("GET /api/topics?cursor=", _find(topics, after, sort=topic_sort, limit=51)),
+        RouteQuery("GET /api/topics?category=", _find(topics, category, sort=topic_sort, limit=51)),
+        RouteQuery("GET /api/topics?difficulty_level=", _find(topics, difficulty, sort=topic_sort, limit=51)),
+        RouteQuery(
+            "GET /api/topics?difficulty_level=&cursor=",
+            _find(topics, {"$and": [difficulty, after]}, sort=topic_sort, limit=51),
+        ),
+        RouteQuery(
+            "GET /api/topics?category=&difficulty_level=",
+            _find(topics, {**category, **difficulty}, sort=topic_sort, limit=51),
+        ),
+        RouteQuery("GET /api/topics/{topic_id}", _find(topics, {"id": sample_id}, limit=1)),
+        RouteQuery("GET /api/topics/{topic_id}/related (graph miss)", _find(topics, {"id": sample_id}, limit=1)),
+        RouteQuery("GET /api/search (hydrate)", _find(topics, {"id": {"$in": [sample_id]}})),
+        RouteQuery("GET /api/categories (category)", _distinct(topics, "category")),
+        RouteQuery("GET /api/categories (subcategory)", _distinct(topics, "subcategory")),
+        RouteQuery("GET /api/stats", _find(STATS_COLLECTION, {"_id": STATS_ID}, limit=1)),
+        # One-off migration script; it has to find every topic still missing an excerpt
+        RouteQuery("backfill_excerpts.py", _find(topics, MISSING_EXCERPT), allow_collscan=True),
+        RouteQuery("topic sync poll", _find(topics, {"updated_at": {"$gte": datetime(2024, 1, 1)}})),
+        RouteQuery("topic sync fetch", _find(topics, {"id": {"$in": [sample_id]}}, sort={"updated_at": 1})),
+        RouteQuery("startup seeding", _find(topics, {"seed_slug": {"$in": ["classical-conditioning"]}})),
+        # Counting every topic has to read every topic; this only runs on recompute
+        RouteQuery("POST /api/admin/stats/recompute", _aggregate(topics, STATS_PIPELINE), allow_collscan=True),
+        RouteQuery("POST /api/ask (topic)", _find(topics, {"id": sample_id}, limit=1)),
+        RouteQuery(
+            "GET /api/chat-history/{session_id}",
+            _find("chat_messages", {"session_id": sample_session}, sort={"created_at": 1, "id": 1}, limit=101),
+        ),
+        RouteQuery(
+            "GET /api/chat-history/{session_id}?cursor=",
+            _find(
+                "chat_messages",
+                {"$and": [
+                    {"session_id": sample_session},
+                    keyset_condition([("created_at", 1), ("id", 1)], [datetime(2024, 1, 1), sample_id]),
+                ]},
+                sort={"created_at": 1, "id": 1},
+                limit=101,
+            ),
+        ),
+        RouteQuery("POST /api/ask/batch (checkpoint)", _find("chat_messages", {"session_id": sample_session})),
+        RouteQuery("POST /api/ask (memory summary)", _find(SUMMARY_COLLECTION, {"session_id": sample_session}, limit=1)),
+        RouteQuery(
+            "POST /api/ask (memory turns)",
+            _find(
+                "chat_messages",
+                {"$and": [
+                    {"session_id": sample_session},
+                    keyset_condition([("created_at", 1), ("id", 1)], [datetime(2024, 1, 1), sample_id]),
+                ]},
+                sort={"created_at": -1, "id": -1},
+                limit=20,
+            ),
+        ),
+    ]
+
+
+def _index_name(model: IndexModel) -> str:
+    return model.document["name"]
+
+
+async def ensure_indexes(db) -> None:
+    """Create every registered index (a no-op for indexes that already exist)"""
+    for collection, models in INDEX_REGISTRY.items():
+        await db[collection].create_indexes(models)
+
+
+async def verify_indexes(db) -> Dict[str, Dict[str, List[str]]]:
+    """Compare live indexes with the registry; returns missing and extra index names per collection"""
+    report = {}
+    for collection, models in INDEX_REGISTRY.items():
+        expected = {_index_name(model) for model in models}
+        existing = set((await db[collection].index_information()).keys()) - {"_id_"}
+        report[collection] = {
+            "missing": sorted(expected - existing),
+            "extra": sorted(existing - expected),
+        }
+    return report
+
+
+def _winning_plans(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from _winning_plans(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _winning_plans(item)
+
+
+def _stages(node):
+    if isinstance(node, dict):
+        if "stage" in node:
+            yield node["stage"]
+        for value in node.values():
+            yield from _stages(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _stages(item)
+
+
+def plan_stages(explain_output: dict) -> List[str]:
+    """All stage names found in the winning plan(s) of an explain() result"""
+    return [stage for plan in _winning_plans(explain_output) for stage in _stages(plan)]
+
+
+async def explain_route_queries(db) -> List[Dict[str, Any]]:
+    """Explain every route query; each result records its winning plan stages and whether it is acceptable"""
+    sample = await db.psychology_topics.find_one({}, {"id": 1})
+    queries = route_queries(sample_id=sample["id"]) if sample else route_queries()
+    results = []
+    for query in queries:
+        explain_output = await db.command({"explain": query.command, "verbosity": "queryPlanner"})
+        stages = plan_stages(explain_output)
+        collscan = "COLLSCAN" in stages
+        results.append({
+            "route": query.route,
+            "stages": stages,
+            "collscan": collscan,
+            "ok": query.allow_collscan or not collscan,
+        })
+    return results
+
+
+async def _main(args) -> int:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    exit_code = 0
+    try:
+        if args.ensure:
+            await ensure_indexes(db)
+        if args.check or args.ensure:
+            for collection, report in (await verify_indexes(db)).items():
+                print(f"{collection}: missing={report['missing']} extra={report['extra']}")
+                if report["missing"]:
+                    exit_code = 1
+        if args.explain:
+            for result in await explain_route_queries(db):
+                status = "OK" if result["ok"] else "FAIL"
+                print(f"[{status}] {result['route']}: {' > '.join(result['stages'])}")
+                if not result["ok"]:
+                    exit_code = 1
+    finally:
+        client.close()
+    return exit_code
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage and verify PsychLearn MongoDB indexes")
+    parser.add_argument("--ensure", action="store_true", help="create missing indexes")
+    parser.add_argument("--check", action="store_true", help="report missing and extra indexes")
+    parser.add_argument("--explain", action="store_true", help="fail if any route query plans a COLLSCAN")
+    parsed = parser.parse_args()
+    if not (parsed.ensure or parsed.check or parsed.explain):
+        parsed.check = True
+    sys.exit(asyncio.run(_main(parsed)))
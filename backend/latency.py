@@ -0,0 +1,50 @@
+"""Rolling latency samples with percentile summaries"""
+import math
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+
+def percentile(sorted_values, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def summarize(values: Iterable[float]) -> Dict[str, Optional[float]]:
+    """Count and p50/p95/p99/max of a set of samples, in milliseconds"""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50_ms": _ms(percentile(ordered, 0.50)),
+        "p95_ms": _ms(percentile(ordered, 0.95)),
+        "p99_ms": _ms(percentile(ordered, 0.99)),
+        "max_ms": _ms(ordered[-1] if ordered else None),
+    }
+
+
+class StreamLatency:
+    """Time-to-first-token and total time for the most recent streamed responses"""
+
+    def __init__(self, window: int = 1000):
+        self.first_token: Deque[float] = deque(maxlen=window)
+        self.total: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+
+    def record(self, first_token_seconds: Optional[float], total_seconds: float):
+        self.requests += 1
+        if first_token_seconds is not None:
+            self.first_token.append(first_token_seconds)
+        self.total.append(total_seconds)
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "requests": self.requests,
+            "time_to_first_token": summarize(self.first_token),
+            "total_time": summarize(self.total),
+        }
@@ -0,0 +1,188 @@
+"""Pluggable LLM providers for the AI tutor
+
+`LLM_PROVIDER` selects the implementation:
+
+- ``gemini`` (default): Gemini through emergentintegrations' LlmChat
+- ``stub``: a deterministic local provider for offline and load testing, with
+  configurable latency distribution, token streaming and failure injection
+
+Every provider hands out chat objects with the same two coroutines:
+``send(text) -> str`` and ``stream(text) -> AsyncIterator[str]``. Chat objects
+hold the session's system message but no conversation history; callers put
+any history they want the model to see into the prompt.
+"""
+import asyncio
+import os
+import random
+import re
+from typing import AsyncIterator, Dict, Optional
+
+
+class LLMProviderError(Exception):
+    """Raised by a provider when a model call fails"""
+
+
+class GeminiChat:
+    """Adapter from emergentintegrations' LlmChat to the provider chat interface
+
+    LlmChat keeps every message it has sent, so each call gets a fresh one: the
+    conversation history the model sees is only what the caller puts in the
+    prompt, which keeps prompt size under the caller's control. A reused
+    LlmChat would resend its whole history on every turn, so there is no
+    per-session object worth pooling.
+    """
+
+    def __init__(self, chat_factory, user_message_class):
+        self._chat_factory = chat_factory
+        self._user_message = user_message_class
+
+    async def send(self, text: str) -> str:
+        return await self._chat_factory().send_message(self._user_message(text=text))
+
+    async def stream(self, text: str) -> AsyncIterator[str]:
+        chat = self._chat_factory()
+        # LlmChat has no streaming API today; use it if a later release adds one
+        stream_message = getattr(chat, "stream_message", None)
+        if stream_message is None:
+            yield await chat.send_message(self._user_message(text=text))
+            return
+        async for chunk in stream_message(self._user_message(text=text)):
+            if chunk:
+                yield chunk
+
+
+class GeminiProvider:
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str], model: str = "gemini-2.0-flash", max_tokens: int = 1000):
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+        self._llm_chat = LlmChat
+        self._user_message = UserMessage
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def create_chat(self, session_id: str, system_message: str) -> GeminiChat:
+        def new_chat():
+            return self._llm_chat(
+                api_key=self.api_key,
+                session_id=session_id,
+                system_message=system_message
+            ).with_model("gemini", self.model).with_max_tokens(self.max_tokens)
+        return GeminiChat(new_chat, self._user_message)
+
+
+class LatencyModel:
+    """Samples stub response latency in seconds from a configured distribution"""
+
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, distribution: str = "fixed", mean_ms: float = 50.0, spread_ms: float = 0.0,
+                 rng: Optional[random.Random] = None):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean_ms = mean_ms
+        self.spread_ms = spread_ms
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        if self.distribution == "fixed" or self.spread_ms <= 0:
+            value = self.mean_ms
+        elif self.distribution == "uniform":
+            value = self.rng.uniform(self.mean_ms - self.spread_ms, self.mean_ms + self.spread_ms)
+        elif self.distribution == "normal":
+            value = self.rng.gauss(self.mean_ms, self.spread_ms)
+        else:
+            # Long-tailed like real model latency; median is mean_ms, spread_ms sets the tail
+            sigma = self.spread_ms / self.mean_ms if self.mean_ms else 0.0
+            value = self.mean_ms * self.rng.lognormvariate(0.0, sigma)
+        return max(0.0, value) / 1000
+
+
+class StubChat:
+    """Deterministic chat that answers from the question and the system message"""
+
+    def __init__(self, provider: "StubProvider", system_message: str):
+        self.provider = provider
+        self.system_message = system_message
+        self.turns = 0
+
+    def _answer(self, text: str) -> str:
+        question = text.rsplit("Question:", 1)[-1].strip()
+        lines = [f"This is a stub answer to: {question}"]
+        match = re.search(r"^Topic: (.+)$", self.system_message, re.MULTILINE)
+        if match:
+            lines.append(f"It relates to the topic {match.group(1)}.")
+        match = re.search(r"^Key Concepts: (.+)$", self.system_message, re.MULTILINE)
+        if match and match.group(1).strip():
+            lines.append(f"The key concepts to review are {match.group(1)}.")
+        lines.append("Psychology students should connect these ideas to research evidence and real-world examples.")
+        return " ".join(lines)
+
+    async def send(self, text: str) -> str:
+        self.turns += 1
+        await asyncio.sleep(self.provider.latency.sample())
+        self.provider.maybe_fail()
+        return self._answer(text)
+
+    async def stream(self, text: str) -> AsyncIterator[str]:
+        self.turns += 1
+        await asyncio.sleep(self.provider.latency.sample())
+        self.provider.maybe_fail()
+        words = self._answer(text).split(" ")
+        for index, word in enumerate(words):
+            if index and self.provider.token_delay:
+                await asyncio.sleep(self.provider.token_delay)
+            yield word if index == 0 else f" {word}"
+
+
+class StubProvider:
+    """Local provider for load testing /api/ask without network or model cost"""
+    name = "stub"
+
+    def __init__(self, latency: Optional[LatencyModel] = None, token_delay_ms: float = 0.0,
+                 failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.latency = latency or LatencyModel(rng=self.rng)
+        self.token_delay = token_delay_ms / 1000
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+
+    def maybe_fail(self):
+        self.calls += 1
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            self.failures += 1
+            raise LLMProviderError("Injected stub LLM failure")
+
+    def create_chat(self, session_id: str, system_message: str) -> StubChat:
+        return StubChat(self, system_message)
+
+
+def provider_from_env(env: Optional[Dict[str, str]] = None):
+    """Build the LLM provider selected by LLM_PROVIDER and its settings"""
+    env = os.environ if env is None else env
+    name = env.get('LLM_PROVIDER', 'gemini').lower()
+    if name == "gemini":
+        return GeminiProvider(
+            api_key=env.get('GEMINI_API_KEY'),
+            model=env.get('GEMINI_MODEL', 'gemini-2.0-flash'),
+            max_tokens=int(env.get('LLM_MAX_TOKENS', '1000')),
+        )
+    if name == "stub":
+        seed = env.get('STUB_LLM_SEED')
+        provider = StubProvider(
+            token_delay_ms=float(env.get('STUB_LLM_TOKEN_DELAY_MS', '0')),
+            failure_rate=float(env.get('STUB_LLM_FAILURE_RATE', '0')),
+            seed=int(seed) if seed else None,
+        )
+        provider.latency = LatencyModel(
+            distribution=env.get('STUB_LLM_LATENCY_DIST', 'fixed'),
+            mean_ms=float(env.get('STUB_LLM_LATENCY_MS', '50')),
+            spread_ms=float(env.get('STUB_LLM_LATENCY_SPREAD_MS', '0')),
+            rng=provider.rng,
+        )
+        return provider
+    raise ValueError(f"Unknown LLM_PROVIDER: {name}")
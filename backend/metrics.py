@@ -0,0 +1,271 @@
+"""Prometheus request metrics for the API
+
+MetricsMiddleware times every HTTP request and labels it with the matched
+route template (never the raw path, so label cardinality stays bounded).
+While a request runs, its MongoDB and LLM time accumulate in a context
+variable. Motor copies the context into its executor threads, so the pymongo
+command listener (mongo_monitoring.py) sees the request that issued each
+command. Whatever time is left over is our own overhead.
+
+Each worker process keeps its own registry; `/metrics` reports the worker
+that served the scrape.
+"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_labels(self.labels, label_values)} {_number(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1.0):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items())
+        for label_values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket = _labels(self.labels, label_values, 'le="%s"' % _number(bound))
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            bucket = _labels(self.labels, label_values, 'le="+Inf"')
+            yield f"{self.name}_bucket{bucket} {count}"
+            yield f"{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labels, label_values)} {count}"
+
+
+class RequestStats:
+    """Time one HTTP request spent waiting on MongoDB and the LLM"""
+
+    def __init__(self, route: str = ""):
+        self.route = route
+        self._lock = threading.Lock()
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def add_mongo(self, seconds: float):
+        # Called from Motor's executor threads
+        with self._lock:
+            self.mongo_commands += 1
+            self.mongo_seconds += seconds
+
+    def add_llm(self, seconds: float):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+
+_current_request: contextvars.ContextVar = contextvars.ContextVar("current_request", default=None)
+
+
+def current_request() -> Optional[RequestStats]:
+    """Stats of the HTTP request being served, or None outside a request"""
+    return _current_request.get()
+
+
+class ApiMetrics:
+    """The API's metric families and the Prometheus text exposition of them"""
+
+    def __init__(self):
+        self.requests = Counter(
+            "http_requests_total", "HTTP requests by method, route and status code", ("method", "route", "status")
+        )
+        self.in_flight = Gauge("http_requests_in_flight", "HTTP requests being served", ("method", "route"))
+        self.duration = Histogram(
+            "http_request_duration_seconds", "HTTP request latency including the streamed body", ("method", "route")
+        )
+        self.mongo_commands = Histogram(
+            "http_request_mongo_commands", "MongoDB commands issued per HTTP request", ("route",), COUNT_BUCKETS
+        )
+        self.mongo_seconds = Histogram(
+            "http_request_mongo_seconds", "Time per HTTP request spent in MongoDB commands", ("route",)
+        )
+        self.llm_seconds = Histogram(
+            "http_request_llm_seconds", "Time per HTTP request spent in LLM calls", ("route",), LLM_BUCKETS
+        )
+        self.overhead_seconds = Histogram(
+            "http_request_overhead_seconds", "Time per HTTP request not spent in MongoDB or LLM calls", ("route",)
+        )
+        self.mongo_command_seconds = Histogram(
+            "mongo_command_duration_seconds", "MongoDB command round trips", ("command", "outcome")
+        )
+        self.llm_call_seconds = Histogram("llm_call_duration_seconds", "LLM call latency", ("outcome",), LLM_BUCKETS)
+        self._families = [
+            self.requests, self.in_flight, self.duration, self.mongo_commands, self.mongo_seconds,
+            self.llm_seconds, self.overhead_seconds, self.mongo_command_seconds, self.llm_call_seconds,
+        ]
+
+    def observe_mongo_command(self, command: str, seconds: float, success: bool):
+        self.mongo_command_seconds.observe(seconds, command, "success" if success else "failure")
+        stats = current_request()
+        if stats is not None:
+            stats.add_mongo(seconds)
+
+    def observe_llm_call(self, seconds: float, success: bool):
+        self.llm_call_seconds.observe(seconds, "success" if success else "failure")
+        stats = current_request()
+        if stats is not None:
+            stats.add_llm(seconds)
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        self.requests.inc(method, route, str(status))
+        self.duration.observe(seconds, method, route)
+        self.mongo_commands.observe(stats.mongo_commands, route)
+        self.mongo_seconds.observe(stats.mongo_seconds, route)
+        self.llm_seconds.observe(stats.llm_seconds, route)
+        # Concurrent Mongo/LLM work can add up to more than the wall time
+        self.overhead_seconds.observe(max(0.0, seconds - stats.mongo_seconds - stats.llm_seconds), route)
+
+    def render(self) -> str:
+        lines = []
+        for family in self._families:
+            lines.append(f"# HELP {family.name} {family.documentation}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            lines.extend(family.samples())
+        return "\n".join(lines) + "\n"
+
+
+def route_template(routes, scope) -> str:
+    """Path template of the route a request matches, e.g. /api/topics/{topic_id}"""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+        if match == Match.PARTIAL and partial is None:
+            partial = getattr(route, "path", None)
+    # A PARTIAL match is the right path with the wrong method (answered with 405)
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and in-flight count per route
+
+    With a command `budget` (see mongo_monitoring.CommandBudget), responses
+    carry an X-Mongo-Commands header and requests over their route's budget
+    are logged.
+    """
+
+    def __init__(self, app, metrics: ApiMetrics, routes, budget=None):
+        self.app = app
+        self.metrics = metrics
+        self.routes = routes
+        self.budget = budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(self.routes, scope)
+        stats = RequestStats(route)
+        token = _current_request.set(stats)
+        status = 500
+        started = time.perf_counter()
+        limit = self.budget.limit(route) if self.budget is not None else None
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if limit is not None:
+                    # Streamed responses can issue more commands after the headers; the log covers those
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-mongo-commands", str(stats.mongo_commands).encode()))
+                    if stats.mongo_commands > limit:
+                        headers.append((b"x-mongo-command-budget-exceeded", str(limit).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        self.metrics.in_flight.inc(method, route)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight.dec(method, route)
+            self.metrics.observe_request(method, route, status, time.perf_counter() - started, stats)
+            _current_request.reset(token)
+            if limit is not None and stats.mongo_commands > limit:
+                logger.warning(
+                    f"{method} {route} issued {stats.mongo_commands} MongoDB commands (budget {limit})"
+                )
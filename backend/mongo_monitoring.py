@@ -0,0 +1,121 @@
+"""MongoDB command monitoring: metrics, slow-command log and per-request budgets
+
+CommandMonitor is a pymongo CommandListener attached to the Motor client. It
+times every command into ApiMetrics and logs commands slower than a threshold
+together with the *shape* of their filter (field names and operators, with
+every value replaced by "?"), so logs show which query is slow without
+leaking data.
+
+CommandBudget caps how many commands one HTTP request may issue. Set
+MONGO_COMMAND_BUDGET (and MONGO_COMMAND_BUDGETS for per-route overrides,
+e.g. "/api/stats=1,/api/topics=2") in CI so that N+1 query regressions
+show up in the X-Mongo-Commands response header and in the log.
+"""
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+from metrics import ApiMetrics, current_request
+
+logger = logging.getLogger(__name__)
+
+# Where each command keeps the filter worth showing in the slow-command log
+FILTER_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+
+def value_shape(value: Any) -> Any:
+    """Replace every literal in a filter with "?", keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: value_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Lists of clauses ($and/$or) keep their structure; lists of literals ($in) collapse
+        if value and all(isinstance(item, dict) for item in value):
+            return [value_shape(item) for item in value]
+        return "[?]"
+    return "?"
+
+
+def filter_shape(command_name: str, command: Dict[str, Any]) -> str:
+    field = FILTER_FIELDS.get(command_name)
+    if field is None or field not in command:
+        return "-"
+    value = command[field]
+    if command_name == "aggregate":
+        # Only $match stages filter; other stages are shown by name
+        shape = [
+            {name: value_shape(body) if name == "$match" else "..." for name, body in stage.items()}
+            for stage in value
+        ]
+    elif command_name in ("update", "delete"):
+        shape = [value_shape(statement.get("q", {})) for statement in value[:1]]
+    else:
+        shape = value_shape(value)
+    return json.dumps(shape, sort_keys=True)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Feeds command round trips into ApiMetrics and logs slow commands"""
+
+    def __init__(self, metrics: ApiMetrics, slow_ms: float = 100.0):
+        self.metrics = metrics
+        self.slow_ms = slow_ms
+        # In-flight commands by (connection, request id), kept until they finish for the slow log
+        self._started: Dict[Tuple[Any, int], Tuple[str, Dict[str, Any]]] = {}
+        self.slow_commands = 0
+
+    def started(self, event):
+        self._started[(event.connection_id, event.request_id)] = (event.database_name, event.command)
+
+    def _finished(self, event, success: bool):
+        database, command = self._started.pop((event.connection_id, event.request_id), (None, None))
+        seconds = event.duration_micros / 1e6
+        self.metrics.observe_mongo_command(event.command_name, seconds, success)
+        if command is None or seconds * 1000 < self.slow_ms:
+            return
+        self.slow_commands += 1
+        stats = current_request()
+        collection = command.get(event.command_name)
+        logger.warning(
+            f"Slow MongoDB command {event.command_name} on {database}.{collection} "
+            f"took {seconds * 1000:.1f}ms filter={filter_shape(event.command_name, command)} "
+            f"route={stats.route if stats else '-'}"
+        )
+
+    def succeeded(self, event):
+        self._finished(event, True)
+
+    def failed(self, event):
+        self._finished(event, False)
+
+
+class CommandBudget:
+    """Maximum MongoDB commands per HTTP request, with per-route overrides"""
+
+    def __init__(self, default: Optional[int] = None, per_route: Optional[Dict[str, int]] = None):
+        self.default = default
+        self.per_route = per_route or {}
+
+    @classmethod
+    def parse(cls, default: Optional[str], per_route: Optional[str]) -> Optional["CommandBudget"]:
+        """Budget from MONGO_COMMAND_BUDGET / MONGO_COMMAND_BUDGETS values, or None if neither is set"""
+        routes = {}
+        for item in (per_route or "").split(","):
+            if item.strip():
+                route, _, limit = item.rpartition("=")
+                routes[route.strip()] = int(limit)
+        if not default and not routes:
+            return None
+        return cls(int(default) if default else None, routes)
+
+    def limit(self, route: str) -> Optional[int]:
+        return self.per_route.get(route, self.default)
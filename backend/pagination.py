@@ -0,0 +1,78 @@
+"""Opaque keyset cursors for paginated endpoints
+
+A cursor encodes the sort-key values of the last item on a page. The next
+page is fetched with a range condition on those keys instead of a skip, so
+page N costs the same as page one.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+_DATETIME_TAG = "$dt"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and _DATETIME_TAG in value:
+        return datetime.fromisoformat(value[_DATETIME_TAG])
+    return value
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Pack sort-key values into a URL-safe cursor string"""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Unpack a cursor produced by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    try:
+        return [_decode_value(value) for value in values]
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_condition(sort: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """Mongo filter matching documents that sort strictly after the given key values
+
+    For sort [(a, 1), (b, 1)] and values [x, y] this is
+    {"$or": [{a: {"$gt": x}}, {a: x, b: {"$gt": y}}]}.
+    """
+    clauses = []
+    for position, (field, direction) in enumerate(sort):
+        clause = {name: values[index] for index, (name, _) in enumerate(sort[:position])}
+        clause[field] = {"$gt" if direction >= 0 else "$lt": values[position]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def after_keyset(filter_query: Dict[str, Any], sort: List[Tuple[str, int]], values: Optional[List[Any]]) -> Dict[str, Any]:
+    """Combine a route filter with the keyset condition for decoded cursor values, if any"""
+    if values is None:
+        return filter_query
+    condition = keyset_condition(sort, values)
+    if not filter_query:
+        return condition
+    return {"$and": [filter_query, condition]}
+
+
+def next_cursor(items: List[Dict[str, Any]], sort: List[Tuple[str, int]], limit: int) -> Optional[str]:
+    """Cursor for the page after `items` (fetched with limit + 1), or None on the last page"""
+    if len(items) <= limit:
+        return None
+    last = items[limit - 1]
+    return encode_cursor([last[field] for field, _ in sort])
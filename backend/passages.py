@@ -0,0 +1,117 @@
+"""Per-topic passage index for retrieval-augmented tutor prompts
+
+Topic markdown is split into passages at headings. For each question the
+best-matching passages (BM25 over that topic's passages) are packed into
+the prompt until the token budget is used up. prompt_context.py keeps the
+chunked passages of each topic in memory.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from search_index import BM25Index
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+# Rough token estimate for English prose; good enough for budgeting prompt size
+CHARS_PER_TOKEN = 4
+
+# Passages scoring below this fraction of the best passage's score are left out of the prompt
+MIN_RELATIVE_SCORE = 0.5
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class Passage:
+    heading: str
+    text: str
+
+    def render(self) -> str:
+        return f"### {self.heading}\n{self.text}" if self.heading else self.text
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split a section body at paragraph breaks so no piece exceeds max_chars where possible"""
+    if len(text) <= max_chars:
+        return [text]
+    pieces, current = [], ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_markdown(content: str, max_chars: int = 1200) -> List[Passage]:
+    """Split markdown into passages, one per heading section, labelled with the heading path"""
+    passages: List[Passage] = []
+    headings: List[Tuple[int, str]] = []
+    body: List[str] = []
+
+    def flush():
+        text = "\n".join(body).strip()
+        body.clear()
+        if not text:
+            return
+        path = " > ".join(title for _, title in headings)
+        passages.extend(Passage(heading=path, text=piece) for piece in _split_long(text, max_chars))
+
+    for line in content.splitlines():
+        match = HEADING_RE.match(line.strip())
+        if match:
+            flush()
+            level = len(match.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, match.group(2)))
+        else:
+            body.append(line)
+    flush()
+    return passages
+
+
+class TopicPassages:
+    """Passages of one topic plus a BM25 index over them"""
+
+    def __init__(self, content: str):
+        self.passages = chunk_markdown(content)
+        self.index = BM25Index()
+        for number, passage in enumerate(self.passages):
+            self.index.add({"id": str(number), "title": passage.heading, "content": passage.text})
+
+    def select(self, question: str, top_k: int, token_budget: int) -> List[Passage]:
+        """Best-matching passages for a question, in document order, within the token budget"""
+        hits = self.index.search(question, limit=len(self.passages))
+        if hits:
+            # Passages that only share filler words with the question score far below the best one
+            floor = hits[0][1] * MIN_RELATIVE_SCORE
+            ranked = [int(number) for number, score in hits if score >= floor]
+        else:
+            # Nothing matched: the opening passages are the most general description of the topic
+            ranked = list(range(len(self.passages)))
+
+        chosen, used = [], 0
+        for number in ranked:
+            if len(chosen) >= top_k:
+                break
+            cost = estimate_tokens(self.passages[number].render())
+            if used + cost > token_budget:
+                continue
+            chosen.append(number)
+            used += cost
+        if not chosen and ranked:
+            # Even the best passage alone is over budget; send as much of it as fits
+            best = self.passages[ranked[0]]
+            return [Passage(heading=best.heading, text=best.text[:token_budget * CHARS_PER_TOKEN])]
+        return [self.passages[number] for number in sorted(chosen)]
+
@@ -0,0 +1,88 @@
+"""Materialized platform statistics kept in the `platform_stats` collection
+
+The dashboard reads one document by primary key. Topic writes apply
+incremental `$inc` updates to it, and `recompute_stats` rebuilds it from a
+single `$facet` aggregation to repair drift.
+"""
+from typing import Dict, Iterable, List
+
+DIFFICULTY_LEVELS = ["introductory", "intermediate", "advanced", "graduate"]
+
+STATS_COLLECTION = "platform_stats"
+STATS_ID = "platform"
+
+STATS_PIPELINE = [
+    {
+        "$facet": {
+            "total": [{"$count": "n"}],
+            "by_category": [{"$group": {"_id": "$category", "n": {"$sum": 1}}}],
+            "by_difficulty": [{"$group": {"_id": "$difficulty_level", "n": {"$sum": 1}}}],
+        }
+    }
+]
+
+
+def _format(doc: dict) -> dict:
+    """Shape a stats document into the /api/stats response"""
+    by_category = {name: count for name, count in doc.get("topics_by_category", {}).items() if count > 0}
+    by_difficulty = doc.get("topics_by_difficulty", {})
+    return {
+        "total_topics": doc.get("total_topics", 0),
+        "total_categories": len(by_category),
+        "topics_by_category": by_category,
+        "topics_by_difficulty": {level: by_difficulty.get(level, 0) for level in DIFFICULTY_LEVELS},
+    }
+
+
+async def compute_stats(db) -> dict:
+    """Count topics by category and difficulty in one aggregation round trip"""
+    result = await db.psychology_topics.aggregate(STATS_PIPELINE).to_list(1)
+    facets = result[0] if result else {}
+    total = facets.get("total", [])
+    return {
+        "total_topics": total[0]["n"] if total else 0,
+        "topics_by_category": {row["_id"]: row["n"] for row in facets.get("by_category", []) if row["_id"] is not None},
+        "topics_by_difficulty": {row["_id"]: row["n"] for row in facets.get("by_difficulty", []) if row["_id"] is not None},
+    }
+
+
+async def recompute_stats(db) -> dict:
+    """Rebuild the materialized stats document from the topics collection"""
+    stats = await compute_stats(db)
+    await db[STATS_COLLECTION].replace_one({"_id": STATS_ID}, stats, upsert=True)
+    return _format(stats)
+
+
+async def read_stats(db) -> dict:
+    """Read the materialized stats, computing them on first use"""
+    doc = await db[STATS_COLLECTION].find_one({"_id": STATS_ID})
+    if doc is None:
+        return await recompute_stats(db)
+    return _format(doc)
+
+
+def _safe_key(name: str) -> bool:
+    return bool(name) and "." not in name and not name.startswith("$")
+
+
+async def record_topics(db, topics: Iterable[dict]) -> None:
+    """Apply newly inserted topics to the materialized stats with a single $inc"""
+    increments: Dict[str, int] = {}
+    rows: List[dict] = list(topics)
+    if not rows:
+        return
+    for topic in rows:
+        category = topic.get("category")
+        difficulty = topic.get("difficulty_level")
+        if not (_safe_key(category) and _safe_key(difficulty)):
+            # Names that cannot be used as field paths are only handled by a full recompute
+            await recompute_stats(db)
+            return
+        increments[f"topics_by_category.{category}"] = increments.get(f"topics_by_category.{category}", 0) + 1
+        increments[f"topics_by_difficulty.{difficulty}"] = increments.get(f"topics_by_difficulty.{difficulty}", 0) + 1
+    increments["total_topics"] = len(rows)
+
+    result = await db[STATS_COLLECTION].update_one({"_id": STATS_ID}, {"$inc": increments})
+    if result.matched_count == 0:
+        # No baseline yet; incrementing from zero would undercount existing topics
+        await recompute_stats(db)
@@ -0,0 +1,123 @@
+"""Materialized per-topic prompt context for the AI tutor
+
+Everything a tutor prompt needs from a topic is rendered once per topic
+version and kept in memory: the system message, the key concepts and the
+chunked, BM25-indexed content passages. Answering a question about a cached
+topic then needs no MongoDB read and no string assembly beyond picking
+passages.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from passages import Passage, TopicPassages
+
+# Topic fields read to build a context on a cache miss
+CONTEXT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "title": 1,
+    "category": 1,
+    "difficulty_level": 1,
+    "content": 1,
+    "key_concepts": 1,
+    "related_topics": 1,
+    "psychologists": 1,
+    "updated_at": 1,
+}
+
+
+@dataclass
+class TopicContext:
+    id: str
+    title: str
+    key_concepts: List[str]
+    system_message: str
+    passages: TopicPassages
+
+
+class PromptContextCache:
+    """LRU of rendered topic contexts keyed by topic id and version"""
+
+    def __init__(
+        self,
+        render_system_message: Callable[[dict], str],
+        max_topics: int = 20000,
+        top_k: int = 3,
+        token_budget: int = 300,
+    ):
+        self.render_system_message = render_system_message
+        self.max_topics = max_topics
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self._topics: "OrderedDict[str, Tuple[Any, TopicContext]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.built = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    @staticmethod
+    def _version(topic: dict):
+        return topic.get("updated_at")
+
+    def get(self, topic_id: str) -> Optional[TopicContext]:
+        entry = self._topics.get(topic_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._topics.move_to_end(topic_id)
+        self.hits += 1
+        return entry[1]
+
+    def add(self, topic: dict) -> TopicContext:
+        """Render a topic's context (again only if its version changed) and cache it"""
+        topic_id = topic["id"]
+        version = self._version(topic)
+        entry = self._topics.get(topic_id)
+        if entry is not None and entry[0] == version:
+            self._topics.move_to_end(topic_id)
+            return entry[1]
+        context = TopicContext(
+            id=topic_id,
+            title=topic["title"],
+            key_concepts=list(topic.get("key_concepts", [])),
+            system_message=self.render_system_message(topic),
+            passages=TopicPassages(topic.get("content", "")),
+        )
+        self.built += 1
+        self._topics[topic_id] = (version, context)
+        self._topics.move_to_end(topic_id)
+        while len(self._topics) > self.max_topics:
+            self._topics.popitem(last=False)
+            self.evicted += 1
+        return context
+
+    def remove(self, topic_id: str):
+        self._topics.pop(topic_id, None)
+
+    def select(
+        self,
+        context: TopicContext,
+        question: str,
+        top_k: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ) -> List[Passage]:
+        """Best-matching passages of a topic for a question, within the prompt budget"""
+        return context.passages.select(
+            question,
+            top_k if top_k is not None else self.top_k,
+            token_budget if token_budget is not None else self.token_budget,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "topics": len(self._topics),
+            "max_topics": self.max_topics,
+            "hits": self.hits,
+            "misses": self.misses,
+            "built": self.built,
+            "evicted": self.evicted,
+        }
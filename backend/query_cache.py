@@ -0,0 +1,142 @@
+"""Async LRU/TTL result cache for topic listing and search queries
+
+Entries are tagged with the corpus version current when they were loaded.
+Topic writes bump the version, which makes every older entry a miss without
+having to know which queries a write affects. Concurrent misses for the same
+key are coalesced so only one of them reaches MongoDB.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key onto one in-flight call
+
+    The shared call runs as its own task, so a caller that is cancelled (for
+    example because its client disconnected) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every caller had gone away
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() for key, or await the result of an identical call already running"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+
+class QueryCache:
+    """LRU cache with per-entry TTL, invalidated by a corpus version counter"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, float, Any]]" = OrderedDict()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bump_version(self):
+        """Invalidate every cached result; call after any topic write"""
+        self.version += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        version, expires_at, value = entry
+        if version != self.version:
+            del self._entries[key]
+            self.invalidations += 1
+            return False, None
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, version: int, value: Any):
+        self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached result for key, loading it once on a miss
+
+        Cached values are shared between requests and must not be mutated.
+        """
+        found, value = self._lookup(key)
+        if found:
+            self.hits += 1
+            return value
+        self.misses += 1
+        version = self.version
+
+        async def load():
+            result = await loader()
+            # A write that landed while loading may have made this result stale
+            if version == self.version:
+                self._store(key, version, result)
+            return result
+
+        return await self._flight.do((version, key), load)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self._flight.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def normalize_text(value):
+    """Case- and whitespace-insensitive form of a free-text query parameter"""
+    if value is None:
+        return None
+    return " ".join(value.lower().split()) or None
+
+
+def normalize_fields(value):
+    """Order-insensitive form of a fields= selector"""
+    if not value or value == "all":
+        return value or None
+    return ",".join(sorted({name.strip() for name in value.split(",") if name.strip()}))
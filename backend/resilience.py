@@ -0,0 +1,217 @@
+"""Deadlines, a circuit breaker and a concurrency limit for LLM calls
+
+`LLMGuard.guarded()` wraps one model call. On entry it rejects immediately
+if the breaker is open or no concurrency slot frees up in time. Inside the
+block the call runs under a deadline, and the outcome and duration are fed
+back to the breaker on exit.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The breaker is open; the call was not attempted"""
+
+
+class OverloadedError(Exception):
+    """No concurrency slot became free in time; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures or a sustained share of slow calls"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        window: int = 20,
+        slow_call_seconds: float = 10.0,
+        slow_call_rate: float = 0.5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now; half-open admits a few probe calls"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def record(self, success: bool, duration: float):
+        slow = duration >= self.slow_call_seconds
+        self._outcomes.append((success, slow))
+        self.consecutive_failures = 0 if success else self.consecutive_failures + 1
+
+        if self._state == HALF_OPEN:
+            if success and not slow:
+                self._state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+
+        if self._state != CLOSED:
+            return
+        if self.consecutive_failures >= self.failure_threshold:
+            self._open()
+            return
+        # Judge latency only over a reasonably full window so a single slow call cannot trip it
+        if len(self._outcomes) >= max(1, self._outcomes.maxlen // 2):
+            slow_calls = sum(1 for _, was_slow in self._outcomes if was_slow)
+            if slow_calls / len(self._outcomes) >= self.slow_call_rate:
+                self._open()
+
+    def abandon(self):
+        """A call ended without an outcome (caller cancelled); give back its half-open probe"""
+        if self._state == HALF_OPEN and self._half_open_calls:
+            self._half_open_calls -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "window_calls": len(self._outcomes),
+            "window_failures": sum(1 for success, _ in self._outcomes if not success),
+            "window_slow_calls": sum(1 for _, slow in self._outcomes if slow),
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class GuardedCall:
+    """Deadline bookkeeping for one call admitted by LLMGuard"""
+
+    def __init__(self, deadline_seconds: float):
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    async def run(self, awaitable: Awaitable[Any]) -> Any:
+        return await asyncio.wait_for(awaitable, self.remaining())
+
+    async def iterate(self, iterator: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Relay an async iterator, raising asyncio.TimeoutError once the deadline passes"""
+        while True:
+            try:
+                item = await asyncio.wait_for(iterator.__anext__(), self.remaining())
+            except StopAsyncIteration:
+                return
+            yield item
+
+
+class LLMGuard:
+    """Circuit breaker + deadline + bounded concurrency around LLM calls"""
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        deadline_seconds: float = 20.0,
+        max_concurrency: int = 32,
+        queue_timeout: float = 1.0,
+        observer: Optional[Callable[[float, bool], None]] = None,
+    ):
+        self.breaker = breaker
+        self.deadline_seconds = deadline_seconds
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        # Called with (seconds, success) after every attempted call, e.g. to record metrics
+        self.observer = observer
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.timeouts = 0
+        self.overloaded = 0
+
+    @asynccontextmanager
+    async def guarded(self, queue_timeout: Optional[float] = None) -> AsyncIterator[GuardedCall]:
+        """Admit one call; queue_timeout overrides how long to wait for a slot"""
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+        # The breaker is checked first so an open circuit fails fast instead of queueing;
+        # a half-open probe admitted here must be given back if the call never starts
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), self.queue_timeout if queue_timeout is None else queue_timeout
+            )
+        except asyncio.TimeoutError:
+            self.breaker.abandon()
+            self.overloaded += 1
+            raise OverloadedError("Too many concurrent LLM calls")
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+
+        call = GuardedCall(self.deadline_seconds)
+        self.in_flight += 1
+        outcome = False
+        try:
+            yield call
+            outcome = True
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away; that says nothing about the LLM's health
+            outcome = None
+            raise
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+            if outcome is None:
+                self.breaker.abandon()
+            else:
+                duration = time.monotonic() - call.started
+                self.breaker.record(outcome, duration)
+                if self.observer is not None:
+                    self.observer(duration, outcome)
+
+    async def call(self, fn, queue_timeout: Optional[float] = None) -> Any:
+        """Run fn() under the guard and return its result"""
+        async with self.guarded(queue_timeout) as call:
+            return await call.run(fn())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "breaker": self.breaker.stats(),
+            "deadline_seconds": self.deadline_seconds,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "timeouts": self.timeouts,
+            "overloaded": self.overloaded,
+        }
@@ -0,0 +1,185 @@
+"""In-process BM25 inverted index for psychology topic search"""
+import heapq
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Matches in short, curated fields say more about a topic than a match deep in the markdown body
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "key_concepts": 2.0,
+    "psychologists": 2.0,
+    "experiments": 1.5,
+    "content": 1.0,
+}
+
+# Query terms at least this long also match indexed terms they prefix ("condition" -> "conditioning")
+MIN_PREFIX_LENGTH = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into alphanumeric terms"""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _field_text(value) -> str:
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return value or ""
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring over weighted topic fields"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.doc_terms: Dict[str, List[str]] = {}
+        self.doc_meta: Dict[str, Dict[str, str]] = {}
+        self.total_length = 0.0
+        # Sorted for prefix lookups. New terms are appended and sorted in on the next lookup;
+        # removed terms stay until then, when the list is rebuilt from the postings
+        self.vocabulary: List[str] = []
+        self._vocabulary_sorted = True
+        self._vocabulary_has_removed = False
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, topic_id: str) -> bool:
+        return topic_id in self.doc_lengths
+
+    def clear(self):
+        self.__init__(self.k1, self.b)
+
+    def add(self, topic: dict):
+        """Index a topic document, replacing any previous version with the same id"""
+        topic_id = topic["id"]
+        if topic_id in self.doc_lengths:
+            self.remove(topic_id)
+
+        term_weights: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(_field_text(topic.get(field))):
+                term_weights[term] += weight
+
+        for term, weight in term_weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                self.vocabulary.append(term)
+                self._vocabulary_sorted = False
+            postings[topic_id] = weight
+
+        length = sum(term_weights.values())
+        self.doc_lengths[topic_id] = length
+        self.doc_terms[topic_id] = list(term_weights)
+        self.doc_meta[topic_id] = {
+            "category": (topic.get("category") or "").lower(),
+            "difficulty_level": topic.get("difficulty_level") or "",
+        }
+        self.total_length += length
+
+    def add_many(self, topics: Iterable[dict]):
+        for topic in topics:
+            self.add(topic)
+
+    def remove(self, topic_id: str):
+        """Drop a topic from the index"""
+        length = self.doc_lengths.pop(topic_id, None)
+        if length is None:
+            return
+        self.total_length -= length
+        self.doc_meta.pop(topic_id, None)
+        for term in self.doc_terms.pop(topic_id, []):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(topic_id, None)
+            if not postings:
+                del self.postings[term]
+                self._vocabulary_sorted = False
+                self._vocabulary_has_removed = True
+
+    def _sort_vocabulary(self):
+        """Restore sorted order after adds, dropping removed terms if there were any"""
+        if self._vocabulary_sorted:
+            return
+        if self._vocabulary_has_removed:
+            self.vocabulary = sorted(self.postings)
+            self._vocabulary_has_removed = False
+        else:
+            # A sorted run plus the appended terms; timsort merges the two
+            self.vocabulary.sort()
+        self._vocabulary_sorted = True
+
+    def _expand(self, term: str) -> List[str]:
+        """Indexed terms matched by a query term (exact match plus prefix matches)"""
+        if len(term) < MIN_PREFIX_LENGTH:
+            return [term] if term in self.postings else []
+        self._sort_vocabulary()
+        matches = []
+        index = bisect_left(self.vocabulary, term)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(term):
+            matches.append(self.vocabulary[index])
+            index += 1
+        return matches
+
+    def _matches_filters(self, topic_id: str, category: Optional[str], difficulty_level: Optional[str]) -> bool:
+        meta = self.doc_meta[topic_id]
+        if category and category.lower() not in meta["category"]:
+            return False
+        if difficulty_level and meta["difficulty_level"] != difficulty_level:
+            return False
+        return True
+
+    def score(self, query: str) -> Dict[str, float]:
+        """BM25 score for every topic matching at least one query term"""
+        doc_count = len(self.doc_lengths)
+        if not doc_count:
+            return {}
+        avg_length = self.total_length / doc_count
+        scores: Dict[str, float] = {}
+
+        for query_term in set(tokenize(query)):
+            # Prefix expansions of the same query term compete; only the best one counts per topic
+            term_scores: Dict[str, float] = {}
+            for term in self._expand(query_term):
+                postings = self.postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for topic_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[topic_id] / avg_length)
+                    value = idf * tf * (self.k1 + 1) / (tf + norm)
+                    if value > term_scores.get(topic_id, 0.0):
+                        term_scores[topic_id] = value
+            for topic_id, value in term_scores.items():
+                scores[topic_id] = scores.get(topic_id, 0.0) + value
+        return scores
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        difficulty_level: Optional[str] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Top topic ids for a query as (id, score), best match first
+
+        Results are ordered by (score, id) descending; `after` resumes below a
+        previous page's last (score, id) pair.
+        """
+        scores = self.score(query)
+        candidates = (
+            (topic_id, value)
+            for topic_id, value in scores.items()
+            if (after is None or (value, topic_id) < after)
+            and self._matches_filters(topic_id, category, difficulty_level)
+        )
+        return heapq.nlargest(limit, candidates, key=lambda item: (item[1], item[0]))
@@ -0,0 +1,109 @@
+"""Idempotent seeding of the built-in psychology topics
+
+Every seed topic is keyed by a stable slug (its `slug`, or one derived from
+its title) and carries a hash of its seed content. On startup the stored
+(slug, hash) pairs are read in one indexed query. Only new or edited topics
+are then written, with a single unordered bulk_write of upserts, so a restart
+with unchanged seed data costs one round trip and edits to the seed data land
+without a migration. Topic ids and created_at of existing topics never change.
+
+The seed corpus ships as gzipped JSON next to this module and is read only
+while seeding, so workers do not keep it in memory afterwards.
+"""
+import gzip
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+SEED_TOPICS_PATH = Path(__file__).parent / "data" / "seed_topics.json.gz"
+
+DUPLICATE_KEY = 11000
+
+_NON_SLUG = re.compile(r"[^a-z0-9]+")
+
+
+def load_seed_topics(path: Path = SEED_TOPICS_PATH) -> List[Dict[str, Any]]:
+    """Read the seed corpus; callers should drop it once seeded"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def slugify(title: str) -> str:
+    return _NON_SLUG.sub("-", title.lower()).strip("-")
+
+
+def seed_slug(row: Dict[str, Any]) -> str:
+    return row.get("slug") or slugify(row["title"])
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Hash of a seed row's content; any edit to the row changes it"""
+    content = {key: value for key, value in row.items() if key != "slug"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@dataclass
+class SeedResult:
+    total: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated)
+
+
+async def seed_topics(collection, rows: List[Dict[str, Any]], build_document: Callable[[dict], dict]) -> SeedResult:
+    """Upsert new and edited seed rows; build_document turns a seed row into a full topic document"""
+    seeds = {seed_slug(row): (row, content_hash(row)) for row in rows}
+    stored = {
+        doc["seed_slug"]: doc.get("seed_hash")
+        async for doc in collection.find(
+            {"seed_slug": {"$in": list(seeds)}}, {"_id": 0, "seed_slug": 1, "seed_hash": 1}
+        )
+    }
+
+    # Topics seeded before slugs existed are adopted by title rather than duplicated
+    unseen = {row["title"]: slug for slug, (row, _) in seeds.items() if slug not in stored}
+    legacy = {}
+    if unseen:
+        async for doc in collection.find(
+            {"title": {"$in": list(unseen)}, "seed_slug": {"$exists": False}}, {"_id": 0, "id": 1, "title": 1}
+        ):
+            legacy[unseen[doc["title"]]] = doc["id"]
+
+    result = SeedResult(total=len(seeds))
+    operations = []
+    now = datetime.utcnow()
+    for slug, (row, digest) in seeds.items():
+        if stored.get(slug) == digest:
+            result.unchanged += 1
+            continue
+        document = build_document({key: value for key, value in row.items() if key != "slug"})
+        on_insert = {"id": document.pop("id"), "created_at": document.pop("created_at")}
+        document.update(seed_slug=slug, seed_hash=digest, updated_at=now)
+        if slug in legacy:
+            operations.append(UpdateOne({"id": legacy[slug]}, {"$set": document}))
+        else:
+            operations.append(UpdateOne({"seed_slug": slug}, {"$set": document, "$setOnInsert": on_insert}, upsert=True))
+        if slug in stored or slug in legacy:
+            result.updated += 1
+        else:
+            result.inserted += 1
+
+    if operations:
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Another worker seeding at the same moment inserted the same slug first
+            if any(error.get("code") != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+    return result
@@ -1,24 +1,55 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.websockets import WebSocketState
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple, Union
 import uuid
 from datetime import datetime
 import requests
 import asyncio
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+import json
+import time
+from backfill_excerpts import make_excerpt
+from search_index import BM25Index
+from db_indexes import ensure_indexes, verify_indexes
+from pagination import after_keyset, decode_cursor, encode_cursor, next_cursor
+from answer_cache import AnswerCache, CachedAnswer, normalize_question
+from latency import StreamLatency
+from prompt_context import CONTEXT_PROJECTION, PromptContextCache, TopicContext
+from chat_writer import ChatWriteBehind
+from conversation_memory import SUMMARY_COLLECTION, ConversationMemory, SessionMemory
+from llm_providers import provider_from_env
+from resilience import CircuitBreaker, CircuitOpenError, LLMGuard, OverloadedError
+from metrics import ApiMetrics, MetricsMiddleware
+from mongo_monitoring import CommandBudget, CommandMonitor
+from query_cache import QueryCache, SingleFlight, normalize_fields, normalize_text
+from platform_stats import DIFFICULTY_LEVELS, read_stats, recompute_stats, record_topics
+from seeding import load_seed_topics, seed_topics
+from topic_graph import GRAPH_PROJECTION, TopicGraph
+from topic_sync import TopicSync
+from topic_import import chunked, insert_chunk, is_ndjson, json_array_rows, ndjson_rows, validate_chunk
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Per-route latency, MongoDB and LLM time, exposed on /metrics
+api_metrics = ApiMetrics()
+
+# Slow-command log and the optional per-request command budget (off unless configured)
+mongo_monitor = CommandMonitor(api_metrics, slow_ms=float(os.environ.get('MONGO_SLOW_COMMAND_MS', '100')))
+mongo_command_budget = CommandBudget.parse(
+    os.environ.get('MONGO_COMMAND_BUDGET'), os.environ.get('MONGO_COMMAND_BUDGETS')
+)
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, event_listeners=[mongo_monitor])
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -27,6 +58,107 @@ app = FastAPI(title="PsychLearn API", description="Comprehensive Psychology Lear
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# In-process full-text index; each worker builds its own copy at startup
+search_index = BM25Index()
+
+# Related-topic links resolved to topic ids, kept per worker like the search index
+topic_graph = TopicGraph()
+TOPIC_GRAPH_MAX_DEPTH = 3
+
+# Topics created or edited by other workers reach this worker's index, graph and caches within a poll
+topic_sync = TopicSync(
+    db.psychology_topics,
+    lambda topics: apply_remote_topics(topics),
+    interval=float(os.environ.get('TOPIC_SYNC_SECONDS', '5')),
+)
+
+# Listing/search result cache, invalidated on every topic write in this worker
+query_cache = QueryCache(
+    max_entries=int(os.environ.get('QUERY_CACHE_SIZE', '1024')),
+    ttl_seconds=float(os.environ.get('QUERY_CACHE_TTL_SECONDS', '300')),
+)
+
+# Rolling time-to-first-token / total-time samples for /api/ask/stream
+stream_latency = StreamLatency()
+
+# Rendered system message and heading-level passages of each topic, built once per topic version;
+# only the passages that best match a question go into the prompt
+prompt_contexts = PromptContextCache(
+    lambda topic: build_system_message(topic),
+    max_topics=int(os.environ.get('PROMPT_CONTEXT_TOPICS', '20000')),
+    top_k=int(os.environ.get('RAG_TOP_K', '3')),
+    token_budget=int(os.environ.get('RAG_TOKEN_BUDGET', '300')),
+)
+
+# LLM backend for the AI tutor, chosen by LLM_PROVIDER (gemini or the offline stub)
+llm_provider = provider_from_env()
+
+# Deadline, circuit breaker and concurrency limit for every LLM call
+llm_guard = LLMGuard(
+    CircuitBreaker(
+        failure_threshold=int(os.environ.get('LLM_BREAKER_FAILURES', '5')),
+        window=int(os.environ.get('LLM_BREAKER_WINDOW', '20')),
+        slow_call_seconds=float(os.environ.get('LLM_SLOW_CALL_SECONDS', '10')),
+        slow_call_rate=float(os.environ.get('LLM_SLOW_CALL_RATE', '0.5')),
+        reset_timeout=float(os.environ.get('LLM_BREAKER_RESET_SECONDS', '30')),
+    ),
+    deadline_seconds=float(os.environ.get('LLM_DEADLINE_SECONDS', '20')),
+    max_concurrency=int(os.environ.get('LLM_MAX_CONCURRENCY', '32')),
+    queue_timeout=float(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', '1')),
+    observer=api_metrics.observe_llm_call,
+)
+
+# Passages quoted in a locally built answer when the LLM is unavailable
+FALLBACK_PASSAGES = 2
+
+# Limits for /api/ask/batch
+BATCH_ASK_MAX_ITEMS = int(os.environ.get('BATCH_ASK_MAX_ITEMS', '5000'))
+BATCH_ASK_CONCURRENCY = int(os.environ.get('BATCH_ASK_CONCURRENCY', '8'))
+BATCH_ASK_MAX_CONCURRENCY = 64
+
+# LLM calls all batch jobs together may hold, so offline batches never take the slots
+# interactive tutor calls need. Batch items wait this long for a slot instead of the
+# interactive queue timeout, since a fallback answer is useless to a batch.
+BATCH_ASK_LLM_SLOTS = max(1, min(
+    int(os.environ.get('BATCH_ASK_LLM_SLOTS', str(llm_guard.max_concurrency // 4))),
+    llm_guard.max_concurrency - 1,
+))
+BATCH_ASK_QUEUE_TIMEOUT_SECONDS = float(os.environ.get('BATCH_ASK_QUEUE_TIMEOUT_SECONDS', '300'))
+batch_llm_slots = asyncio.Semaphore(BATCH_ASK_LLM_SLOTS)
+
+# Rows validated and inserted per round trip by /api/topics/import, and per-row errors echoed back
+TOPIC_IMPORT_CHUNK_SIZE = int(os.environ.get('TOPIC_IMPORT_CHUNK_SIZE', '500'))
+TOPIC_IMPORT_MAX_REPORTED_ERRORS = 1000
+
+# Chat messages are persisted off the request path in batches
+chat_writer = ChatWriteBehind(
+    db.chat_messages,
+    max_queue=int(os.environ.get('CHAT_WRITE_QUEUE_SIZE', '10000')),
+    batch_size=int(os.environ.get('CHAT_WRITE_BATCH_SIZE', '100')),
+    flush_interval=float(os.environ.get('CHAT_WRITE_FLUSH_SECONDS', '0.5')),
+)
+
+# Recent turns and a rolling summary of older ones, fed back into each session's prompts
+conversation_memory = ConversationMemory(
+    db.chat_messages,
+    db[SUMMARY_COLLECTION],
+    max_sessions=int(os.environ.get('MEMORY_SESSIONS', '10000')),
+    token_budget=int(os.environ.get('MEMORY_TOKEN_BUDGET', '600')),
+    summary_token_budget=int(os.environ.get('MEMORY_SUMMARY_TOKEN_BUDGET', '200')),
+    min_recent_turns=int(os.environ.get('MEMORY_MIN_RECENT_TURNS', '2')),
+    pending=chat_writer.pending,
+)
+
+# Concurrent identical questions on the same topic await one shared LLM call
+ask_flight = SingleFlight()
+
+# Tutor answers reused for identical and near-duplicate questions on the same topic
+answer_cache = AnswerCache(
+    max_entries=int(os.environ.get('ANSWER_CACHE_SIZE', '5000')),
+    similarity_threshold=float(os.environ.get('ANSWER_CACHE_SIMILARITY', '0.9')),
+    ttl_seconds=float(os.environ.get('ANSWER_CACHE_TTL_SECONDS', '86400')),
+)
+
 # Pydantic Models
 class PsychologyTopic(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -40,9 +172,34 @@ class PsychologyTopic(BaseModel):
     related_topics: List[str] = []
     psychologists: List[str] = []
     experiments: List[str] = []
+    excerpt: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
+    @model_validator(mode="after")
+    def fill_excerpt(self):
+        if not self.excerpt:
+            self.excerpt = make_excerpt(self.content)
+        return self
+
+class TopicSummary(BaseModel):
+    """List/search view of a topic; never carries the markdown content"""
+    id: str
+    title: str
+    category: str
+    subcategory: Optional[str] = None
+    difficulty_level: str
+    reading_time: int
+    key_concepts: List[str] = []
+    excerpt: str = ""
+
+# Keyset pagination order for topic listings and chat history
+TOPIC_SORT = [("created_at", 1), ("id", 1)]
+CHAT_SORT = [("created_at", 1), ("id", 1)]
+
+# created_at is projected for building page cursors; TopicSummary drops it
+SUMMARY_PROJECTION = {"_id": 0, "created_at": 1, **{field: 1 for field in TopicSummary.model_fields}}
+
 class PsychologyTopicCreate(BaseModel):
     title: str
     category: str
@@ -55,6 +212,9 @@ class PsychologyTopicCreate(BaseModel):
     psychologists: List[str] = []
     experiments: List[str] = []
 
+# Compiled once; validates a whole import chunk per call
+topic_import_adapter = TypeAdapter(List[PsychologyTopicCreate])
+
 class SearchFilters(BaseModel):
     category: Optional[str] = None
     difficulty_level: Optional[str] = None
@@ -86,6 +246,18 @@ class QuestionResponse(BaseModel):
     answer: str
     session_id: str
     topic_title: Optional[str] = None
+    cached: bool = False
+    fallback: bool = False
+
+class BatchQuestion(BaseModel):
+    topic_id: Optional[str] = None
+    question: str
+
+class BatchQuestionRequest(BaseModel):
+    items: List[BatchQuestion] = Field(..., min_length=1, max_length=BATCH_ASK_MAX_ITEMS)
+    # Re-posting with the same job_id resumes the job, skipping questions already answered
+    job_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    concurrency: int = Field(BATCH_ASK_CONCURRENCY, ge=1, le=BATCH_ASK_MAX_CONCURRENCY)
 
 class ChatMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -95,1837 +267,195 @@ class ChatMessage(BaseModel):
     answer: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-# Sample psychology topics data - Comprehensive database across all psychology fields
-sample_topics = [
-    # BEHAVIORAL PSYCHOLOGY
-    {
-        "title": "Classical Conditioning",
-        "category": "Behavioral Psychology",
-        "subcategory": "Learning Theories",
-        "content": """
-# Classical Conditioning
-
-Classical conditioning is a fundamental learning process discovered by Ivan Pavlov in the early 1900s. This type of learning occurs when a neutral stimulus becomes associated with a naturally occurring stimulus, eventually triggering a similar response.
-
-## Key Components
-
-### Unconditioned Stimulus (UCS)
-The unconditioned stimulus is a stimulus that naturally and automatically triggers a response. In Pavlov's famous experiment, the food was the UCS because it naturally caused dogs to salivate.
-
-### Unconditioned Response (UCR)
-The unconditioned response is the natural reaction to the unconditioned stimulus. The dogs' salivation in response to food is an example of a UCR.
-
-### Conditioned Stimulus (CS)
-The conditioned stimulus is a previously neutral stimulus that, after being associated with the UCS, triggers a conditioned response. In Pavlov's experiment, the bell became the CS.
-
-### Conditioned Response (CR)
-The conditioned response is the learned response to the conditioned stimulus. The dogs eventually salivated when they heard the bell, even without food present.
-
-## Real-World Applications
-
-Classical conditioning principles are used in various therapeutic approaches:
-- **Systematic Desensitization**: Treating phobias by gradually exposing patients to feared stimuli
-- **Aversion Therapy**: Creating negative associations with harmful behaviors
-- **Advertising**: Associating products with positive emotions or experiences
-
-## Important Concepts
-
-### Acquisition
-The initial learning phase where the CS and UCS are paired repeatedly until the association is formed.
-
-### Extinction
-The gradual weakening of the conditioned response when the CS is repeatedly presented without the UCS.
-
-### Spontaneous Recovery
-The reappearance of a previously extinguished conditioned response after a rest period.
-
-### Generalization
-The tendency to respond to stimuli similar to the original CS.
-
-### Discrimination
-The ability to distinguish between the CS and other similar stimuli.
-
-## Modern Research
-
-Contemporary research has expanded our understanding of classical conditioning:
-- **Biological Preparedness**: Some associations are learned more easily than others due to evolutionary factors
-- **Cognitive Factors**: Mental processes influence the strength and formation of conditioned responses
-- **Neural Mechanisms**: Brain imaging shows specific neural pathways involved in classical conditioning
-
-Classical conditioning remains a cornerstone of learning theory and continues to inform therapeutic practices and our understanding of human behavior.
-        """,
-        "difficulty_level": "introductory",
-        "reading_time": 8,
-        "key_concepts": ["UCS", "UCR", "CS", "CR", "acquisition", "extinction", "generalization"],
-        "related_topics": ["Operant Conditioning", "Behavioral Therapy", "Learning Theory"],
-        "psychologists": ["Ivan Pavlov", "John Watson"],
-        "experiments": ["Pavlov's Dogs", "Little Albert Experiment"]
-    },
-    {
-        "title": "Operant Conditioning",
-        "category": "Behavioral Psychology",
-        "subcategory": "Learning Theories",
-        "content": """
-# Operant Conditioning
-
-Operant conditioning, developed by B.F. Skinner, is a learning process where behavior is controlled by consequences. Unlike classical conditioning, which focuses on involuntary responses, operant conditioning deals with voluntary behaviors and their outcomes.
-
-## Core Principles
-
-### Reinforcement
-Reinforcement increases the likelihood of a behavior occurring again. There are two types:
-
-**Positive Reinforcement**: Adding something desirable after a behavior
-- Example: Giving praise for good performance
-- Increases behavior frequency
-
-**Negative Reinforcement**: Removing something unpleasant after a behavior
-- Example: Taking aspirin to eliminate a headache
-- Also increases behavior frequency
-
-### Punishment
-Punishment decreases the likelihood of a behavior occurring again. There are two types:
-
-**Positive Punishment**: Adding something unpleasant after a behavior
-- Example: Giving extra chores for misbehavior
-- Decreases behavior frequency
-
-**Negative Punishment**: Removing something desirable after a behavior
-- Example: Taking away TV privileges
-- Decreases behavior frequency
-
-## Schedules of Reinforcement
-
-### Continuous Reinforcement
-Every occurrence of the behavior is reinforced. Leads to rapid learning but quick extinction.
-
-### Partial Reinforcement
-Only some occurrences are reinforced. More resistant to extinction.
-
-**Fixed Ratio (FR)**: Reinforcement after a fixed number of responses
-**Variable Ratio (VR)**: Reinforcement after varying numbers of responses
-**Fixed Interval (FI)**: Reinforcement after a fixed time period
-**Variable Interval (VI)**: Reinforcement after varying time periods
-
-## Applications
-
-### Education
-- Token economies in classrooms
-- Immediate feedback systems
-- Gradual skill building
+# Create and verify MongoDB indexes before anything reads or seeds the collections
+@app.on_event("startup")
+async def ensure_db_indexes():
+    """Apply the index registry and report any drift"""
+    try:
+        await ensure_indexes(db)
+        for collection, report in (await verify_indexes(db)).items():
+            if report["missing"]:
+                logging.error(f"Missing indexes on {collection}: {report['missing']}")
+            if report["extra"]:
+                logging.warning(f"Unregistered indexes on {collection}: {report['extra']}")
+    except Exception as e:
+        logging.error(f"Error ensuring indexes: {e}")
 
-### Therapy
-- Behavior modification programs
-- Treatment of phobias and addictions
-- Autism intervention strategies
+@app.on_event("startup")
+async def start_chat_writer():
+    chat_writer.start()
 
-### Animal Training
-- Pet obedience training
-- Wildlife management
-- Service animal preparation
-
-## Limitations and Criticisms
-
-### Ethical Concerns
-- Use of punishment in behavior modification
-- Questions about human dignity and autonomy
-- Over-reliance on external rewards
-
-### Cognitive Factors
-- Doesn't account for mental processes
-- Limited explanation of complex human behavior
-- Ignores intrinsic motivation
-
-## Modern Applications
-
-Operant conditioning principles continue to influence:
-- **Gamification**: Using reward systems in apps and games
-- **Workplace Management**: Employee recognition programs
-- **Digital Learning**: Adaptive learning platforms
-- **Healthcare**: Adherence to treatment protocols
-
-Understanding operant conditioning helps explain how consequences shape behavior and provides practical tools for behavior change in various settings.
-        """,
-        "difficulty_level": "introductory",
-        "reading_time": 12,
-        "key_concepts": ["reinforcement", "punishment", "schedules", "shaping", "extinction"],
-        "related_topics": ["Classical Conditioning", "Behavior Modification", "Learning Theory"],
-        "psychologists": ["B.F. Skinner", "Edward Thorndike"],
-        "experiments": ["Skinner Box", "Law of Effect"]
-    },
-    
-    # COGNITIVE PSYCHOLOGY
-    {
-        "title": "Cognitive Load Theory",
-        "category": "Cognitive Psychology",
-        "subcategory": "Memory and Learning",
-        "content": """
-# Cognitive Load Theory
-
-Cognitive Load Theory, developed by John Sweller, explains how the human cognitive system processes information and the implications for learning and instruction. The theory is based on our understanding of working memory limitations and long-term memory structures.
-
-## Types of Cognitive Load
-
-### Intrinsic Load
-This is the inherent difficulty associated with the material itself. It relates to the complexity of the information and cannot be altered by instructional design. For example, learning basic arithmetic has lower intrinsic load than learning calculus.
-
-### Extraneous Load
-This refers to the cognitive load imposed by the way information is presented. Poor instructional design can increase extraneous load unnecessarily, hindering learning. Examples include:
-- Unclear explanations
-- Irrelevant information
-- Poor organization of material
-
-### Germane Load
-This is the cognitive effort devoted to processing, constructing, and automating schemas. Unlike extraneous load, germane load is beneficial for learning as it contributes to meaningful understanding and knowledge construction.
-
-## Working Memory Limitations
-
-Working memory can only hold approximately 7±2 pieces of information simultaneously (Miller's Magic Number). However, when dealing with novel information, this capacity is even more limited - often just 2-4 elements can be processed effectively.
-
-## Long-Term Memory and Schemas
-
-Long-term memory stores organized knowledge structures called schemas. These schemas:
-- Reduce cognitive load by chunking information
-- Allow for automatic processing of familiar patterns
-- Enable experts to process complex information more efficiently
-
-## Instructional Design Implications
-
-### Worked Examples
-Providing fully worked examples reduces cognitive load by showing learners the complete solution process rather than requiring them to discover it themselves.
-
-### Progressive Problem Solving
-Starting with worked examples and gradually transitioning to independent problem-solving helps manage cognitive load appropriately.
-
-### Elimination of Redundancy
-Removing unnecessary information reduces extraneous cognitive load, allowing learners to focus on essential elements.
-
-### Modality Effect
-Presenting information through multiple sensory channels (visual and auditory) can increase effective working memory capacity.
-
-## Applications in Education
-
-Cognitive Load Theory has significant implications for:
-- **Curriculum Design**: Sequencing content from simple to complex
-- **Multimedia Learning**: Optimizing the use of text, images, and audio
-- **Assessment**: Designing tests that accurately measure learning without imposing unnecessary cognitive burden
-- **Technology-Enhanced Learning**: Creating digital learning environments that support cognitive processing
-
-## Research Evidence
-
-Extensive research supports Cognitive Load Theory principles:
-- Students learn more effectively when extraneous cognitive load is minimized
-- Expertise reversal effect shows that instructional techniques effective for novices may be less effective or even harmful for experts
-- Split-attention effect demonstrates the importance of integrating related information sources
-
-Understanding Cognitive Load Theory helps educators and instructional designers create more effective learning experiences by aligning instruction with how the human mind processes information.
-        """,
-        "difficulty_level": "intermediate",
-        "reading_time": 12,
-        "key_concepts": ["working memory", "schemas", "intrinsic load", "extraneous load", "germane load"],
-        "related_topics": ["Working Memory", "Schema Theory", "Instructional Design"],
-        "psychologists": ["John Sweller", "Richard Mayer", "George Miller"],
-        "experiments": ["Dual-task paradigm", "Split-attention studies"]
-    },
-    {
-        "title": "Working Memory",
-        "category": "Cognitive Psychology",
-        "subcategory": "Memory Systems",
-        "content": """
-# Working Memory
-
-Working memory is a cognitive system responsible for temporarily holding and manipulating information during complex cognitive tasks. Unlike short-term memory, which simply stores information, working memory actively processes and transforms data.
-
-## Baddeley's Model of Working Memory
-
-### Central Executive
-The central executive is the supervisory component that:
-- Controls attention and coordinates information
-- Manages the flow of information between subsystems
-- Switches between tasks and strategies
-- Has limited capacity and is effortful to use
-
-### Phonological Loop
-The phonological loop processes verbal and acoustic information:
-- **Phonological Store**: Holds speech-based information for 1-2 seconds
-- **Articulatory Control Process**: Refreshes information through subvocal rehearsal
-- Explains why we can remember phone numbers by repeating them
-
-### Visuospatial Sketchpad
-The visuospatial sketchpad handles visual and spatial information:
-- Processes images, colors, shapes, and spatial relationships
-- Allows mental rotation and navigation
-- Important for tasks like following directions or solving puzzles
-
-### Episodic Buffer
-Added later to the model, the episodic buffer:
-- Integrates information from different sources
-- Links working memory to long-term memory
-- Creates coherent episodes from fragmented information
-
-## Capacity Limitations
-
-### Miller's Magic Number
-George Miller proposed that working memory can hold 7±2 items, but modern research suggests:
-- The actual capacity is closer to 4±1 chunks
-- Capacity varies with the type of information
-- Individual differences exist in working memory span
-
-### Duration Limitations
-Information in working memory typically lasts:
-- 15-30 seconds without rehearsal
-- Can be extended through active maintenance
-- Decays rapidly unless refreshed
-
-## Functions of Working Memory
-
-### Complex Cognitive Tasks
-Working memory is crucial for:
-- Reading comprehension
-- Mathematical problem-solving
-- Reasoning and decision-making
-- Language comprehension and production
-
-### Learning and Education
-Working memory capacity predicts:
-- Academic achievement
-- Learning difficulties
-- Response to educational interventions
-- Ability to follow instructions
-
-## Individual Differences
-
-### Working Memory Span
-People vary in their working memory capacity:
-- High-span individuals perform better on complex tasks
-- Low-span individuals may struggle with multitasking
-- Capacity can be measured through various span tasks
-
-### Age-Related Changes
-Working memory shows developmental patterns:
-- Increases during childhood and adolescence
-- Peaks in early adulthood
-- Gradually declines with aging
-
-## Clinical Implications
-
-### ADHD
-Individuals with ADHD often show:
-- Reduced working memory capacity
-- Difficulties with central executive functions
-- Problems with task switching and inhibition
-
-### Learning Disabilities
-Working memory deficits are associated with:
-- Dyslexia and reading difficulties
-- Mathematical learning disabilities
-- Language processing disorders
-
-## Enhancement and Training
-
-### Working Memory Training
-Research on improving working memory includes:
-- Computerized training programs
-- Mixed evidence for transfer to other tasks
-- Debate about the effectiveness of training
-
-### Strategies for Support
-Practical approaches to support working memory:
-- Breaking complex tasks into smaller steps
-- Using external memory aids
-- Reducing cognitive load
-- Providing clear instructions
-
-Working memory is fundamental to human cognition and plays a crucial role in learning, problem-solving, and daily functioning. Understanding its mechanisms and limitations helps in education, therapy, and cognitive enhancement efforts.
-        """,
-        "difficulty_level": "intermediate",
-        "reading_time": 15,
-        "key_concepts": ["central executive", "phonological loop", "visuospatial sketchpad", "episodic buffer", "capacity limitations"],
-        "related_topics": ["Cognitive Load Theory", "Short-term Memory", "Executive Functions"],
-        "psychologists": ["Alan Baddeley", "Graham Hitch", "George Miller"],
-        "experiments": ["Working Memory Span Tasks", "Dual-task Studies"]
-    },
-    
-    # DEVELOPMENTAL PSYCHOLOGY
-    {
-        "title": "Attachment Theory",
-        "category": "Developmental Psychology",
-        "subcategory": "Early Development",
-        "content": """
-# Attachment Theory
-
-Attachment theory, developed by John Bowlby and Mary Ainsworth, explains the emotional bonds that develop between children and their primary caregivers. This theory has profound implications for understanding human relationships, emotional development, and mental health across the lifespan.
-
-## Historical Development
-
-### John Bowlby's Contributions
-Bowlby, influenced by ethology and psychoanalysis, proposed that attachment behaviors are innate and serve an evolutionary function - keeping infants close to caregivers for protection and survival.
-
-### Mary Ainsworth's Research
-Ainsworth's observational studies, particularly the Strange Situation procedure, identified different patterns of attachment and provided empirical support for Bowlby's theory.
-
-## Core Principles
-
-### Attachment Behavioral System
-Infants are born with an innate behavioral system designed to maintain proximity to caregivers. This system is activated by:
-- Separation from the caregiver
-- Perceived threats or danger
-- Illness or fatigue
-- Unfamiliar environments
-
-### Internal Working Models
-Children develop mental representations of themselves, others, and relationships based on their early attachment experiences. These models influence:
-- Expectations about relationships
-- Self-worth and self-concept
-- Emotional regulation strategies
-- Social behavior patterns
-
-## Attachment Styles
-
-### Secure Attachment (approximately 60-65% of children)
-**Characteristics:**
-- Uses caregiver as a secure base for exploration
-- Shows distress when separated but is easily comforted upon reunion
-- Develops positive internal working models of self and others
-
-**Adult relationships:**
-- Comfortable with intimacy and independence
-- Effective communication and conflict resolution
-- Higher relationship satisfaction
-
-### Insecure-Avoidant Attachment (approximately 20-25%)
-**Characteristics:**
-- Shows little distress during separation
-- Avoids or ignores caregiver upon reunion
-- Appears independent but may suppress emotional needs
-
-**Adult relationships:**
-- Uncomfortable with closeness
-- Values independence over intimacy
-- May have difficulty expressing emotions
-
-### Insecure-Ambivalent/Resistant Attachment (approximately 10-15%)
-**Characteristics:**
-- Shows intense distress during separation
-- Difficult to comfort upon reunion
-- Alternates between seeking comfort and resisting it
-
-**Adult relationships:**
-- Anxious about relationships
-- Fear of abandonment
-- May be perceived as clingy or demanding
-
-### Disorganized/Disoriented Attachment (approximately 5-10%)
-**Characteristics:**
-- Inconsistent and contradictory behaviors
-- May freeze, show stereotypical movements, or display fear of caregiver
-- Often associated with trauma or inconsistent caregiving
-
-**Adult relationships:**
-- Chaotic relationship patterns
-- Difficulty regulating emotions
-- Higher risk for mental health issues
-
-## Lifelong Impact
-
-### Childhood Development
-Secure attachment promotes:
-- Better emotional regulation
-- Higher self-esteem
-- More positive peer relationships
-- Greater resilience to stress
-
-### Adult Relationships
-Attachment styles influence:
-- Romantic relationships
-- Parenting behaviors
-- Friendships and social connections
-- Work relationships
-
-### Mental Health
-Insecure attachment patterns are associated with:
-- Higher rates of anxiety and depression
-- Personality disorders
-- Difficulty in therapeutic relationships
-- Increased vulnerability to trauma
-
-## Therapeutic Applications
-
-### Attachment-Based Therapy
-- Focuses on repairing and strengthening attachment relationships
-- Emphasizes the therapeutic relationship as a corrective emotional experience
-- Used with individuals, couples, and families
-
-### Parenting Interventions
-- Programs designed to promote secure attachment
-- Teaching sensitive and responsive caregiving
-- Supporting parents who experienced insecure attachment in their own childhood
-
-## Cultural Considerations
-
-While attachment theory is widely applicable, cultural variations exist in:
-- Caregiving practices
-- Values regarding independence vs. interdependence
-- Expression of attachment behaviors
-- Definition of sensitive caregiving
-
-## Current Research
-
-Modern attachment research explores:
-- Neurobiological correlates of attachment
-- Epigenetic factors in attachment transmission
-- Attachment in digital age relationships
-- Cross-cultural attachment patterns
-- Attachment in therapy and healing
-
-Attachment theory continues to be one of the most influential frameworks for understanding human relationships and emotional development, providing valuable insights for parents, educators, therapists, and anyone interested in human connection.
-        """,
-        "difficulty_level": "intermediate",
-        "reading_time": 15,
-        "key_concepts": ["secure base", "internal working models", "strange situation", "attachment styles"],
-        "related_topics": ["Child Development", "Social Psychology", "Therapeutic Relationships"],
-        "psychologists": ["John Bowlby", "Mary Ainsworth", "Harry Harlow"],
-        "experiments": ["Strange Situation", "Harlow's Monkey Studies"]
-    },
-    {
-        "title": "Piaget's Cognitive Development Theory",
-        "category": "Developmental Psychology",
-        "subcategory": "Cognitive Development",
-        "content": """
-# Piaget's Cognitive Development Theory
-
-Jean Piaget's theory of cognitive development describes how children's thinking develops through distinct stages. His work revolutionized our understanding of child development and continues to influence education and developmental psychology.
-
-## Core Concepts
-
-### Schemas
-Mental structures that organize knowledge and guide thinking:
-- **Definition**: Organized patterns of thought or behavior
-- **Function**: Help interpret and understand experiences
-- **Development**: Become more complex and sophisticated over time
-
-### Adaptation Processes
-
-**Assimilation**: Incorporating new information into existing schemas
-- Example: A child calls all four-legged animals "dogs"
-- Uses current understanding to interpret new experiences
-
-**Accommodation**: Changing schemas to fit new information
-- Example: Learning that cats are different from dogs
-- Requires modifying existing mental structures
-
-**Equilibration**: Balancing assimilation and accommodation
-- Drives cognitive development forward
-- Creates cognitive conflict that motivates learning
-
-## The Four Stages
-
-### Sensorimotor Stage (Birth to 2 years)
-
-**Key Characteristics:**
-- Learning through sensory experiences and motor actions
-- Development of object permanence
-- Beginning of symbolic thought
-
-**Major Achievements:**
-- **Object Permanence**: Understanding that objects exist even when not visible
-- **Cause and Effect**: Learning that actions have consequences
-- **Symbolic Representation**: Beginning to use symbols and language
-
-**Substages:**
-1. Reflexive actions (0-1 month)
-2. Primary circular reactions (1-4 months)
-3. Secondary circular reactions (4-8 months)
-4. Coordination of reactions (8-12 months)
-5. Tertiary circular reactions (12-18 months)
-6. Mental representation (18-24 months)
-
-### Preoperational Stage (2 to 7 years)
-
-**Key Characteristics:**
-- Rapid language development
-- Symbolic thinking emerges
-- Egocentric perspective dominates
-
-**Limitations:**
-- **Egocentrism**: Difficulty seeing other perspectives
-- **Centration**: Focusing on one aspect while ignoring others
-- **Irreversibility**: Cannot mentally reverse operations
-- **Animism**: Attributing life to inanimate objects
-
-**Conservation Tasks:**
-Children at this stage fail conservation tasks:
-- Number: Don't understand that quantity remains constant
-- Volume: Think taller containers hold more liquid
-- Mass: Believe shape changes affect amount
-
-### Concrete Operational Stage (7 to 11 years)
-
-**Key Characteristics:**
-- Logical thinking about concrete objects and situations
-- Understanding of conservation
-- Ability to classify and seriate
-
-**New Abilities:**
-- **Conservation**: Quantity remains constant despite changes in appearance
-- **Reversibility**: Can mentally reverse operations
-- **Classification**: Ability to group objects by shared characteristics
-- **Seriation**: Arranging objects in logical order
-
-**Limitations:**
-- Thinking is still tied to concrete, observable phenomena
-- Difficulty with abstract or hypothetical concepts
-- Limited ability to think about thinking (metacognition)
-
-### Formal Operational Stage (11+ years)
-
-**Key Characteristics:**
-- Abstract and hypothetical thinking
-- Scientific reasoning
-- Systematic problem-solving
-
-**New Abilities:**
-- **Hypothetical-Deductive Reasoning**: Can generate and test hypotheses
-- **Abstract Thinking**: Can think about concepts not tied to concrete objects
-- **Metacognition**: Thinking about thinking processes
-- **Idealistic Thinking**: Can imagine perfect worlds and solutions
-
-**Applications:**
-- Mathematical reasoning
-- Scientific method
-- Moral reasoning
-- Future planning
-
-## Educational Implications
-
-### Constructivist Learning
-- Students actively construct knowledge
-- Learning builds on prior knowledge
-- Discovery learning is emphasized
-
-### Developmental Readiness
-- Instruction should match cognitive stage
-- Cannot rush development through stages
-- Provide appropriate challenges
-
-### Active Learning
-- Hands-on experiences promote understanding
-- Encourage exploration and experimentation
-- Social interaction enhances learning
-
-## Criticisms and Limitations
-
-### Cultural Considerations
-- Theory based primarily on Western, middle-class children
-- Some cultures may emphasize different cognitive skills
-- Social and cultural factors influence development
-
-### Individual Differences
-- Not all children progress through stages at same rate
-- Some may show capabilities across multiple stages
-- Individual variation in cognitive abilities
-
-### Modern Research Findings
-- Infants may be more competent than Piaget suggested
-- Development may be more gradual than stage-like
-- Domain-specific development rather than general stages
-
-## Legacy and Modern Applications
-
-### Education
-- Constructivist teaching methods
-- Age-appropriate curriculum design
-- Emphasis on active learning
-
-### Child Development
-- Understanding of cognitive milestones
-- Assessment of developmental delays
-— Parenting and childcare practices
-
-Piaget's theory remains influential in understanding how children's thinking develops, despite some limitations. His emphasis on active construction of knowledge and developmental stages continues to inform educational practices and developmental research.
-        """,
-        "difficulty_level": "intermediate",
-        "reading_time": 18,
-        "key_concepts": ["schemas", "assimilation", "accommodation", "conservation", "egocentrism"],
-        "related_topics": ["Child Development", "Educational Psychology", "Constructivism"],
-        "psychologists": ["Jean Piaget", "Lev Vygotsky"],
-        "experiments": ["Conservation Tasks", "Three Mountains Task"]
-    },
-    
-    # SOCIAL PSYCHOLOGY
-    {
-        "title": "Social Identity Theory",
-        "category": "Social Psychology",
-        "subcategory": "Group Behavior",
-        "content": """
-# Social Identity Theory
-
-Social Identity Theory, developed by Henri Tajfel and John Turner, explains how individuals derive part of their identity from their membership in social groups. This theory has been instrumental in understanding intergroup relations, prejudice, discrimination, and social conflict.
-
-## Core Components
-
-### Personal Identity vs. Social Identity
-**Personal Identity** consists of unique individual characteristics, personal relationships, and individual achievements.
-
-**Social Identity** derives from membership in social groups and includes:
-- Emotional significance of group membership
-- Value placed on group membership
-- Sense of belonging to the group
-
-### Social Categorization
-People naturally categorize themselves and others into groups based on various characteristics:
-- Race and ethnicity
-- Gender
-- Age
-- Profession
-- Nationality
-- Religion
-- Political affiliation
-
-This categorization simplifies the social world but can lead to stereotyping and oversimplification.
-
-### Social Identification
-Once individuals categorize themselves as group members, they:
-- Adopt the group's norms and behaviors
-- Develop emotional attachment to the group
-- Experience the group's successes and failures as their own
-- Begin to see themselves in terms of group characteristics
-
-### Social Comparison
-Groups compare themselves with other groups to evaluate their:
-- Status and prestige
-- Abilities and achievements
-- Values and beliefs
-- Resources and power
-
-## In-Group vs. Out-Group Dynamics
-
-### In-Group Favoritism
-People tend to:
-- View in-group members more positively
-- Attribute positive behaviors of in-group members to internal factors
-- Provide more help and resources to in-group members
-- Show greater trust and cooperation with in-group members
-
-### Out-Group Derogation
-People may:
-- View out-group members more negatively
-- Attribute negative behaviors of out-group members to internal factors
-- Show less empathy for out-group members' suffering
-- Perceive out-group members as more homogeneous ("they're all the same")
-
-## Positive Distinctiveness
-
-Groups strive to maintain positive distinctiveness - viewing their group as better than others in meaningful ways. This can be achieved through:
-- **Social Competition**: Direct competition for resources or status
-- **Social Creativity**: Changing the dimensions of comparison or the values placed on different characteristics
-- **Social Mobility**: Individual attempts to leave the group for a higher-status group
-
-## Applications and Implications
-
-### Prejudice and Discrimination
-Social Identity Theory helps explain:
-- How prejudice develops and persists
-- Why discrimination occurs even without economic competition
-- The role of group membership in perpetuating inequality
-- How positive in-group identity can lead to negative out-group attitudes
-
-### Organizational Behavior
-In workplace settings, the theory explains:
-- Team dynamics and loyalty
-- Departmental conflicts
-- Mergers and acquisitions challenges
-- Diversity and inclusion initiatives
-
-### Intergroup Conflict
-The theory provides insights into:
-- Ethnic and racial conflicts
-- Religious tensions
-- Political polarization
-- International relations
-
-## Reducing Intergroup Bias
-
-### Contact Hypothesis
-Positive intergroup contact can reduce prejudice when:
-- Groups have equal status
-- Common goals exist
-- Cooperation is required
-- Authority figures support interaction
-
-### Superordinate Goals
-Creating shared objectives that require cooperation between groups can:
-- Reduce intergroup hostility
-- Build positive relationships
-- Create new, inclusive group identities
-
-### Recategorization
-Encouraging people to think of themselves as members of a larger, more inclusive group can reduce bias toward former out-group members.
-
-## Criticisms and Limitations
-
-### Individual Differences
-The theory may not account for:
-- Personality factors that influence group identification
-- Individual differences in need for belonging
-- Varying motivations for group membership
-
-### Context Dependency
-Group salience and importance can vary based on:
-- Situational factors
-- Cultural contexts
-- Personal experiences
-- Life circumstances
-
-### Complexity of Identity
-Modern individuals often have:
-- Multiple group memberships
-- Intersecting identities
-- Changing group affiliations
-- Conflicting group loyalties
-
-## Contemporary Research
-
-Current research in social identity explores:
-- **Digital Identities**: How online communities and social media affect identity formation
-- **Intersectionality**: How multiple group memberships interact
-- **Globalization Effects**: How global connectivity affects local group identities
-- **Neuroscience**: Brain mechanisms underlying in-group/out-group processing
-- **Collective Action**: How social identity motivates social and political movements
-
-## Practical Applications
-
-### Education
-- Designing inclusive curricula
-- Reducing bullying and school segregation
-- Promoting multicultural understanding
-- Creating positive classroom climates
-
-### Therapy and Counseling
-- Understanding identity-related mental health issues
-- Working with clients from marginalized groups
-- Addressing internalized oppression
-- Building positive group identity
-
-### Public Policy
-- Designing integration programs
-- Addressing systemic discrimination
-- Promoting social cohesion
-- Managing diversity in institutions
-
-Social Identity Theory continues to be relevant in our increasingly diverse and interconnected world, providing valuable insights into how group membership shapes individual behavior and intergroup relations.
-        """,
-        "difficulty_level": "advanced",
-        "reading_time": 18,
-        "key_concepts": ["social categorization", "in-group favoritism", "positive distinctiveness", "intergroup bias"],
-        "related_topics": ["Prejudice and Discrimination", "Group Dynamics", "Intergroup Contact"],
-        "psychologists": ["Henri Tajfel", "John Turner", "Gordon Allport"],
-        "experiments": ["Minimal Group Paradigm", "Robbers Cave Study"]
-    },
-    {
-        "title": "Attribution Theory",
-        "category": "Social Psychology",
-        "subcategory": "Social Cognition",
-        "content": """
-# Attribution Theory
-
-Attribution theory examines how people explain the causes of behavior and events. Developed by Fritz Heider and expanded by others, this theory helps us understand how we make sense of our social world and the consequences of our explanations.
-
-## Types of Attributions
-
-### Internal vs. External Attributions
-
-**Internal (Dispositional) Attributions**
-- Explain behavior in terms of personal characteristics
-- Focus on personality traits, abilities, or attitudes
-- Example: "She succeeded because she's smart"
-
-**External (Situational) Attributions**
-- Explain behavior in terms of environmental factors
-- Focus on circumstances, social pressures, or luck
-- Example: "She succeeded because the test was easy"
-
-### Stable vs. Unstable Attributions
-
-**Stable Attributions**
-- Causes that are relatively permanent
-- Examples: Ability, personality traits
-- Lead to expectations of consistency
-
-**Unstable Attributions**
-- Causes that can change over time
-- Examples: Effort, mood, luck
-- Allow for future change
-
-### Controllable vs. Uncontrollable Attributions
-
-**Controllable Attributions**
-- Factors that can be influenced by the person
-- Examples: Effort, strategy, preparation
-- Lead to responsibility and accountability
-
-**Uncontrollable Attributions**
-- Factors beyond personal control
-- Examples: Ability, task difficulty, luck
-- Reduce personal responsibility
-
-## Attribution Theories and Models
-
-### Heider's Naive Psychology
-Fritz Heider proposed that people are "naive scientists" who:
-- Seek to understand cause-and-effect relationships
-- Want to predict and control their environment
-- Use common-sense psychology to explain behavior
-
-### Jones and Davis's Correspondent Inference Theory
-Explains how we infer personality traits from behavior:
-- **Correspondent Inference**: Behavior reflects underlying dispositions
-- **Non-common Effects**: Focus on unique outcomes of chosen actions
-- **Social Desirability**: Unexpected behaviors are more informative
-- **Choice**: Freely chosen behaviors are more telling
-
-### Kelley's Covariation Model
-Uses three types of information to determine attributions:
-
-**Consensus**: How others behave in the same situation
-- High consensus = External attribution
-- Low consensus = Internal attribution
-
-**Distinctiveness**: How the person behaves in other situations
-- High distinctiveness = External attribution
-- Low distinctiveness = Internal attribution
-
-**Consistency**: How the person behaves over time
-- High consistency = Stable attribution
-- Low consistency = Unstable attribution
-
-### Weiner's Attribution Theory
-Focuses on achievement contexts with three dimensions:
-- **Locus**: Internal vs. External
-- **Stability**: Stable vs. Unstable
-- **Controllability**: Controllable vs. Uncontrollable
-
-## Attribution Biases and Errors
-
-### Fundamental Attribution Error
-The tendency to:
-- Overestimate internal factors when explaining others' behavior
-- Underestimate situational influences
-- Example: Assuming someone is late because they're irresponsible, ignoring traffic
-
-### Actor-Observer Bias
-Different attribution patterns for self vs. others:
-- **Actor**: Explains own behavior with situational factors
-- **Observer**: Explains others' behavior with dispositional factors
-- Related to differences in information and perspective
-
-### Self-Serving Bias
-Tendency to make attributions that maintain positive self-image:
-- Attribute successes to internal factors
-- Attribute failures to external factors
-- Protects self-esteem but can hinder learning
-
-### Hostile Attribution Bias
-Tendency to interpret ambiguous actions as hostile:
-- Common in aggressive individuals
-- Leads to defensive or retaliatory responses
-- Can escalate conflicts unnecessarily
-
-## Cultural Differences in Attribution
-
-### Individualistic vs. Collectivistic Cultures
-
-**Individualistic Cultures** (e.g., US, Western Europe):
-- Emphasize personal responsibility
-- More likely to make dispositional attributions
-- Focus on individual traits and achievements
-
-**Collectivistic Cultures** (e.g., East Asia, Latin America):
-- Emphasize social context and relationships
-- More likely to make situational attributions
-- Focus on group harmony and social roles
-
-### Research Findings
-- East Asians show less fundamental attribution error
-- Cultural differences in self-serving bias
-- Different emphasis on effort vs. ability attributions
-
-## Applications and Implications
-
-### Education
-**Academic Achievement**:
-- Attributing failure to lack of effort (controllable) vs. lack of ability (uncontrollable)
-- Growth mindset vs. fixed mindset
-- Impact on motivation and persistence
-
-**Teacher Expectations**:
-- How teachers explain student performance
-- Self-fulfilling prophecies
-- Implications for educational equity
-
-### Mental Health
-
-**Depression and Attribution Styles**:
-- Depressive attribution style: Internal, stable, global attributions for negative events
-- Learned helplessness theory
-- Cognitive therapy addresses maladaptive attributions
-
-**Relationship Satisfaction**:
-- Happy couples make positive attributions for partner's behavior
-- Distressed couples show negative attribution patterns
-- Therapeutic interventions target attribution patterns
-
-### Workplace and Organizations
-
-**Performance Evaluation**:
-- Manager attributions affect employee ratings
-- Impact on promotion and development decisions
-- Bias in performance feedback
-
-**Team Dynamics**:
-- Attribution patterns affect group cohesion
-- Blame vs. problem-solving orientations
-- Leadership and accountability
-
-## Interventions and Training
-
-### Attribution Retraining
-Programs designed to change maladaptive attribution patterns:
-- Focus on effort and strategy attributions
-- Reduce helplessness and improve performance
-- Applications in education and therapy
-
-### Perspective-Taking
-Encouraging consideration of alternative explanations:
-- Reduces fundamental attribution error
-- Improves empathy and understanding
-- Useful in conflict resolution
-
-### Mindfulness and Reflection
-Practices that promote awareness of attribution processes:
-- Reduce automatic biased attributions
-- Encourage more thoughtful explanations
-- Improve interpersonal relationships
-
-Attribution theory provides crucial insights into how we understand social behavior and the consequences of our explanations. Understanding these processes can improve decision-making, relationships, and personal well-being.
-        """,
-        "difficulty_level": "intermediate",
-        "reading_time": 16,
-        "key_concepts": ["internal attribution", "external attribution", "fundamental attribution error", "self-serving bias"],
-        "related_topics": ["Social Cognition", "Cognitive Biases", "Cultural Psychology"],
-        "psychologists": ["Fritz Heider", "Edward Jones", "Harold Kelley", "Bernard Weiner"],
-        "experiments": ["Castro Essay Study", "Quiz Show Study"]
-    },
-    
-    # CLINICAL PSYCHOLOGY
-    {
-        "title": "Major Depressive Disorder",
-        "category": "Clinical Psychology",
-        "subcategory": "Mood Disorders",
-        "content": """
-# Major Depressive Disorder (MDD)
-
-Major Depressive Disorder is one of the most common and serious mental health conditions, characterized by persistent feelings of sadness, hopelessness, and loss of interest in activities. It significantly impacts daily functioning and quality of life.
-
-## Diagnostic Criteria (DSM-5)
-
-To be diagnosed with MDD, an individual must experience **five or more** of the following symptoms during the same 2-week period, with at least one symptom being either (1) depressed mood or (2) loss of interest/pleasure:
-
-### Core Symptoms
-1. **Depressed mood** most of the day, nearly every day
-2. **Markedly diminished interest or pleasure** in all or almost all activities (anhedonia)
-3. **Significant weight loss or gain** (5% of body weight in a month) or decrease/increase in appetite
-4. **Insomnia or hypersomnia** nearly every day
-5. **Psychomotor agitation or retardation** observable by others
-6. **Fatigue or loss of energy** nearly every day
-7. **Feelings of worthlessness or inappropriate guilt** nearly every day
-8. **Diminished ability to think or concentrate** or indecisiveness nearly every day
-9. **Recurrent thoughts of death** or suicidal ideation
-
-### Functional Impairment
-Symptoms must cause clinically significant distress or impairment in:
-- Social functioning
-- Occupational performance
-- Other important areas of life
-
-## Epidemiology
-
-### Prevalence
-- **Lifetime prevalence**: Approximately 10-15% of the general population
-- **12-month prevalence**: About 6-7% of adults
-- **Gender differences**: Women are twice as likely as men to experience MDD
-- **Age of onset**: Often begins in late teens to early twenties
-
-### Risk Factors
-**Biological:**
-- Genetic predisposition (40-50% heritability)
-- Neurotransmitter imbalances (serotonin, norepinephrine, dopamine)
-- Hormonal changes
-- Medical conditions
-
-**Psychological:**
-- Cognitive distortions
-- Negative thinking patterns
-- Low self-esteem
-- Poor coping skills
-
-**Social/Environmental:**
-- Chronic stress
-- Trauma and abuse
-- Social isolation
-- Socioeconomic disadvantage
-- Life transitions and losses
-
-## Neurobiological Factors
-
-### Neurotransmitter Systems
-**Monoamine Hypothesis:**
-- Reduced activity of serotonin, norepinephrine, and dopamine
-- Basis for many antidepressant medications
-- Oversimplified but still clinically relevant
-
-**Modern Understanding:**
-- Complex interactions between multiple neurotransmitter systems
-- GABA and glutamate also involved
-- Neuroplasticity and brain connectivity changes
-
-### Brain Structure and Function
-**Neuroimaging findings:**
-- Reduced hippocampal volume
-- Decreased prefrontal cortex activity
-- Hyperactive amygdala
-- Altered default mode network connectivity
-
-### HPA Axis Dysfunction
-- Chronic activation of stress response system
-- Elevated cortisol levels
-- Disrupted circadian rhythms
-- Impact on immune function
-
-## Psychological Theories
-
-### Cognitive Theory (Aaron Beck)
-**Cognitive Triad:**
-1. Negative views of self
-2. Negative views of the world
-3. Negative views of the future
-
-**Common Cognitive Distortions:**
-- All-or-nothing thinking
-- Catastrophizing
-- Mind reading
-- Emotional reasoning
-- Personalization
-
-### Learned Helplessness (Martin Seligman)
-- Depression results from learning that one has no control over negative events
-- Leads to generalized sense of helplessness
-- Basis for understanding hopelessness in depression
-
-### Behavioral Activation Theory
-- Depression maintained by reduced activity and avoidance
-- Loss of positive reinforcement
-- Negative feedback loops between mood and behavior
-
-## Types and Specifiers
-
-### Major Depressive Episodes
-- Single episode
-- Recurrent episodes
-
-### Specifiers
-- **With anxious distress**
-- **With mixed features** (some manic symptoms)
-- **With melancholic features** (severe anhedonia, worse in morning)
-- **With psychotic features**
-- **With catatonic features**
-- **With seasonal pattern** (seasonal affective disorder)
-- **With postpartum onset**
-
-## Treatment Approaches
-
-### Psychotherapy
-**Cognitive Behavioral Therapy (CBT):**
-- Most extensively researched
-- Focuses on changing negative thought patterns
-- Behavioral activation components
-- Typically 12-20 sessions
-
-**Interpersonal Therapy (IPT):**
-- Focuses on relationship issues
-- Addresses grief, disputes, transitions, deficits
-- Time-limited (12-16 sessions)
-
-**Psychodynamic Therapy:**
-- Explores unconscious conflicts
-- Focuses on past relationships and experiences
-- Longer-term approach
-
-### Pharmacotherapy
-**First-line treatments:**
-- SSRIs (Selective Serotonin Reuptake Inhibitors)
-- SNRIs (Serotonin-Norepinephrine Reuptake Inhibitors)
-
-**Second-line treatments:**
-- Tricyclic antidepressants
-- MAOIs (Monoamine Oxidase Inhibitors)
-- Atypical antidepressants
-
-**Considerations:**
-- Trial period of 4-6 weeks
-- Side effect profiles vary
-- Genetic testing available for some medications
-
-### Combination Treatment
-- Psychotherapy + medication often most effective
-- Addresses both psychological and biological factors
-- Reduces relapse rates
-
-### Alternative Treatments
-- **Electroconvulsive Therapy (ECT)**: For severe, treatment-resistant cases
-- **Transcranial Magnetic Stimulation (TMS)**: Non-invasive brain stimulation
-- **Light Therapy**: Particularly for seasonal depression
-- **Exercise**: Significant antidepressant effects
-- **Mindfulness-Based Interventions**: Reduces relapse risk
-
-## Course and Prognosis
-
-### Natural Course
-- Without treatment, episodes typically last 6-12 months
-- High relapse rates (50-80% experience recurrent episodes)
-- Earlier onset associated with more chronic course
-- Residual symptoms increase relapse risk
-
-### Treatment Response
-- 60-70% respond to first antidepressant trial
-- 80-90% eventually respond to some treatment
-- Combination therapy improves outcomes
-- Maintenance treatment reduces relapse
-
-## Comorbidity
-
-**Common comorbid conditions:**
-- Anxiety disorders (50-70%)
-- Substance use disorders (30-40%)
-- Personality disorders
-- Medical conditions (cardiovascular disease, diabetes)
-
-## Prevention
-
-### Primary Prevention
-- Stress management
-- Social support
-- Healthy lifestyle
-- Early intervention for at-risk individuals
-
-### Relapse Prevention
-- Maintenance therapy
-- Recognizing early warning signs
-- Continuing therapy after recovery
-- Lifestyle modifications
-
-## Suicide Risk
-
-- 15% of individuals with severe depression die by suicide
-- Higher risk factors: hopelessness, social isolation, comorbid substance use
-- Assessment and safety planning essential
-- Crisis intervention resources crucial
-
-## Cultural Considerations
-
-- Expression of depression varies across cultures
-- Somatic symptoms more prominent in some cultures
-- Stigma affects help-seeking behavior
-- Cultural formulation important in treatment planning
-
-Major Depressive Disorder remains a significant public health challenge, but with proper diagnosis and evidence-based treatment, most individuals can achieve significant improvement in symptoms and quality of life. Ongoing research continues to refine our understanding and treatment approaches.
-        """,
-        "difficulty_level": "advanced",
-        "reading_time": 25,
-        "key_concepts": ["anhedonia", "cognitive triad", "monoamine hypothesis", "DSM-5 criteria"],
-        "related_topics": ["Cognitive Behavioral Therapy", "Bipolar Disorder", "Anxiety Disorders"],
-        "psychologists": ["Aaron Beck", "Martin Seligman", "Peter Lewinsohn"],
-        "experiments": ["Learned Helplessness Studies", "Cognitive Therapy Outcome Studies"]
-    },
-    {
-        "title": "Anxiety Disorders",
-        "category": "Clinical Psychology",
-        "subcategory": "Anxiety and Stress Disorders",
-        "content": """
-# Anxiety Disorders
-
-Anxiety disorders are among the most common mental health conditions, characterized by excessive fear, worry, and avoidance behaviors. They significantly impact daily functioning and quality of life, but are highly treatable with appropriate interventions.
-
-## Types of Anxiety Disorders
-
-### Generalized Anxiety Disorder (GAD)
-
-**Key Features:**
-- Excessive worry about multiple life domains
-- Difficulty controlling worry
-- Occurs more days than not for at least 6 months
-- Significant distress or impairment
-
-**Associated Symptoms:**
-- Restlessness or feeling keyed up
-- Being easily fatigued
-- Difficulty concentrating
-- Irritability
-- Muscle tension
-- Sleep disturbance
-
-### Panic Disorder
-
-**Panic Attacks:**
-Sudden episodes of intense fear with physical symptoms:
-- Palpitations or accelerated heart rate
-- Sweating and trembling
-- Shortness of breath or feelings of choking
-- Chest pain or discomfort
-- Nausea or abdominal distress
-- Dizziness or lightheadedness
-- Derealization or depersonalization
-- Fear of losing control or dying
-- Numbness or tingling
-- Chills or hot flashes
-
-**Panic Disorder Criteria:**
-- Recurrent unexpected panic attacks
-- At least one month of concern about additional attacks
-- Maladaptive changes in behavior related to attacks
-
-### Social Anxiety Disorder (Social Phobia)
-
-**Core Features:**
-- Marked fear of social or performance situations
-- Fear of negative evaluation by others
-- Social situations almost always provoke anxiety
-- Avoidance or endurance with intense distress
-- Impairment in social, occupational, or other functioning
-
-**Common Fears:**
-- Public speaking
-- Meeting new people
-- Eating or drinking in public
-- Using public restrooms
-- Writing in front of others
-
-### Specific Phobias
-
-**Characteristics:**
-- Marked fear of specific objects or situations
-- Immediate anxiety response to phobic stimulus
-- Recognition that fear is excessive (in adults)
-- Avoidance or intense distress
-- Impairment in functioning
-
-**Common Types:**
-- Animal phobias (spiders, snakes, dogs)
-- Natural environment (storms, heights, water)
-- Blood-injection-injury
-- Situational (elevators, flying, enclosed spaces)
-
-### Agoraphobia
-
-**Definition:**
-Fear of being in situations where escape might be difficult or embarrassing, or where help might not be available during a panic attack.
-
-**Common Situations:**
-- Using public transportation
-- Being in open spaces
-- Being in enclosed places
-- Standing in line or being in crowds
-- Being outside of home alone
-
-## Etiology and Risk Factors
-
-### Biological Factors
-
-**Genetics:**
-- Moderate heritability (30-50%)
-- Family clustering of anxiety disorders
-- Shared genetic vulnerabilities across anxiety disorders
-
-**Neurobiology:**
-- Overactive amygdala (fear center)
-- Dysregulation in fear circuitry
-- Neurotransmitter imbalances (GABA, serotonin, norepinephrine)
-- HPA axis dysfunction
-
-**Temperament:**
-- Behavioral inhibition in childhood
-- Negative affectivity and neuroticism
-- Anxiety sensitivity
-
-### Psychological Factors
-
-**Cognitive Factors:**
-- Catastrophic thinking
-- Overestimation of threat
-- Underestimation of coping ability
-- Attention bias toward threat
-
-**Learning Factors:**
-- Classical conditioning (learned fear associations)
-- Vicarious learning (observing others' fears)
-- Information transmission (warnings about dangers)
-- Operant conditioning (avoidance reinforced by anxiety reduction)
-
-### Environmental Factors
-
-**Childhood Experiences:**
-- Overprotective or rejecting parenting
-- Childhood trauma or abuse
-- Early separation experiences
-- Exposure to uncontrollable stressors
-
-**Life Stressors:**
-- Major life changes
-- Chronic stress
-- Medical illness
-- Substance use
-
-## Assessment and Diagnosis
-
-### Clinical Interview
-- Detailed symptom history
-- Onset and course of symptoms
-- Functional impairment assessment
-- Medical and psychiatric history
-- Family history of mental health conditions
-
-### Standardized Measures
-- **Beck Anxiety Inventory (BAI)**
-- **Generalized Anxiety Disorder 7-item (GAD-7)**
-- **Social Phobia Inventory (SPIN)**
-- **Panic Disorder Severity Scale (PDSS)**
-
-### Differential Diagnosis
-Important to distinguish from:
-- Medical conditions (hyperthyroidism, cardiac problems)
-- Substance-induced anxiety
-- Other psychiatric disorders
-- Normal anxiety responses
-
-## Treatment Approaches
-
-### Cognitive Behavioral Therapy (CBT)
-
-**Core Components:**
-- **Psychoeducation**: Understanding anxiety and its symptoms
-- **Cognitive Restructuring**: Identifying and challenging anxious thoughts
-- **Exposure Therapy**: Gradual confrontation of feared situations
-- **Relaxation Training**: Progressive muscle relaxation, deep breathing
-- **Behavioral Experiments**: Testing the validity of catastrophic predictions
-
-**Exposure Techniques:**
-- **In Vivo Exposure**: Real-life confrontation of fears
-- **Imaginal Exposure**: Mental visualization of feared scenarios
-- **Interoceptive Exposure**: Deliberately inducing physical sensations
-- **Virtual Reality Exposure**: Computer-generated environments
-
-### Acceptance and Commitment Therapy (ACT)
-
-**Key Principles:**
-- Acceptance of anxious thoughts and feelings
-- Mindfulness and present-moment awareness
-- Values-based behavior change
-- Psychological flexibility
-
-### Pharmacotherapy
-
-**First-Line Medications:**
-- **SSRIs**: Sertraline, paroxetine, escitalopram
-- **SNRIs**: Venlafaxine, duloxetine
-- Generally well-tolerated with fewer side effects
-
-**Second-Line Options:**
-- **Tricyclic Antidepressants**: Imipramine, clomipramine
-- **MAOIs**: For treatment-resistant cases
-- **Atypical Antidepressants**: Bupropion, mirtazapine
-
-**Benzodiazepines:**
-- **Short-term use only** due to dependence risk
-- Effective for acute anxiety relief
-- Common medications: lorazepam, clonazepam, alprazolam
-- Concerns: tolerance, withdrawal, cognitive impairment
-
-### Combination Treatment
-- CBT plus medication often most effective
-- Addresses both psychological and biological aspects
-- May allow for lower medication doses
-- Reduces relapse rates
-
-## Prognosis and Course
-
-### Natural Course
-- Often chronic without treatment
-- Tends to fluctuate in severity
-- Early onset associated with more chronic course
-- Comorbidity common (depression, substance use)
-
-### Treatment Outcomes
-- CBT effective for 60-80% of patients
-- Medication response rates 50-70%
-- Combination treatment improves outcomes
-- Relapse prevention important
-
-## Prevention and Early Intervention
-
-### Primary Prevention
-- Stress management training
-- Resilience building programs
-- Early childhood interventions
-- Parenting programs to reduce risk factors
-
-### Secondary Prevention
-- Early identification of symptoms
-- School-based anxiety prevention programs
-- Brief interventions for at-risk individuals
-- Screening in primary care settings
-
-## Special Considerations
-
-### Children and Adolescents
-- Developmental considerations in assessment
-- Family involvement in treatment
-- School-based interventions
-- Age-appropriate exposure exercises
-
-### Older Adults
-- Medical comorbidities
-- Medication interactions
-- Late-onset anxiety often related to medical conditions
-- Cognitive changes may affect treatment
-
-### Cultural Factors
-- Cultural expressions of anxiety vary
-- Stigma may affect help-seeking
-- Cultural formulation important
-- Adapt treatments to cultural context
-
-Anxiety disorders are highly treatable conditions with appropriate intervention. Early identification and evidence-based treatment can significantly improve outcomes and quality of life for individuals with these conditions.
-        """,
-        "difficulty_level": "advanced",
-        "reading_time": 22,
-        "key_concepts": ["panic attacks", "GAD", "social anxiety", "phobias", "exposure therapy"],
-        "related_topics": ["Cognitive Behavioral Therapy", "Panic Disorder", "PTSD"],
-        "psychologists": ["Aaron Beck", "David Clark", "David Barlow"],
-        "experiments": ["Little Albert Experiment", "Fear Conditioning Studies"]
-    },
-    
-    # NEUROPSYCHOLOGY
-    {
-        "title": "Neuroplasticity",
-        "category": "Neuropsychology",
-        "subcategory": "Brain Function",
-        "content": """
-# Neuroplasticity
-
-Neuroplasticity, also known as brain plasticity, refers to the brain's remarkable ability to reorganize, adapt, and change throughout life. This fundamental property allows the nervous system to modify its structure and function in response to experience, learning, injury, and environmental demands.
-
-## Types of Neuroplasticity
-
-### Structural Plasticity
-Physical changes in brain anatomy:
-- **Synaptic Plasticity**: Changes in synaptic strength and connections
-- **Dendritic Plasticity**: Growth and pruning of dendritic branches
-- **Axonal Plasticity**: Sprouting of new axonal connections
-- **Neurogenesis**: Birth of new neurons (primarily in hippocampus)
-
-### Functional Plasticity
-Changes in how brain regions function:
-- **Cortical Remapping**: Reassignment of functions to different brain areas
-- **Cross-modal Plasticity**: One sensory modality taking over another's territory
-- **Compensatory Plasticity**: Alternative brain regions compensating for damaged areas
-
-## Mechanisms of Plasticity
-
-### Synaptic Mechanisms
-
-**Long-term Potentiation (LTP)**:
-- Persistent strengthening of synapses
-- Key mechanism for learning and memory
-- "Neurons that fire together, wire together"
-
-**Long-term Depression (LTD)**:
-- Persistent weakening of synapses
-- Important for forgetting and synaptic homeostasis
-- Prevents synaptic saturation
-
-**Spike-timing Dependent Plasticity (STDP)**:
-- Precise timing of pre and postsynaptic activity
-- Determines whether synapses strengthen or weaken
-- Critical for information processing
-
-### Molecular Mechanisms
-
-**Neurotrophic Factors**:
-- **BDNF (Brain-Derived Neurotrophic Factor)**: Promotes neuronal survival and growth
-- **CNTF (Ciliary Neurotrophic Factor)**: Supports neuronal development
-- **NGF (Nerve Growth Factor)**: Essential for neuron maintenance
-
-**Gene Expression Changes**:
-- Activity-dependent gene transcription
-- Immediate early genes (c-fos, c-jun)
-- Protein synthesis for structural changes
-
-### Cellular Mechanisms
-
-**Glial Cell Involvement**:
-- **Astrocytes**: Support synaptic function and plasticity
-- **Microglia**: Synaptic pruning and immune responses
-- **Oligodendrocytes**: Myelination changes
-
-**Epigenetic Modifications**:
-- DNA methylation
-- Histone modifications
-- Non-coding RNA regulation
-
-## Developmental Plasticity
-
-### Critical Periods
-Time windows of heightened plasticity:
-- **Visual System**: First few years of life
-- **Language**: Birth to puberty
-- **Social Skills**: Early childhood
-- **Music**: Early to mid-childhood
-
-### Experience-Expectant Plasticity
-Brain development depends on expected environmental input:
-- Basic sensory and motor systems
-- Requires normal environmental stimulation
-- Leads to permanent deficits if missing
-
-### Experience-Dependent Plasticity
-Brain changes based on individual experiences:
-- Learning-induced modifications
-- Continues throughout life
-- Highly variable between individuals
-
-## Adult Neuroplasticity
-
-### Learning-Induced Changes
-
-**Skill Acquisition**:
-- London taxi drivers: enlarged hippocampus
-- Musicians: expanded motor and auditory cortices
-- Jugglers: increased visual-motor areas
-
-**Cognitive Training**:
-- Working memory training effects
-- Attention training modifications
-- Executive function improvements
-
-### Environmental Enrichment
-
-**Components of Enriched Environments**:
-- Physical activity and exercise
-- Social interaction and stimulation
-- Cognitive challenges and novelty
-- Stress reduction
-
-**Effects on the Brain**:
-- Increased neurogenesis
-- Enhanced synaptic density
-- Improved cognitive function
-- Reduced age-related decline
-
-## Plasticity in Response to Injury
-
-### Stroke Recovery
-
-**Mechanisms of Recovery**:
-- **Diaschisis Resolution**: Recovery of temporarily impaired brain areas
-- **Redundancy**: Parallel pathways taking over function
-- **Compensatory Reorganization**: Alternative brain areas assuming functions
-- **Neurogenesis**: New neurons in some brain regions
-
-**Factors Affecting Recovery**:
-- Age at time of injury
-- Size and location of lesion
-- Time since injury
-- Rehabilitation intensity
-- Environmental factors
-
-### Spinal Cord Injury
-
-**Plasticity Mechanisms**:
-- Sprouting of intact fibers
-- Strengthening of weak connections
-- Circuit reorganization
-- Compensatory strategies
-
-**Rehabilitation Approaches**:
-- Activity-based therapies
-- Electrical stimulation
-- Pharmacological interventions
-- Brain-computer interfaces
-
-## Factors Influencing Plasticity
-
-### Age-Related Changes
-
-**Childhood and Adolescence**:
-- Highest levels of plasticity
-- Extensive synaptic pruning
-- Myelination continues
-- Critical period effects
-
-**Adulthood**:
-- Continued but reduced plasticity
-- Experience-dependent changes
-- Maintenance and optimization
-- Compensatory mechanisms
-
-**Aging**:
-- Decreased but present plasticity
-- Compensatory brain activation
-- Cognitive reserve effects
-- Vulnerability to pathology
-
-### Physical Exercise
-
-**Mechanisms**:
-- Increased BDNF production
-- Enhanced neurogenesis
-- Improved vascular health
-- Reduced inflammation
-
-**Effects**:
-- Better cognitive function
-- Reduced depression and anxiety
-- Slower age-related decline
-- Enhanced memory and learning
-
-### Sleep and Plasticity
-
-**Sleep Functions**:
-- Memory consolidation
-- Synaptic homeostasis
-- Waste clearance
-- Growth hormone release
-
-**Sleep Deprivation Effects**:
-- Impaired plasticity
-- Reduced learning capacity
-- Memory consolidation deficits
-- Cognitive performance decline
-
-## Clinical Applications
-
-### Rehabilitation Medicine
-
-**Principles**:
-- Use-dependent plasticity
-- Task-specific training
-- Intensive practice
-- Progressive challenges
-
-**Techniques**:
-- Constraint-induced movement therapy
-- Functional electrical stimulation
-- Virtual reality training
-- Brain stimulation techniques
-
-### Mental Health Treatment
-
-**Depression and Anxiety**:
-- Antidepressants enhance plasticity
-- Psychotherapy induces brain changes
-- Mindfulness training effects
-- Exercise interventions
-
-**PTSD and Trauma**:
-- Memory reconsolidation
-- Exposure therapy mechanisms
-- Fear extinction learning
-- Stress resilience building
-
-### Educational Implications
-
-**Learning Strategies**:
-- Spaced repetition
-- Interleaved practice
-- Active retrieval
-- Elaborative encoding
-
-**Educational Environment**:
-- Rich, stimulating classrooms
-- Physical activity integration
-- Social learning opportunities
-- Stress reduction techniques
-
-## Future Directions
-
-### Enhancement Techniques
-
-**Brain Stimulation**:
-- Transcranial magnetic stimulation (TMS)
-- Transcranial direct current stimulation (tDCS)
-- Deep brain stimulation (DBS)
-- Optogenetics (experimental)
-
-**Pharmacological Enhancement**:
-- Nootropics and cognitive enhancers
-- BDNF modulators
-- Neurotransmitter enhancers
-- Anti-aging compounds
-
-### Research Frontiers
-
-**Technology Integration**:
-- Brain-computer interfaces
-- Neurofeedback systems
-- Virtual and augmented reality
-- Artificial intelligence applications
-
-**Precision Medicine**:
-- Genetic factors in plasticity
-- Personalized interventions
-- Biomarker development
-- Individual optimization strategies
-
-Neuroplasticity represents one of the most exciting and important discoveries in neuroscience, offering hope for recovery from brain injury, enhancement of learning and memory, and maintenance of cognitive function throughout life. Understanding and harnessing these mechanisms continues to drive innovation in medicine, education, and human enhancement.
-        """,
-        "difficulty_level": "advanced",
-        "reading_time": 20,
-        "key_concepts": ["synaptic plasticity", "LTP", "neurogenesis", "critical periods", "BDNF"],
-        "related_topics": ["Learning and Memory", "Brain Development", "Stroke Recovery"],
-        "psychologists": ["Donald Hebb", "Eric Kandel", "Michael Merzenich"],
-        "experiments": ["Hubel and Wiesel Studies", "London Taxi Driver Study"]
-    }
-]
+# Registered before shutdown_db_client so queued messages are written while the client is open
+@app.on_event("shutdown")
+async def drain_chat_writer():
+    """Write any chat messages still queued"""
+    await chat_writer.stop()
 
 # Initialize sample data
 @app.on_event("startup")
 async def initialize_data():
-    """Initialize database with sample psychology topics"""
+    """Seed the sample psychology topics, writing only new or edited ones"""
     try:
-        # Check if topics already exist
-        existing_count = await db.psychology_topics.count_documents({})
-        if existing_count == 0:
-            # Insert sample topics
-            for topic_data in sample_topics:
-                topic = PsychologyTopic(**topic_data)
-                await db.psychology_topics.insert_one(topic.dict())
-            logging.info(f"Initialized {len(sample_topics)} sample psychology topics")
+        # Loaded here only, so the corpus is garbage once seeding returns
+        result = await seed_topics(
+            db.psychology_topics, load_seed_topics(), lambda topic_data: PsychologyTopic(**topic_data).dict()
+        )
+        if result.changed:
+            await recompute_stats(db)
+            logging.info(
+                f"Seeded sample psychology topics: {result.inserted} inserted, "
+                f"{result.updated} updated, {result.unchanged} unchanged"
+            )
     except Exception as e:
         logging.error(f"Error initializing data: {e}")
 
+@app.on_event("startup")
+async def build_search_index():
+    """Load every topic into the in-process BM25 search index, topic graph and prompt context cache"""
+    search_index.clear()
+    topic_graph.clear()
+    async for topic in db.psychology_topics.find({}, {"_id": 0}):
+        search_index.add(topic)
+        topic_graph.add(topic)
+        topic_sync.seen([topic])
+        if len(prompt_contexts) < prompt_contexts.max_topics:
+            prompt_contexts.add(topic)
+    logging.info(f"Search index built with {len(search_index)} topics")
+    logging.info(f"Topic graph built: {topic_graph.stats()}")
+
+@app.on_event("startup")
+async def start_topic_sync():
+    topic_sync.start()
+
+@app.on_event("shutdown")
+async def stop_topic_sync():
+    await topic_sync.stop()
+
+def apply_remote_topics(topics: List[dict]):
+    """Bring this worker's in-process indexes and caches up to date with topics written elsewhere"""
+    for topic in topics:
+        search_index.add(topic)
+        topic_graph.add(topic)
+    topics_changed([topic["id"] for topic in topics])
+
+def requested_fields(fields: str) -> set:
+    """Parse a comma-separated fields= selector, rejecting unknown topic fields"""
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(PsychologyTopic.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+def topic_projection(fields: Optional[str]) -> dict:
+    """Mongo projection for a fields= selector; no selector means summary fields only"""
+    if not fields:
+        return SUMMARY_PROJECTION
+    if fields == "all":
+        return {"_id": 0}
+    return {"_id": 0, "created_at": 1, **{name: 1 for name in requested_fields(fields)}}
+
+def shape_topics(topics: List[dict], fields: Optional[str]) -> List[Union[TopicSummary, PsychologyTopic, dict]]:
+    """Wrap projected topic documents in the model matching the fields= selector"""
+    if not fields:
+        return [TopicSummary(**topic) for topic in topics]
+    if fields == "all":
+        return [PsychologyTopic(**topic) for topic in topics]
+    requested = requested_fields(fields)
+    return [{name: value for name, value in topic.items() if name in requested} for topic in topics]
+
+def parse_cursor(cursor: Optional[str], size: int) -> Optional[list]:
+    """Decode a page cursor from a query parameter, answering 400 if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        return decode_cursor(cursor, size)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def topics_changed(topic_ids: List[str]):
+    """Invalidate in-process caches derived from topics after a topic write"""
+    query_cache.bump_version()
+    for topic_id in topic_ids:
+        answer_cache.invalidate_topic(topic_id)
+        prompt_contexts.remove(topic_id)
+
+async def ranked_search(
+    query: str,
+    category: Optional[str],
+    difficulty_level: Optional[str],
+    limit: int,
+    projection: Optional[dict] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[dict], Optional[str]]:
+    """Run a BM25 query and load one page of matching topics in relevance order
+
+    Returns the topics and the cursor for the next page. Search pages are keyed
+    on (score, id), so the cursor skips straight past the previous page.
+    """
+    after = parse_cursor(cursor, 2)
+    try:
+        after_key = (float(after[0]), str(after[1])) if after else None
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    hits = search_index.search(
+        query, category=category, difficulty_level=difficulty_level, limit=limit + 1, after=after_key
+    )
+    following = None
+    if len(hits) > limit:
+        last_id, last_score = hits[limit - 1]
+        following = encode_cursor([last_score, last_id])
+        hits = hits[:limit]
+    if not hits:
+        return [], None
+    ids = [topic_id for topic_id, _ in hits]
+    topics = await db.psychology_topics.find({"id": {"$in": ids}}, projection).to_list(len(ids))
+    by_id = {topic["id"]: topic for topic in topics}
+    return [by_id[topic_id] for topic_id in ids if topic_id in by_id], following
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "PsychLearn API - Comprehensive Psychology Learning Platform"}
 
-@api_router.get("/topics", response_model=List[PsychologyTopic])
+FIELDS_DESCRIPTION = "Comma-separated topic fields to return, or 'all' for full topics (default: summary fields)"
+
+@api_router.get("/topics", responses={200: {"model": List[TopicSummary]}})
 async def get_topics(
     category: Optional[str] = Query(None, description="Filter by category"),
     difficulty_level: Optional[str] = Query(None, description="Filter by difficulty level"),
     search: Optional[str] = Query(None, description="Search in title and content"),
-    limit: int = Query(50, description="Maximum number of topics to return")
+    limit: int = Query(50, ge=1, description="Maximum number of topics to return"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    response: Response = None
 ):
-    """Get psychology topics with optional filtering and search"""
+    """Get psychology topics with optional filtering and search
+
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    projection = topic_projection(fields)
+    async def load():
+        if search:
+            return await ranked_search(search, category, difficulty_level, limit, projection, cursor)
+        return await list_topics(category, difficulty_level, limit, projection, cursor)
+
+    cache_key = (
+        "topics", normalize_text(category), difficulty_level, normalize_text(search),
+        limit, normalize_fields(fields), cursor,
+    )
+    topics, following = await query_cache.get_or_load(cache_key, load)
+    if following:
+        response.headers["X-Next-Cursor"] = following
+    return shape_topics(topics, fields)
+
+async def list_topics(
+    category: Optional[str],
+    difficulty_level: Optional[str],
+    limit: int,
+    projection: dict,
+    cursor: Optional[str],
+) -> Tuple[List[dict], Optional[str]]:
+    """Load one page of topics in (created_at, id) order and the cursor for the next page"""
     filter_query = {}
     
     if category:
@@ -1934,15 +464,9 @@ async def get_topics(
     if difficulty_level:
         filter_query["difficulty_level"] = difficulty_level
     
-    if search:
-        filter_query["$or"] = [
-            {"title": {"$regex": search, "$options": "i"}},
-            {"content": {"$regex": search, "$options": "i"}},
-            {"key_concepts": {"$regex": search, "$options": "i"}}
-        ]
-    
-    topics = await db.psychology_topics.find(filter_query).limit(limit).to_list(limit)
-    return [PsychologyTopic(**topic) for topic in topics]
+    filter_query = after_keyset(filter_query, TOPIC_SORT, parse_cursor(cursor, len(TOPIC_SORT)))
+    topics = await db.psychology_topics.find(filter_query, projection).sort(TOPIC_SORT).limit(limit + 1).to_list(limit + 1)
+    return topics[:limit], next_cursor(topics, TOPIC_SORT, limit)
 
 @api_router.get("/topics/{topic_id}", response_model=PsychologyTopic)
 async def get_topic(topic_id: str):
@@ -1952,16 +476,34 @@ async def get_topic(topic_id: str):
         raise HTTPException(status_code=404, detail="Topic not found")
     return PsychologyTopic(**topic)
 
+@api_router.get("/topics/{topic_id}/related")
+async def get_related_topics(
+    topic_id: str,
+    depth: int = Query(1, ge=1, le=TOPIC_GRAPH_MAX_DEPTH, description="Hops to follow from the topic"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum related topics returned")
+):
+    """Topics within `depth` related-topic hops, with the links between them and unresolved names"""
+    if topic_id not in topic_graph:
+        # Written by another worker since this one built its graph
+        topic = await db.psychology_topics.find_one({"id": topic_id}, GRAPH_PROJECTION)
+        if not topic:
+            raise HTTPException(status_code=404, detail="Topic not found")
+        topic_graph.add(topic)
+    return topic_graph.neighborhood(topic_id, depth, limit)
+
 @api_router.get("/categories")
 async def get_categories():
     """Get all available psychology categories"""
-    categories = await db.psychology_topics.distinct("category")
-    subcategories = await db.psychology_topics.distinct("subcategory")
-    
+    async def load():
+        categories = await db.psychology_topics.distinct("category")
+        subcategories = await db.psychology_topics.distinct("subcategory")
+        return categories, subcategories
+
+    categories, subcategories = await query_cache.get_or_load(("categories",), load)
     return {
         "categories": categories,
         "subcategories": subcategories,
-        "difficulty_levels": ["introductory", "intermediate", "advanced", "graduate"]
+        "difficulty_levels": DIFFICULTY_LEVELS
     }
 
 @api_router.get("/search")
@@ -1969,31 +511,22 @@ async def search_topics(
     q: str = Query(..., description="Search query"),
     category: Optional[str] = Query(None),
     difficulty: Optional[str] = Query(None),
-    limit: int = Query(20)
+    limit: int = Query(20, ge=1),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
 ):
-    """Advanced search for psychology topics"""
-    search_query = {
-        "$or": [
-            {"title": {"$regex": q, "$options": "i"}},
-            {"content": {"$regex": q, "$options": "i"}},
-            {"key_concepts": {"$regex": q, "$options": "i"}},
-            {"psychologists": {"$regex": q, "$options": "i"}},
-            {"experiments": {"$regex": q, "$options": "i"}}
-        ]
-    }
-    
-    if category:
-        search_query["category"] = {"$regex": category, "$options": "i"}
-    
-    if difficulty:
-        search_query["difficulty_level"] = difficulty
-    
-    topics = await db.psychology_topics.find(search_query).limit(limit).to_list(limit)
+    """Advanced search for psychology topics, ranked by BM25 relevance"""
+    projection = topic_projection(fields)
+    cache_key = ("search", normalize_text(q), normalize_text(category), difficulty, limit, normalize_fields(fields), cursor)
+    topics, following = await query_cache.get_or_load(
+        cache_key, lambda: ranked_search(q, category, difficulty, limit, projection, cursor)
+    )
     
     return {
         "query": q,
         "total_results": len(topics),
-        "results": [PsychologyTopic(**topic) for topic in topics]
+        "results": shape_topics(topics, fields),
+        "next_cursor": following
     }
 
 @api_router.post("/topics", response_model=PsychologyTopic)
@@ -2002,58 +535,94 @@ async def create_topic(topic: PsychologyTopicCreate):
     topic_dict = topic.dict()
     new_topic = PsychologyTopic(**topic_dict)
     await db.psychology_topics.insert_one(new_topic.dict())
+    search_index.add(new_topic.dict())
+    topic_graph.add(new_topic.dict())
+    topic_sync.seen([new_topic.dict()])
+    topics_changed([new_topic.id])
+    prompt_contexts.add(new_topic.dict())
+    await record_topics(db, [new_topic.dict()])
     return new_topic
 
-@api_router.get("/stats")
-async def get_stats():
-    """Get platform statistics"""
-    total_topics = await db.psychology_topics.count_documents({})
-    categories = await db.psychology_topics.distinct("category")
-    
-    # Count topics by category
-    category_counts = {}
-    for category in categories:
-        count = await db.psychology_topics.count_documents({"category": category})
-        category_counts[category] = count
-    
-    # Count by difficulty level
-    difficulty_counts = {}
-    for level in ["introductory", "intermediate", "advanced", "graduate"]:
-        count = await db.psychology_topics.count_documents({"difficulty_level": level})
-        difficulty_counts[level] = count
-    
+@api_router.post("/topics/import")
+async def import_topics(request: Request):
+    """Create many topics from a JSON array or an NDJSON stream (admin function)
+
+    Rows are validated and inserted in chunks; invalid rows are reported by
+    their 0-based index and do not stop the rest of the import. Search index,
+    caches and stats are updated once per chunk.
+    """
+    if is_ndjson(request.headers.get("content-type")):
+        rows = ndjson_rows(request.stream())
+    else:
+        try:
+            rows = json_array_rows(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid import body: {e}")
+
+    received = inserted = 0
+    errors: List[Dict[str, Any]] = []
+    async for chunk in chunked(rows, TOPIC_IMPORT_CHUNK_SIZE):
+        valid, chunk_errors = validate_chunk(topic_import_adapter, chunk, received)
+        received += len(chunk)
+        documents = [(index, PsychologyTopic(**topic.dict()).dict()) for index, topic in valid]
+        try:
+            new_topics, write_errors = await insert_chunk(db.psychology_topics, documents)
+        except Exception as e:
+            logger.error(f"Error importing topics: {str(e)}")
+            new_topics = []
+            write_errors = [{"index": index, "errors": [{"field": "__root__", "message": "Write failed"}]}
+                            for index, _ in documents]
+        errors.extend(sorted(chunk_errors + write_errors, key=lambda error: error["index"]))
+        if not new_topics:
+            continue
+        inserted += len(new_topics)
+        search_index.add_many(new_topics)
+        topic_graph.add_many(new_topics)
+        topic_sync.seen(new_topics)
+        topics_changed([topic["id"] for topic in new_topics])
+        for topic in new_topics:
+            if len(prompt_contexts) < prompt_contexts.max_topics:
+                prompt_contexts.add(topic)
+        await record_topics(db, new_topics)
+
     return {
-        "total_topics": total_topics,
-        "total_categories": len(categories),
-        "topics_by_category": category_counts,
-        "topics_by_difficulty": difficulty_counts
+        "received": received,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors[:TOPIC_IMPORT_MAX_REPORTED_ERRORS],
+        "errors_truncated": len(errors) > TOPIC_IMPORT_MAX_REPORTED_ERRORS,
     }
 
-@api_router.post("/ask", response_model=QuestionResponse)
-async def ask_question(request: QuestionRequest):
-    """AI-powered Q&A system for psychology topics"""
-    try:
-        # Get topic context if topic_id is provided
-        topic_context = ""
-        topic_title = None
-        
-        if request.topic_id:
-            topic = await db.psychology_topics.find_one({"id": request.topic_id})
-            if topic:
-                topic_title = topic["title"]
-                topic_context = f"""
+@api_router.get("/stats")
+async def get_stats():
+    """Get platform statistics from the materialized stats document"""
+    return await read_stats(db)
+
+@api_router.get("/admin/cache-stats")
+async def get_cache_stats():
+    """Hit/miss/eviction counters for the listing and search result cache (admin function)"""
+    return query_cache.stats()
+
+@api_router.post("/admin/stats/recompute")
+async def recompute_platform_stats():
+    """Rebuild platform statistics from the topics collection (admin function)"""
+    return await recompute_stats(db)
+
+def build_system_message(topic: Optional[dict]) -> str:
+    """Render the tutor system prompt for a session, with the topic overview when there is one"""
+    topic_context = ""
+    if topic:
+        topic_context = f"""
 Topic: {topic['title']}
 Category: {topic['category']}
 Difficulty: {topic['difficulty_level']}
 Key Concepts: {', '.join(topic.get('key_concepts', []))}
-Content: {topic['content'][:1500]}...
 
 Related Topics: {', '.join(topic.get('related_topics', []))}
 Key Psychologists: {', '.join(topic.get('psychologists', []))}
 """
-        
-        # Create system message for the AI
-        system_message = f"""You are PsychLearn AI, an expert psychology tutor and teaching assistant. You help students understand psychology concepts, theories, and research.
+    
+    return f"""You are PsychLearn AI, an expert psychology tutor and teaching assistant. You help students understand psychology concepts, theories, and research.
 
 Instructions:
 - Provide clear, accurate, and educational responses about psychology topics
@@ -2066,18 +635,108 @@ Instructions:
 
 Remember: You are here to help students learn psychology effectively."""
 
-        # Initialize the Gemini chat
-        chat = LlmChat(
-            api_key=os.environ.get('GEMINI_API_KEY'),
-            session_id=request.session_id,
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.0-flash").with_max_tokens(1000)
-        
-        # Create user message
-        user_message = UserMessage(text=request.question)
-        
-        # Get AI response
-        ai_response = await chat.send_message(user_message)
+# System prompt for questions that are not about a specific topic
+GENERAL_SYSTEM_MESSAGE = build_system_message(None)
+
+def build_user_prompt(context: Optional[TopicContext], question: str, history: str = "") -> str:
+    """The student's question, preceded by the conversation so far and the topic passages most relevant to it"""
+    sections = []
+    if history:
+        sections.append(f"Conversation So Far:\n{history}")
+    if context:
+        passages = "\n\n".join(passage.render() for passage in prompt_contexts.select(context, question))
+        sections.append(f"Relevant Content:\n{passages}")
+    if not sections:
+        return question
+    sections.append(f"Question: {question}")
+    return "\n\n".join(sections)
+
+def create_chat(session_id: str, context: Optional[TopicContext]):
+    """Chat for a session and topic
+
+    Not pooled: chats hold no history and the system message comes from the
+    prompt context cache, so creating one costs no more than the lookup.
+    """
+    return llm_provider.create_chat(session_id, context.system_message if context else GENERAL_SYSTEM_MESSAGE)
+
+async def iter_once(text: str) -> AsyncIterator[str]:
+    yield text
+
+async def load_memory(request: QuestionRequest) -> SessionMemory:
+    # A session id the client did not send was generated for this request, so it has no history
+    return await conversation_memory.load(request.session_id, new_session="session_id" not in request.model_fields_set)
+
+async def load_topic_context(topic_id: Optional[str]) -> Optional[TopicContext]:
+    """Prompt context for a topic, read from MongoDB only if it is not cached yet"""
+    if not topic_id:
+        return None
+    context = prompt_contexts.get(topic_id)
+    if context is None:
+        topic = await db.psychology_topics.find_one({"id": topic_id}, CONTEXT_PROJECTION)
+        if topic:
+            context = prompt_contexts.add(topic)
+    return context
+
+def fallback_answer(context: Optional[TopicContext], question: str) -> str:
+    """Answer built locally from the topic's key concepts and best-matching passages"""
+    if not context:
+        return ("The AI tutor is unavailable right now. Please try your question again in a moment, "
+                "or open a topic to read about it while you wait.")
+    lines = [f"The AI tutor is unavailable right now, so here is what the {context.title} material covers that relates to your question."]
+    if context.key_concepts:
+        lines.append(f"Key Concepts: {', '.join(context.key_concepts)}")
+    lines.extend(passage.render() for passage in prompt_contexts.select(context, question, top_k=FALLBACK_PASSAGES))
+    return "\n\n".join(lines)
+
+async def generate_answer(
+    request: QuestionRequest, history: str = "", queue_timeout: Optional[float] = None
+) -> Tuple[str, Optional[str], bool]:
+    """Ask the LLM on the request's session and cache the answer
+
+    Returns (answer, topic_title, fallback); fallback is True when the LLM was
+    unavailable and the answer was built locally instead. Answers that depend
+    on earlier turns (non-empty history) are not cached. queue_timeout
+    overrides how long to wait for an LLM slot.
+    """
+    # Get topic context if topic_id is provided
+    context = await load_topic_context(request.topic_id)
+    topic_title = context.title if context else None
+    
+    chat = create_chat(request.session_id, context)
+    
+    # Create user message
+    prompt = build_user_prompt(context, request.question, history)
+
+    # Get AI response
+    try:
+        ai_response = await llm_guard.call(lambda: chat.send(prompt), queue_timeout)
+    except (CircuitOpenError, OverloadedError) as e:
+        logger.warning(f"Answering locally: {str(e)}")
+        return fallback_answer(context, request.question), topic_title, True
+    except Exception as e:
+        logger.error(f"LLM call failed, answering locally: {e!r}")
+        return fallback_answer(context, request.question), topic_title, True
+    if not history:
+        answer_cache.put(request.topic_id, request.question, ai_response, topic_title)
+    return ai_response, topic_title, False
+
+@api_router.post("/ask", response_model=QuestionResponse)
+async def ask_question(request: QuestionRequest):
+    """AI-powered Q&A system for psychology topics"""
+    try:
+        history = conversation_memory.render(await load_memory(request))
+        # Follow-up questions depend on the conversation, so only first turns share answers
+        cached = answer_cache.get(request.topic_id, request.question) if not history else None
+        fallback = False
+        if cached:
+            ai_response = cached.answer
+            topic_title = cached.topic_title
+        elif not history:
+            # Identical questions already in flight share one LLM call
+            flight_key = (request.topic_id, normalize_question(request.question))
+            ai_response, topic_title, fallback = await ask_flight.do(flight_key, lambda: generate_answer(request))
+        else:
+            ai_response, topic_title, fallback = await generate_answer(request, history)
         
         # Store the conversation in database
         chat_message = ChatMessage(
@@ -2087,40 +746,386 @@ Remember: You are here to help students learn psychology effectively."""
             answer=ai_response,
         )
         
-        await db.chat_messages.insert_one(chat_message.dict())
+        await chat_writer.put(chat_message.dict())
+        await conversation_memory.append(request.session_id, chat_message.dict())
         
         return QuestionResponse(
             answer=ai_response,
             session_id=request.session_id,
-            topic_title=topic_title
+            topic_title=topic_title,
+            cached=cached is not None,
+            fallback=fallback
         )
         
     except Exception as e:
         logger.error(f"Error in ask_question: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to process question")
 
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events frame with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def answer_events(
+    request: QuestionRequest,
+    started: float,
+    context: Optional[TopicContext],
+    history: str,
+    cached: Optional[CachedAnswer],
+    chat: Optional[Any] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Stream one tutor turn as (event, data) pairs: `token`s, then `done` or `error`
+
+    Shared by the SSE and WebSocket channels. `started` is the
+    time.perf_counter() reading taken when the question arrived, so TTFB and
+    total include the caller's memory, cache and context lookups. Without a
+    `chat` held by the caller, one is created for the turn. If the LLM is
+    unavailable before the first token, the locally built fallback answer is
+    streamed instead.
+    """
+    topic_title = cached.topic_title if cached else (context.title if context else None)
+    first_token_at = None
+    parts = []
+    fallback = False
+    try:
+        if cached:
+            async for chunk in iter_once(cached.answer):
+                first_token_at = time.perf_counter()
+                parts.append(chunk)
+                yield "token", {"text": chunk}
+        else:
+            chat = chat or create_chat(request.session_id, context)
+            prompt = build_user_prompt(context, request.question, history)
+            try:
+                async with llm_guard.guarded() as call:
+                    async for chunk in call.iterate(chat.stream(prompt)):
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                        parts.append(chunk)
+                        yield "token", {"text": chunk}
+            except (CircuitOpenError, OverloadedError) as e:
+                logger.warning(f"Answering locally: {str(e)}")
+                fallback = True
+            except Exception as e:
+                if parts:
+                    # Part of the answer is already on the wire; it cannot be swapped out now
+                    raise
+                logger.error(f"LLM call failed, answering locally: {e!r}")
+                fallback = True
+            if fallback:
+                async for chunk in iter_once(fallback_answer(context, request.question)):
+                    first_token_at = time.perf_counter()
+                    parts.append(chunk)
+                    yield "token", {"text": chunk}
+
+        answer = "".join(parts)
+        if not cached and not fallback and not history:
+            answer_cache.put(request.topic_id, request.question, answer, topic_title)
+        chat_message = ChatMessage(
+            session_id=request.session_id,
+            topic_id=request.topic_id,
+            question=request.question,
+            answer=answer,
+        )
+        await chat_writer.put(chat_message.dict())
+        await conversation_memory.append(request.session_id, chat_message.dict())
+        response = QuestionResponse(
+            answer=answer, session_id=request.session_id, topic_title=topic_title,
+            cached=cached is not None, fallback=fallback
+        )
+        yield "done", response.dict()
+    except Exception as e:
+        logger.error(f"Error streaming answer: {str(e)}")
+        yield "error", {"detail": "Failed to process question"}
+    finally:
+        total = time.perf_counter() - started
+        ttfb = (first_token_at - started) if first_token_at is not None else None
+        stream_latency.record(ttfb, total)
+        logger.info(
+            f"ask stream session={request.session_id} "
+            f"ttfb_ms={ttfb * 1000 if ttfb is not None else -1:.1f} total_ms={total * 1000:.1f}"
+        )
+
+@api_router.post("/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """AI-powered Q&A streamed as Server-Sent Events
+
+    Emits `token` events with answer text as it arrives, then a `done` event
+    carrying the full QuestionResponse, or an `error` event on failure. If the
+    LLM is unavailable before the first token, the locally built fallback
+    answer is streamed instead.
+    """
+    started = time.perf_counter()
+    memory = await load_memory(request)
+    history = conversation_memory.render(memory)
+    cached = answer_cache.get(request.topic_id, request.question) if not history else None
+    context = None if cached else await load_topic_context(request.topic_id)
+
+    async def events():
+        async for event, data in answer_events(request, started, context, history, cached):
+            yield sse_event(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.websocket("/ws/tutor")
+async def tutor_socket(websocket: WebSocket, session_id: Optional[str] = None, topic_id: Optional[str] = None):
+    """Tutor chat over one long-lived WebSocket
+
+    The connection holds the session, its topic context and a chat for that
+    topic (replaced on a topic switch), so a turn is just `{"question": ..., "topic_id": ...}` from the client
+    (topic_id only when switching topics). Each turn is answered with `token`
+    frames and then a `done` or `error` frame, shaped like the SSE events plus
+    an `event` field. An idle connection costs one suspended receive. A frame
+    that is not a JSON text message gets an `error` frame and the connection
+    stays open; a server failure sends an `error` frame and closes with 1011.
+    """
+    await websocket.accept()
+    # A session id the client did not send is new, so it has no history to load
+    new_session = session_id is None
+    session_id = session_id or str(uuid.uuid4())
+
+    async def open_topic(requested_id: Optional[str]) -> Tuple[Optional[TopicContext], Any]:
+        context = await load_topic_context(requested_id)
+        if requested_id and context is None:
+            raise LookupError("Topic not found")
+        return context, create_chat(session_id, context)
+
+    try:
+        try:
+            context, chat = await open_topic(topic_id)
+        except LookupError as e:
+            await websocket.send_json({"event": "error", "detail": str(e)})
+            await websocket.close(code=1008)
+            return
+        await websocket.send_json({
+            "event": "ready", "session_id": session_id, "topic_title": context.title if context else None
+        })
+
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+                started = time.perf_counter()
+                question = str(message.get("question") or "").strip()
+            except (KeyError, ValueError, AttributeError):
+                # KeyError: a binary frame has no text
+                await websocket.send_json({"event": "error", "detail": "Expected a JSON object with a question"})
+                continue
+            if not question:
+                await websocket.send_json({"event": "error", "detail": "Question is required"})
+                continue
+            if "topic_id" in message and message["topic_id"] != topic_id:
+                try:
+                    context, chat = await open_topic(message["topic_id"])
+                    topic_id = message["topic_id"]
+                except LookupError as e:
+                    await websocket.send_json({"event": "error", "detail": str(e)})
+                    continue
+
+            request = QuestionRequest(question=question, topic_id=topic_id, session_id=session_id)
+            memory = await conversation_memory.load(session_id, new_session=new_session)
+            new_session = False
+            history = conversation_memory.render(memory)
+            cached = answer_cache.get(topic_id, question) if not history else None
+            async for event, data in answer_events(request, started, context, history, cached, chat):
+                await websocket.send_json({"event": event, **data})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in tutor_socket: {str(e)}")
+        if WebSocketState.CONNECTED == websocket.application_state == websocket.client_state:
+            await websocket.send_json({"event": "error", "detail": "Failed to process question"})
+            await websocket.close(code=1011)
+
+def batch_session_id(job_id: str) -> str:
+    """Chat session that holds a batch job's answers; its messages double as the job's checkpoint"""
+    return f"batch-{job_id}"
+
+def batch_item_key(topic_id: Optional[str], question: str) -> Tuple[Optional[str], str]:
+    return topic_id, normalize_question(question)
+
+async def batch_checkpoint(session_id: str) -> set:
+    """Keys of the questions a batch job has already answered"""
+    await chat_writer.flush()
+    answered = await db.chat_messages.find(
+        {"session_id": session_id}, {"_id": 0, "topic_id": 1, "question": 1}
+    ).to_list(None)
+    return {batch_item_key(message.get("topic_id"), message["question"]) for message in answered}
+
+async def answer_batch_item(session_id: str, index: int, item: BatchQuestion) -> Dict[str, Any]:
+    """Answer one batch question and queue it for persistence; returns its NDJSON result"""
+    result = {"event": "result", "index": index, "topic_id": item.topic_id, "question": item.question}
+    if item.topic_id and await load_topic_context(item.topic_id) is None:
+        return {**result, "status": "failed", "detail": "Topic not found"}
+    cached = answer_cache.get(item.topic_id, item.question)
+    if cached:
+        answer, fallback = cached.answer, False
+    else:
+        request = QuestionRequest(question=item.question, topic_id=item.topic_id, session_id=session_id)
+        async with batch_llm_slots:
+            answer, _, fallback = await generate_answer(request, queue_timeout=BATCH_ASK_QUEUE_TIMEOUT_SECONDS)
+    if fallback:
+        # Not persisted, so resuming the job asks the LLM again
+        return {**result, "status": "fallback", "answer": answer}
+    chat_message = ChatMessage(session_id=session_id, topic_id=item.topic_id, question=item.question, answer=answer)
+    await chat_writer.put(chat_message.dict())
+    return {**result, "status": "answered", "answer": answer, "cached": cached is not None}
+
+def ndjson_line(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=str) + "\n"
+
+@api_router.post("/ask/batch")
+async def ask_question_batch(request: BatchQuestionRequest):
+    """Answer many questions at once for offline FAQ generation, streamed back as NDJSON
+
+    The first line reports the job id and how many questions are left; then one
+    `result` line per question in completion order, and a final `finished` line
+    with counts. Answers go into the answer cache and, through the batched chat
+    writer, into chat_messages under a per-job session. Re-posting the same
+    job_id skips questions that already have a stored answer, so an
+    interrupted job resumes where it stopped.
+    """
+    session_id = batch_session_id(request.job_id)
+    try:
+        answered = await batch_checkpoint(session_id)
+    except Exception as e:
+        logger.error(f"Error loading batch checkpoint: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to load batch checkpoint")
+
+    pending, skipped = [], 0
+    for index, item in enumerate(request.items):
+        key = batch_item_key(item.topic_id, item.question)
+        if key in answered:
+            skipped += 1
+            continue
+        # Duplicates within the batch are answered once
+        answered.add(key)
+        pending.append((index, item))
+
+    async def results():
+        counts = {"answered": 0, "fallback": 0, "failed": 0, "skipped": skipped}
+        yield ndjson_line({
+            "event": "started", "job_id": request.job_id, "total": len(request.items), "pending": len(pending)
+        })
+        work = iter(pending)
+        done: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            for index, item in work:
+                try:
+                    result = await answer_batch_item(session_id, index, item)
+                except Exception as e:
+                    logger.error(f"Error in ask_question_batch: {str(e)}")
+                    result = {"event": "result", "index": index, "topic_id": item.topic_id,
+                              "question": item.question, "status": "failed", "detail": "Failed to process question"}
+                await done.put(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(request.concurrency, len(pending)))]
+        try:
+            for _ in pending:
+                result = await done.get()
+                counts[result["status"]] += 1
+                yield ndjson_line(result)
+            # Make the checkpoint durable before reporting the job finished
+            await chat_writer.flush()
+            yield ndjson_line({"event": "finished", "job_id": request.job_id, **counts})
+        finally:
+            for task in workers:
+                task.cancel()
+
+    return StreamingResponse(
+        results(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/admin/answer-cache-stats")
+async def get_answer_cache_stats():
+    """Hit/miss/eviction counters for the AI tutor answer cache (admin function)"""
+    return {**answer_cache.stats(), "in_flight": len(ask_flight), "coalesced": ask_flight.coalesced}
+
+@api_router.get("/admin/chat-writer-stats")
+async def get_chat_writer_stats():
+    """Queue depth and write counters for batched chat message persistence (admin function)"""
+    return chat_writer.stats()
+
+@api_router.get("/admin/llm-breaker-stats")
+async def get_llm_breaker_stats():
+    """Circuit breaker state, timeouts and concurrency for LLM calls (admin function)"""
+    return llm_guard.stats()
+
+@api_router.get("/admin/prompt-context-stats")
+async def get_prompt_context_stats():
+    """Size and hit counters for the materialized per-topic prompt contexts (admin function)"""
+    return prompt_contexts.stats()
+
+@api_router.get("/admin/topic-sync-stats")
+async def get_topic_sync_stats():
+    """Watermark and counters of the catch-up with topics written by other workers (admin function)"""
+    return topic_sync.stats()
+
+@api_router.get("/admin/topic-graph-stats")
+async def get_topic_graph_stats():
+    """Node, edge and dangling-reference counts of the related-topic graph (admin function)"""
+    return topic_graph.stats()
+
+@api_router.get("/admin/topic-graph/dangling")
+async def get_dangling_related_topics():
+    """Related-topic names that match no topic, per topic (admin function)"""
+    return topic_graph.dangling_references()
+
+@api_router.get("/admin/memory-stats")
+async def get_memory_stats():
+    """Cached sessions and compaction counters for tutor conversation memory (admin function)"""
+    return conversation_memory.stats()
+
+@api_router.get("/admin/ask-stream-metrics")
+async def get_ask_stream_metrics():
+    """Time-to-first-token and total-time percentiles for recent streamed answers (admin function)"""
+    return stream_latency.summary()
+
 @api_router.get("/chat-history/{session_id}")
-async def get_chat_history(session_id: str):
-    """Get chat history for a session"""
+async def get_chat_history(
+    session_id: str,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page")
+):
+    """Get chat history for a session, oldest first, one page at a time"""
+    after = parse_cursor(cursor, len(CHAT_SORT))
     try:
+        # Make this worker's queued messages visible before reading
+        await chat_writer.flush()
         messages = await db.chat_messages.find(
-            {"session_id": session_id}
-        ).sort("created_at", 1).to_list(100)
+            after_keyset({"session_id": session_id}, CHAT_SORT, after)
+        ).sort(CHAT_SORT).limit(limit + 1).to_list(limit + 1)
         
-        return {"messages": [ChatMessage(**msg) for msg in messages]}
+        return {
+            "messages": [ChatMessage(**msg) for msg in messages[:limit]],
+            "next_cursor": next_cursor(messages, CHAT_SORT, limit)
+        }
     except Exception as e:
         logger.error(f"Error getting chat history: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get chat history")
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus text exposition of this worker's request metrics"""
+    return PlainTextResponse(api_metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Include the router in the main app
 app.include_router(api_router)
 
+app.add_middleware(MetricsMiddleware, metrics=api_metrics, routes=app.router.routes, budget=mongo_command_budget)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Mongo-Commands", "X-Mongo-Command-Budget-Exceeded"],
 )
 
 # Configure logging
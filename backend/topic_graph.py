@@ -0,0 +1,162 @@
+"""In-process graph of related topics
+
+Topics name their related topics by title (`related_topics`). The graph
+resolves those names to topic ids when a topic is added and keeps outgoing
+and incoming adjacency lists, so a topic's k-hop neighborhood is a
+breadth-first walk in memory with no MongoDB reads. Names that match no topic
+are kept as dangling references. They resolve by themselves once a topic with
+that title is added.
+"""
+import re
+from collections import deque
+from typing import Any, Dict, List, Optional, Set
+
+# Topic fields the graph keeps per node
+GRAPH_PROJECTION = {"_id": 0, "id": 1, "title": 1, "category": 1, "difficulty_level": 1, "related_topics": 1}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def title_key(title: str) -> str:
+    """Normalized title used to match related-topic names: case, spacing and punctuation ignored"""
+    return _NON_WORD.sub(" ", (title or "").lower()).strip()
+
+
+class TopicGraph:
+    """Related-topic adjacency lists keyed by topic id"""
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.outgoing: Dict[str, List[str]] = {}
+        self.incoming: Dict[str, Set[str]] = {}
+        self.dangling: Dict[str, List[str]] = {}
+        # title key -> topic id; the first topic with a title wins
+        self._by_title: Dict[str, str] = {}
+        # title key -> ids of topics with an unresolved reference to that title
+        self._waiting: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, topic_id: str) -> bool:
+        return topic_id in self.nodes
+
+    def clear(self):
+        self.__init__()
+
+    def add(self, topic: dict):
+        """Add a topic, resolving its related names and any earlier references to its title"""
+        topic_id = topic["id"]
+        if topic_id in self.nodes:
+            self.remove(topic_id)
+        self.nodes[topic_id] = {
+            "id": topic_id,
+            "title": topic.get("title", ""),
+            "category": topic.get("category"),
+            "difficulty_level": topic.get("difficulty_level"),
+        }
+        self.outgoing[topic_id] = []
+        self.incoming.setdefault(topic_id, set())
+        self.dangling[topic_id] = []
+
+        key = title_key(topic.get("title", ""))
+        if key and key not in self._by_title:
+            self._by_title[key] = topic_id
+            for source in self._waiting.pop(key, set()):
+                self._resolve(source, key, topic_id)
+
+        for name in topic.get("related_topics") or []:
+            name_key = title_key(name)
+            target = self._by_title.get(name_key)
+            if target is None or target == topic_id:
+                if target is None and name_key:
+                    self.dangling[topic_id].append(name)
+                    self._waiting.setdefault(name_key, set()).add(topic_id)
+                continue
+            self._link(topic_id, target)
+
+    def add_many(self, topics):
+        for topic in topics:
+            self.add(topic)
+
+    def _link(self, source: str, target: str):
+        if target not in self.outgoing[source]:
+            self.outgoing[source].append(target)
+            self.incoming.setdefault(target, set()).add(source)
+
+    def _resolve(self, source: str, key: str, target: str):
+        if source == target or source not in self.nodes:
+            return
+        self.dangling[source] = [name for name in self.dangling[source] if title_key(name) != key]
+        self._link(source, target)
+
+    def remove(self, topic_id: str):
+        """Drop a topic; references to it from other topics become dangling again"""
+        node = self.nodes.pop(topic_id, None)
+        if node is None:
+            return
+        for target in self.outgoing.pop(topic_id, []):
+            self.incoming.get(target, set()).discard(topic_id)
+        for name in self.dangling.pop(topic_id, []):
+            waiting = self._waiting.get(title_key(name))
+            if waiting is not None:
+                waiting.discard(topic_id)
+        key = title_key(node["title"])
+        if self._by_title.get(key) == topic_id:
+            del self._by_title[key]
+        for source in self.incoming.pop(topic_id, set()):
+            self.outgoing[source] = [target for target in self.outgoing[source] if target != topic_id]
+            self.dangling[source].append(node["title"])
+            self._waiting.setdefault(key, set()).add(source)
+
+    def neighborhood(self, topic_id: str, depth: int = 1, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Topics within `depth` hops, following related links in either direction; None if unknown
+
+        Nodes are in breadth-first order with their distance. Edges are the
+        directed related links between returned nodes.
+        """
+        if topic_id not in self.nodes:
+            return None
+        distances = {topic_id: 0}
+        queue = deque([topic_id])
+        while queue:
+            current = queue.popleft()
+            if distances[current] == depth:
+                continue
+            for neighbor in self.outgoing[current] + sorted(self.incoming.get(current, ())):
+                if neighbor not in distances:
+                    if limit is not None and len(distances) > limit:
+                        queue.clear()
+                        break
+                    distances[neighbor] = distances[current] + 1
+                    queue.append(neighbor)
+
+        edges = [
+            [source, target]
+            for source in distances
+            for target in self.outgoing[source]
+            if target in distances
+        ]
+        return {
+            "topic_id": topic_id,
+            "depth": depth,
+            "nodes": [{**self.nodes[node], "distance": distance} for node, distance in distances.items()],
+            "edges": edges,
+            "dangling": list(self.dangling[topic_id]),
+        }
+
+    def dangling_references(self) -> List[Dict[str, Any]]:
+        """Every topic with related names that match no topic"""
+        return [
+            {"topic_id": topic_id, "title": self.nodes[topic_id]["title"], "missing": names}
+            for topic_id, names in self.dangling.items()
+            if names
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "topics": len(self.nodes),
+            "edges": sum(len(targets) for targets in self.outgoing.values()),
+            "dangling_references": sum(len(names) for names in self.dangling.values()),
+            "topics_with_dangling": sum(1 for names in self.dangling.values() if names),
+        }
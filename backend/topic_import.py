@@ -0,0 +1,121 @@
+"""Bulk topic import from a JSON array or an NDJSON stream
+
+Rows are validated a chunk at a time with one compiled TypeAdapter over the
+whole list. Rows that fail are reported by their index in the upload, and the
+rest of the chunk still goes in. Each chunk is a single unordered insert_many,
+so a rejected document does not stop the documents after it.
+"""
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+from pymongo.errors import BulkWriteError
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+# A row that could not be parsed; carried through the pipeline so it is reported in order
+_UNPARSEABLE = object()
+
+
+def row_error(index: int, errors: List[Dict[str, str]]) -> Dict[str, Any]:
+    """Per-row entry of an import report"""
+    return {"index": index, "errors": errors}
+
+
+def is_ndjson(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in NDJSON_TYPES
+
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return _UNPARSEABLE
+
+
+async def ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Rows of an NDJSON body as it streams in; blank lines are skipped"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+
+async def _iterate(rows: List[Any]) -> AsyncIterator[Any]:
+    for row in rows:
+        yield row
+
+
+def json_array_rows(body: bytes) -> AsyncIterator[Any]:
+    """Rows of a JSON array body; raises ValueError up front if the body is not an array"""
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("expected a JSON array of topics")
+    return _iterate(rows)
+
+
+async def chunked(rows: AsyncIterator[Any], size: int) -> AsyncIterator[List[Any]]:
+    chunk = []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _field_errors(errors: List[dict]) -> List[Dict[str, str]]:
+    return [
+        {"field": ".".join(str(part) for part in error["loc"]) or "__root__", "message": error["msg"]}
+        for error in errors
+    ]
+
+
+def validate_chunk(adapter: TypeAdapter, rows: List[Any], first_index: int) -> Tuple[List[Tuple[int, Any]], List[Dict[str, Any]]]:
+    """Validate a chunk of rows in one pass; returns (index, model) pairs and per-row errors"""
+    errors: Dict[int, List[dict]] = {}
+    for position, row in enumerate(rows):
+        if row is _UNPARSEABLE:
+            errors[position] = [{"loc": (), "msg": "Invalid JSON"}]
+
+    candidates = [(position, row) for position, row in enumerate(rows) if position not in errors]
+    try:
+        models = adapter.validate_python([row for _, row in candidates])
+    except ValidationError as e:
+        failed = set()
+        for error in e.errors():
+            position = candidates[error["loc"][0]][0]
+            errors.setdefault(position, []).append({**error, "loc": error["loc"][1:]})
+            failed.add(position)
+        candidates = [(position, row) for position, row in candidates if position not in failed]
+        # Only rows that passed on their own are left, so this validates cleanly
+        models = adapter.validate_python([row for _, row in candidates])
+
+    valid = [(first_index + position, model) for (position, _), model in zip(candidates, models)]
+    row_errors = [row_error(first_index + position, _field_errors(errors[position])) for position in sorted(errors)]
+    return valid, row_errors
+
+
+async def insert_chunk(collection, rows: List[Tuple[int, dict]]) -> Tuple[List[dict], List[Dict[str, Any]]]:
+    """Unordered insert_many of (index, document) pairs; returns inserted documents and per-row errors"""
+    if not rows:
+        return [], []
+    documents = [document for _, document in rows]
+    try:
+        # insert_many adds _id to what it is given; the caller's documents stay clean for the caches
+        await collection.insert_many([dict(document) for document in documents], ordered=False)
+    except BulkWriteError as e:
+        write_errors = {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+        inserted = [document for position, document in enumerate(documents) if position not in write_errors]
+        errors = [
+            row_error(rows[position][0], [{"field": "__root__", "message": message}])
+            for position, message in sorted(write_errors.items())
+        ]
+        return inserted, errors
+    return documents, []
@@ -0,0 +1,127 @@
+"""Catch-up of in-process topic indexes with topics written by other workers
+
+The BM25 index, topic graph and caches are built per worker. A background
+task polls for topics whose `updated_at` is newer than the last one this
+worker has seen and hands them to `apply`. The poll re-reads a short overlap
+window, because another worker's write can become visible after a later one.
+Topic versions already applied within that window are skipped, including
+this worker's own writes, which are recorded with `seen()`. The window is
+read as (id, updated_at) pairs, and only changed topics are fetched whole.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def topic_version(topic: dict) -> Optional[datetime]:
+    """updated_at at MongoDB's millisecond precision, so local and stored copies compare equal"""
+    updated_at = topic.get("updated_at")
+    if updated_at is None:
+        return None
+    return updated_at.replace(microsecond=updated_at.microsecond // 1000 * 1000, tzinfo=None)
+
+
+class TopicSync:
+    """Polls for topics changed since the last poll and applies them to this worker"""
+
+    def __init__(
+        self,
+        collection,
+        apply: Callable[[List[dict]], None],
+        interval: float = 5.0,
+        overlap: float = 30.0,
+    ):
+        self.collection = collection
+        self.apply = apply
+        self.interval = interval
+        self.overlap = timedelta(seconds=overlap)
+        self.watermark: Optional[datetime] = None
+        # topic id -> version applied, for versions inside the overlap window
+        self._recent: Dict[str, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.polls = 0
+        self.applied = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def seen(self, topics: Iterable[dict]):
+        """Record topic versions this worker already has, e.g. its own writes or the startup load"""
+        for topic in topics:
+            version = topic_version(topic)
+            if version is None:
+                continue
+            self._recent[topic["id"]] = version
+            if self.watermark is None or version > self.watermark:
+                self.watermark = version
+
+    async def poll(self) -> int:
+        """Apply topics changed since the watermark; returns how many were applied
+
+        Versions in the overlap window are compared on (id, updated_at) alone, so
+        topics already applied are not read again; only changed topics are
+        fetched in full.
+        """
+        self.polls += 1
+        query = {}
+        if self.watermark is not None:
+            query = {"updated_at": {"$gte": self.watermark - self.overlap}}
+        changed_ids = [
+            version["id"]
+            async for version in self.collection.find(query, {"_id": 0, "id": 1, "updated_at": 1})
+            if self._recent.get(version["id"]) != topic_version(version)
+        ]
+        changed = []
+        if changed_ids:
+            changed = await self.collection.find({"id": {"$in": changed_ids}}, {"_id": 0}).sort(
+                "updated_at", 1
+            ).to_list(len(changed_ids))
+        if changed:
+            self.apply(changed)
+            self.applied += len(changed)
+            self.seen(changed)
+        if self.watermark is not None:
+            horizon = self.watermark - self.overlap
+            self._recent = {topic_id: version for topic_id, version in self._recent.items() if version >= horizon}
+        return len(changed)
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                applied = await self.poll()
+                if applied:
+                    logger.info(f"Applied {applied} topics written by other workers")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Topic sync poll failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_seconds": self.interval,
+            "watermark": self.watermark,
+            "tracked_versions": len(self._recent),
+            "polls": self.polls,
+            "applied": self.applied,
+            "failed": self.failed,
+        }
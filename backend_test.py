@@ -2,16 +2,23 @@
 """
 Backend API Testing for PsychLearn Platform
 Tests all backend API endpoints and functionality
+
+Run with --in-process (or BACKEND_TEST_IN_PROCESS=1) to boot the FastAPI app
+in this process with the offline stub LLM instead of calling a deployed URL.
+Only MongoDB at MONGO_URL is needed; no network access.
 """
 
 import requests
 import json
 import sys
 import os
+import uuid
 from typing import Dict, List, Any
 
-# Get backend URL from frontend .env file
+# Get backend URL from BACKEND_URL or the frontend .env file
 def get_backend_url():
+    if os.environ.get('BACKEND_URL'):
+        return os.environ['BACKEND_URL']
     try:
         with open('/app/frontend/.env', 'r') as f:
             for line in f:
@@ -21,12 +28,55 @@ def get_backend_url():
         print(f"Error reading frontend .env: {e}")
         return None
 
-BASE_URL = get_backend_url()
-if not BASE_URL:
-    print("ERROR: Could not get backend URL from frontend/.env")
-    sys.exit(1)
+IN_PROCESS = "--in-process" in sys.argv or os.environ.get('BACKEND_TEST_IN_PROCESS') == '1'
+
+if IN_PROCESS:
+    # The AI path runs end-to-end against the deterministic stub provider
+    os.environ.setdefault('LLM_PROVIDER', 'stub')
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+    from fastapi.testclient import TestClient
+    import server
+
+    http = TestClient(server.app)
+    ROOT_URL = ""
+    API_BASE = "/api"
+else:
+    BASE_URL = get_backend_url()
+    if not BASE_URL:
+        print("ERROR: Could not get backend URL from frontend/.env")
+        sys.exit(1)
+
+    http = requests
+    ROOT_URL = BASE_URL
+    API_BASE = f"{BASE_URL}/api"
+
+class JsonWebSocket:
+    """send_json/receive_json over a websockets client connection, like TestClient's sessions"""
+
+    def __init__(self, connection):
+        self.connection = connection
 
-API_BASE = f"{BASE_URL}/api"
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+
+    def send_json(self, data):
+        self.connection.send(json.dumps(data))
+
+    def send_bytes(self, data):
+        self.connection.send(data)
+
+    def receive_json(self):
+        return json.loads(self.connection.recv(timeout=30))
+
+def connect_websocket(path: str):
+    """Open an API WebSocket in-process or against the deployed backend"""
+    if IN_PROCESS:
+        return http.websocket_connect(f"{API_BASE}{path}")
+    from websockets.sync.client import connect
+    return JsonWebSocket(connect(API_BASE.replace("http", "ws", 1) + path))
 
 class PsychLearnTester:
     def __init__(self):
@@ -50,7 +100,7 @@ class PsychLearnTester:
     def test_health_check(self):
         """Test basic API health check"""
         try:
-            response = requests.get(f"{API_BASE}/", timeout=10)
+            response = http.get(f"{API_BASE}/", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if "PsychLearn API" in data.get("message", ""):
@@ -69,7 +119,7 @@ class PsychLearnTester:
     def test_get_all_topics(self):
         """Test getting all psychology topics"""
         try:
-            response = requests.get(f"{API_BASE}/topics", timeout=10)
+            response = http.get(f"{API_BASE}/topics", timeout=10)
             if response.status_code == 200:
                 topics = response.json()
                 if isinstance(topics, list) and len(topics) >= 5:
@@ -113,7 +163,7 @@ class PsychLearnTester:
                 self.log_result("Get Specific Topic", False, "No topic ID found")
                 return
                 
-            response = requests.get(f"{API_BASE}/topics/{topic_id}", timeout=10)
+            response = http.get(f"{API_BASE}/topics/{topic_id}", timeout=10)
             if response.status_code == 200:
                 topic = response.json()
                 if topic.get("id") == topic_id and topic.get("title"):
@@ -128,7 +178,7 @@ class PsychLearnTester:
     def test_invalid_topic_id(self):
         """Test error handling for invalid topic ID"""
         try:
-            response = requests.get(f"{API_BASE}/topics/invalid-id-12345", timeout=10)
+            response = http.get(f"{API_BASE}/topics/invalid-id-12345", timeout=10)
             if response.status_code == 404:
                 self.log_result("Invalid Topic ID Error Handling", True, "Correctly returned 404 for invalid ID")
             else:
@@ -139,7 +189,7 @@ class PsychLearnTester:
     def test_categories(self):
         """Test getting categories and metadata"""
         try:
-            response = requests.get(f"{API_BASE}/categories", timeout=10)
+            response = http.get(f"{API_BASE}/categories", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 expected_categories = [
@@ -175,7 +225,7 @@ class PsychLearnTester:
         """Test filtering topics by category"""
         try:
             # Test filtering by Behavioral Psychology
-            response = requests.get(f"{API_BASE}/topics?category=Behavioral Psychology", timeout=10)
+            response = http.get(f"{API_BASE}/topics?category=Behavioral Psychology", timeout=10)
             if response.status_code == 200:
                 topics = response.json()
                 if isinstance(topics, list) and len(topics) > 0:
@@ -196,7 +246,7 @@ class PsychLearnTester:
         """Test filtering topics by difficulty level"""
         try:
             # Test filtering by intermediate difficulty
-            response = requests.get(f"{API_BASE}/topics?difficulty_level=intermediate", timeout=10)
+            response = http.get(f"{API_BASE}/topics?difficulty_level=intermediate", timeout=10)
             if response.status_code == 200:
                 topics = response.json()
                 if isinstance(topics, list) and len(topics) > 0:
@@ -217,7 +267,7 @@ class PsychLearnTester:
         """Test advanced search functionality"""
         try:
             # Test search for "conditioning"
-            response = requests.get(f"{API_BASE}/search?q=conditioning", timeout=10)
+            response = http.get(f"{API_BASE}/search?q=conditioning", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if "results" in data and isinstance(data["results"], list):
@@ -244,7 +294,7 @@ class PsychLearnTester:
         """Test search with category and difficulty filters"""
         try:
             # Test search with category filter
-            response = requests.get(f"{API_BASE}/search?q=theory&category=Social Psychology", timeout=10)
+            response = http.get(f"{API_BASE}/search?q=theory&category=Social Psychology", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 results = data.get("results", [])
@@ -261,11 +311,59 @@ class PsychLearnTester:
                 self.log_result("Search with Filters", False, f"Status code: {response.status_code}")
         except Exception as e:
             self.log_result("Search with Filters", False, f"Error: {str(e)}")
-    
+
+    def test_cursor_pagination(self):
+        """Test that cursor pages of topics and search results cover each item exactly once"""
+        try:
+            response = http.get(f"{API_BASE}/topics?limit=1000", timeout=10)
+            expected = [topic["id"] for topic in response.json()]
+
+            # Topic listing: the next cursor comes back in the X-Next-Cursor header
+            paged = []
+            cursor = None
+            while True:
+                url = f"{API_BASE}/topics?limit=3" + (f"&cursor={cursor}" if cursor else "")
+                response = http.get(url, timeout=10)
+                if response.status_code != 200:
+                    self.log_result("Cursor Pagination", False, f"Topics page status code: {response.status_code}")
+                    return
+                paged.extend(topic["id"] for topic in response.json())
+                cursor = response.headers.get("X-Next-Cursor")
+                if not cursor:
+                    break
+            if paged != expected:
+                self.log_result("Cursor Pagination", False, f"Topic pages returned {len(paged)} ids, expected {len(expected)}")
+                return
+
+            # Search: the next cursor is in the body, pages continue in relevance order
+            response = http.get(f"{API_BASE}/search?q=psychology&limit=100", timeout=10)
+            expected = [topic["id"] for topic in response.json()["results"]]
+            paged = []
+            cursor = None
+            while True:
+                url = f"{API_BASE}/search?q=psychology&limit=1" + (f"&cursor={cursor}" if cursor else "")
+                data = http.get(url, timeout=10).json()
+                paged.extend(topic["id"] for topic in data["results"])
+                cursor = data.get("next_cursor")
+                if not cursor:
+                    break
+            if paged != expected:
+                self.log_result("Cursor Pagination", False, f"Search pages returned {len(paged)} ids, expected {len(expected)}")
+                return
+
+            response = http.get(f"{API_BASE}/topics?cursor=not-a-cursor", timeout=10)
+            if response.status_code != 400:
+                self.log_result("Cursor Pagination", False, f"Malformed cursor gave status code: {response.status_code}")
+                return
+
+            self.log_result("Cursor Pagination", True, f"Paged {len(expected)} search results and every topic without gaps")
+        except Exception as e:
+            self.log_result("Cursor Pagination", False, f"Error: {str(e)}")
+
     def test_statistics(self):
         """Test platform statistics endpoint"""
         try:
-            response = requests.get(f"{API_BASE}/stats", timeout=10)
+            response = http.get(f"{API_BASE}/stats", timeout=10)
             if response.status_code == 200:
                 stats = response.json()
                 required_fields = ["total_topics", "total_categories", "topics_by_category", "topics_by_difficulty"]
@@ -288,7 +386,7 @@ class PsychLearnTester:
         """Test that environment variables are loaded (indirectly by checking if API keys exist)"""
         try:
             # Check if backend .env file exists and contains API keys
-            env_file = "/app/backend/.env"
+            env_file = os.path.join(server.ROOT_DIR, ".env") if IN_PROCESS else "/app/backend/.env"
             if os.path.exists(env_file):
                 with open(env_file, 'r') as f:
                     env_content = f.read()
@@ -317,7 +415,7 @@ class PsychLearnTester:
                 "session_id": "test-session-general"
             }
             
-            response = requests.post(f"{API_BASE}/ask", json=payload, timeout=30)
+            response = http.post(f"{API_BASE}/ask", json=payload, timeout=30)
             if response.status_code == 200:
                 data = response.json()
                 required_fields = ["answer", "session_id"]
@@ -359,7 +457,7 @@ class PsychLearnTester:
                 "session_id": "test-session-topic"
             }
             
-            response = requests.post(f"{API_BASE}/ask", json=payload, timeout=30)
+            response = http.post(f"{API_BASE}/ask", json=payload, timeout=30)
             if response.status_code == 200:
                 data = response.json()
                 required_fields = ["answer", "session_id", "topic_title"]
@@ -397,13 +495,13 @@ class PsychLearnTester:
             }
             
             # Send a question first
-            ask_response = requests.post(f"{API_BASE}/ask", json=payload, timeout=30)
+            ask_response = http.post(f"{API_BASE}/ask", json=payload, timeout=30)
             if ask_response.status_code != 200:
                 self.log_result("Chat History Retrieval", False, "Failed to create chat history for testing")
                 return
             
             # Now retrieve the history
-            response = requests.get(f"{API_BASE}/chat-history/test-session-history", timeout=10)
+            response = http.get(f"{API_BASE}/chat-history/test-session-history", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if "messages" in data and isinstance(data["messages"], list):
@@ -436,7 +534,7 @@ class PsychLearnTester:
                 "session_id": "test-session-error"
             }
             
-            response = requests.post(f"{API_BASE}/ask", json=payload, timeout=30)
+            response = http.post(f"{API_BASE}/ask", json=payload, timeout=30)
             # Should either handle gracefully or return appropriate error
             if response.status_code in [200, 400, 422, 500]:
                 self.log_result("AI Q&A Error Handling", True, f"Handled empty question appropriately (status: {response.status_code})")
@@ -454,7 +552,7 @@ class PsychLearnTester:
                 "session_id": "test-session-invalid-topic"
             }
             
-            response = requests.post(f"{API_BASE}/ask", json=payload, timeout=30)
+            response = http.post(f"{API_BASE}/ask", json=payload, timeout=30)
             if response.status_code == 200:
                 data = response.json()
                 # Should still work but without topic context
@@ -470,7 +568,7 @@ class PsychLearnTester:
     def test_chat_history_nonexistent_session(self):
         """Test retrieving chat history for non-existent session"""
         try:
-            response = requests.get(f"{API_BASE}/chat-history/nonexistent-session-12345", timeout=10)
+            response = http.get(f"{API_BASE}/chat-history/nonexistent-session-12345", timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if "messages" in data and isinstance(data["messages"], list) and len(data["messages"]) == 0:
@@ -481,7 +579,263 @@ class PsychLearnTester:
                 self.log_result("Chat History Non-existent Session", False, f"Status code: {response.status_code}")
         except Exception as e:
             self.log_result("Chat History Non-existent Session", False, f"Error: {str(e)}")
-    
+
+    def test_ai_qa_stream(self):
+        """Test AI Q&A streamed as Server-Sent Events"""
+        try:
+            before = http.get(f"{API_BASE}/admin/ask-stream-metrics", timeout=10).json()["requests"]
+            payload = {
+                "question": "How does working memory differ from long-term memory?",
+                "session_id": "test-session-stream"
+            }
+
+            response = http.post(f"{API_BASE}/ask/stream", json=payload, timeout=30)
+            if response.status_code != 200 or not response.headers.get("content-type", "").startswith("text/event-stream"):
+                self.log_result("AI Q&A Stream", False, f"Status code: {response.status_code}")
+                return
+
+            events = []
+            for frame in response.text.strip().split("\n\n"):
+                lines = dict(line.split(": ", 1) for line in frame.splitlines())
+                events.append((lines["event"], json.loads(lines["data"])))
+            names = [name for name, _ in events]
+            if not names or names[-1] != "done" or set(names[:-1]) != {"token"}:
+                self.log_result("AI Q&A Stream", False, f"Unexpected event sequence: {names}")
+                return
+            streamed = "".join(data["text"] for name, data in events if name == "token")
+            if streamed != events[-1][1]["answer"]:
+                self.log_result("AI Q&A Stream", False, "Tokens don't add up to the final answer")
+                return
+
+            after = http.get(f"{API_BASE}/admin/ask-stream-metrics", timeout=10).json()["requests"]
+            if after != before + 1:
+                self.log_result("AI Q&A Stream", False, f"Stream latency not recorded ({before} -> {after})")
+                return
+            self.log_result("AI Q&A Stream", True, f"Streamed {len(events) - 1} tokens ({len(streamed)} chars)")
+        except Exception as e:
+            self.log_result("AI Q&A Stream", False, f"Error: {str(e)}")
+
+    def test_ai_qa_batch(self, topics: List[Dict]):
+        """Test batch Q&A streamed as NDJSON, and resuming the same job"""
+        if not topics:
+            self.log_result("AI Q&A Batch", False, "No topics available for testing")
+            return
+
+        try:
+            payload = {
+                "job_id": f"test-batch-{uuid.uuid4()}",
+                "concurrency": 2,
+                "items": [
+                    {"topic_id": topics[0]["id"], "question": "What are the key ideas of this topic?"},
+                    {"question": "What is the bystander effect?"},
+                    {"question": "what is the bystander effect"},
+                    {"topic_id": "invalid-topic-id-12345", "question": "What is this topic about?"},
+                ],
+            }
+
+            def run_job():
+                response = http.post(f"{API_BASE}/ask/batch", json=payload, timeout=120)
+                if response.status_code != 200:
+                    raise AssertionError(f"Status code: {response.status_code}")
+                return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+            lines = run_job()
+            started, results, finished = lines[0], lines[1:-1], lines[-1]
+            statuses = sorted(result["status"] for result in results)
+            if started.get("pending") != 3 or statuses != ["answered", "answered", "failed"]:
+                self.log_result("AI Q&A Batch", False, f"Unexpected first run: pending={started.get('pending')} statuses={statuses}")
+                return
+            if finished.get("event") != "finished" or finished.get("answered") != 2:
+                self.log_result("AI Q&A Batch", False, f"Unexpected finished line: {finished}")
+                return
+
+            # Re-posting the job only retries the question that was not answered;
+            # the two answered questions and the duplicate are skipped
+            lines = run_job()
+            if lines[0].get("pending") != 1 or lines[-1].get("skipped") != 3:
+                self.log_result("AI Q&A Batch", False, f"Resume did not skip answered questions: {lines[0]} {lines[-1]}")
+                return
+
+            self.log_result("AI Q&A Batch", True, "Answered 2 questions, deduplicated 1, resumed with 3 skipped")
+        except Exception as e:
+            self.log_result("AI Q&A Batch", False, f"Error: {str(e)}")
+
+    def test_tutor_websocket(self, topics: List[Dict]):
+        """Test tutor turns over the WebSocket channel, including a topic switch"""
+        if not topics:
+            self.log_result("Tutor WebSocket", False, "No topics available for testing")
+            return
+
+        def answer_turn(socket, message):
+            socket.send_json(message)
+            tokens = []
+            while True:
+                frame = socket.receive_json()
+                if frame["event"] != "token":
+                    return "".join(tokens), frame
+                tokens.append(frame["text"])
+
+        try:
+            with connect_websocket("/ws/tutor") as socket:
+                ready = socket.receive_json()
+                if ready.get("event") != "ready" or not ready.get("session_id"):
+                    self.log_result("Tutor WebSocket", False, f"Unexpected first frame: {ready}")
+                    return
+
+                streamed, done = answer_turn(socket, {"question": "What is the bystander effect?"})
+                if done.get("event") != "done" or done.get("answer") != streamed or done.get("session_id") != ready["session_id"]:
+                    self.log_result("Tutor WebSocket", False, f"Unexpected general turn result: {done}")
+                    return
+
+                topic = topics[0]
+                streamed, done = answer_turn(socket, {"question": "Summarize this topic", "topic_id": topic["id"]})
+                if done.get("event") != "done" or done.get("topic_title") != topic.get("title"):
+                    self.log_result("Tutor WebSocket", False, f"Topic switch not applied: {done}")
+                    return
+
+                socket.send_json({"question": ""})
+                error = socket.receive_json()
+                if error.get("event") != "error":
+                    self.log_result("Tutor WebSocket", False, f"Empty question not rejected: {error}")
+                    return
+
+                socket.send_bytes(b"\x00\x01")
+                error = socket.receive_json()
+                if error.get("event") != "error":
+                    self.log_result("Tutor WebSocket", False, f"Binary frame not rejected: {error}")
+                    return
+                streamed, done = answer_turn(socket, {"question": "What is a schema?"})
+                if done.get("event") != "done":
+                    self.log_result("Tutor WebSocket", False, f"Connection unusable after a binary frame: {done}")
+                    return
+
+            with connect_websocket("/ws/tutor?topic_id=invalid-topic-id-12345") as socket:
+                error = socket.receive_json()
+                if error.get("event") != "error":
+                    self.log_result("Tutor WebSocket", False, f"Unknown topic not rejected: {error}")
+                    return
+
+            self.log_result("Tutor WebSocket", True, "Answered two turns on one connection and rejected bad input")
+        except Exception as e:
+            self.log_result("Tutor WebSocket", False, f"Error: {str(e)}")
+
+    def test_metrics(self):
+        """Test the Prometheus /metrics endpoint after the requests above"""
+        try:
+            response = http.get(f"{ROOT_URL}/metrics", timeout=10)
+            if response.status_code != 200 or not response.headers.get("content-type", "").startswith("text/plain"):
+                self.log_result("Metrics Endpoint", False, f"Status code: {response.status_code}")
+                return
+            text = response.text
+            expected = [
+                '# TYPE http_requests_total counter',
+                '# TYPE http_request_duration_seconds histogram',
+                'http_requests_total{method="GET",route="/api/topics",status="200"}',
+                # Requests are labelled by route template, never by the raw path
+                'http_requests_total{method="GET",route="/api/topics/{topic_id}",status="404"}',
+                'http_request_duration_seconds_count{method="POST",route="/api/ask"}',
+            ]
+            missing = [line for line in expected if line not in text]
+            if missing:
+                self.log_result("Metrics Endpoint", False, f"Missing series: {missing}")
+                return
+            if "invalid-id-12345" in text:
+                self.log_result("Metrics Endpoint", False, "Raw request path leaked into a route label")
+                return
+            self.log_result("Metrics Endpoint", True, f"Exposed {text.count(chr(10))} lines of request metrics")
+        except Exception as e:
+            self.log_result("Metrics Endpoint", False, f"Error: {str(e)}")
+
+    def test_topic_import(self):
+        """Test bulk topic import from a JSON array and an NDJSON stream"""
+        try:
+            marker = uuid.uuid4().hex[:8]
+            def topic(title):
+                return {
+                    "title": title, "category": "Cognitive Psychology", "content": f"# {title}\nImported for testing.",
+                    "difficulty_level": "introductory", "reading_time": 3,
+                }
+
+            rows = [topic(f"Imported Topic {marker} A"), {"title": "Missing fields"}, topic(f"Imported Topic {marker} B")]
+            response = http.post(f"{API_BASE}/topics/import", json=rows, timeout=30)
+            if response.status_code != 200:
+                self.log_result("Topic Import", False, f"Status code: {response.status_code}")
+                return
+            report = response.json()
+            if (report["received"], report["inserted"], report["failed"]) != (3, 2, 1) or report["errors"][0]["index"] != 1:
+                self.log_result("Topic Import", False, f"Unexpected JSON import report: {report}")
+                return
+
+            ndjson = json.dumps(topic(f"Imported Topic {marker} C")) + "\n{not json\n"
+            response = http.post(
+                f"{API_BASE}/topics/import", data=ndjson.encode(),
+                headers={"Content-Type": "application/x-ndjson"}, timeout=30
+            )
+            report = response.json()
+            if response.status_code != 200 or (report["inserted"], report["failed"]) != (1, 1):
+                self.log_result("Topic Import", False, f"Unexpected NDJSON import report: {report}")
+                return
+
+            response = http.post(f"{API_BASE}/topics/import", json={"title": "not an array"}, timeout=30)
+            if response.status_code != 400:
+                self.log_result("Topic Import", False, f"Non-array body gave status code: {response.status_code}")
+                return
+
+            # Imported topics are searchable straight away
+            results = http.get(f"{API_BASE}/search?q={marker}", timeout=10).json()["results"]
+            found = sorted(result["title"] for result in results)
+            if found != [f"Imported Topic {marker} {suffix}" for suffix in "ABC"]:
+                self.log_result("Topic Import", False, f"Search found {found} instead of the 3 imported topics")
+                return
+
+            self.log_result("Topic Import", True, "Imported 3 topics, reported 2 bad rows and indexed the new topics")
+        except Exception as e:
+            self.log_result("Topic Import", False, f"Error: {str(e)}")
+
+    def test_related_topics(self, topics: List[Dict]):
+        """Test the related-topic graph endpoint, including a link from a newly created topic"""
+        try:
+            anchor = next((topic for topic in topics or [] if topic.get("title") == "Classical Conditioning"), None)
+            if not anchor:
+                self.log_result("Related Topics", False, "Classical Conditioning topic not available for testing")
+                return
+
+            response = http.get(f"{API_BASE}/topics/{anchor['id']}/related", timeout=10)
+            if response.status_code != 200:
+                self.log_result("Related Topics", False, f"Status code: {response.status_code}")
+                return
+            graph = response.json()
+            node_ids = {node["id"] for node in graph["nodes"]}
+            if graph["nodes"][0]["id"] != anchor["id"] or graph["nodes"][0]["distance"] != 0:
+                self.log_result("Related Topics", False, "Requested topic is not the first node")
+                return
+            if any(source not in node_ids or target not in node_ids for source, target in graph["edges"]):
+                self.log_result("Related Topics", False, "Edges point outside the returned nodes")
+                return
+
+            # A new topic naming the anchor as related shows up as its neighbor straight away
+            new_topic = {
+                "title": f"Related Topic {uuid.uuid4().hex[:8]}", "category": "Behavioral Psychology",
+                "content": "Created for testing.", "difficulty_level": "introductory", "reading_time": 2,
+                "related_topics": ["classical conditioning"],
+            }
+            created = http.post(f"{API_BASE}/topics", json=new_topic, timeout=10).json()
+            graph = http.get(f"{API_BASE}/topics/{anchor['id']}/related", timeout=10).json()
+            distances = {node["id"]: node["distance"] for node in graph["nodes"]}
+            if distances.get(created["id"]) != 1 or [created["id"], anchor["id"]] not in graph["edges"]:
+                self.log_result("Related Topics", False, "Newly created topic is not linked to the topic it names")
+                return
+
+            unknown = http.get(f"{API_BASE}/topics/invalid-id-12345/related", timeout=10).status_code
+            too_deep = http.get(f"{API_BASE}/topics/{anchor['id']}/related?depth=99", timeout=10).status_code
+            if (unknown, too_deep) != (404, 422):
+                self.log_result("Related Topics", False, f"Unexpected status codes: unknown={unknown} depth={too_deep}")
+                return
+
+            self.log_result("Related Topics", True, f"Graph has {len(graph['nodes'])} nodes around '{anchor['title']}'")
+        except Exception as e:
+            self.log_result("Related Topics", False, f"Error: {str(e)}")
+
     def run_all_tests(self):
         """Run all backend tests"""
         print(f"Starting PsychLearn Backend API Tests")
@@ -513,6 +867,9 @@ class PsychLearnTester:
         self.test_search_functionality()
         self.test_search_with_filters()
         
+        # Test cursor pagination
+        self.test_cursor_pagination()
+        
         # Test statistics
         self.test_statistics()
         
@@ -530,6 +887,16 @@ class PsychLearnTester:
         self.test_ai_qa_error_handling()
         self.test_ai_qa_invalid_topic_id()
         self.test_chat_history_nonexistent_session()
+        self.test_ai_qa_stream()
+        self.test_ai_qa_batch(topics)
+        self.test_tutor_websocket(topics)
+        
+        # Test the endpoints that add topics last, so the checks above see only the seeded catalog
+        self.test_topic_import()
+        self.test_related_topics(topics)
+        
+        # Test request metrics, now that every route above has been exercised
+        self.test_metrics()
         
         return self.get_summary()
     
@@ -554,7 +921,12 @@ class PsychLearnTester:
 
 if __name__ == "__main__":
     tester = PsychLearnTester()
-    summary = tester.run_all_tests()
+    if IN_PROCESS:
+        # Entering the client runs the app's startup and shutdown hooks
+        with http:
+            summary = tester.run_all_tests()
+    else:
+        summary = tester.run_all_tests()
     
     # Exit with error code if tests failed
     if summary["failed"] > 0:
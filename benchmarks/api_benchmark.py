@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark for every PsychLearn /api route
+
+Boots the FastAPI app in-process over httpx's ASGI transport with the stub
+LLM, seeds a synthetic corpus, drives a weighted concurrent mix of API
+requests and prints throughput and p50/p95/p99 per endpoint as JSON, so
+results can be diffed across commits.
+
+    python benchmarks/api_benchmark.py --sizes 1000,10000 --output bench.json
+
+By default MongoDB is replaced by the in-memory mongomock-motor stand-in
+(`pip install mongomock-motor`). Pass --mongo-url (or set MONGO_URL) to run
+against a local mongod instead; each corpus gets its own throwaway database.
+The stand-in has no indexes and no query planner, so compare numbers within
+one backend only.
+
+Each corpus size runs in a fresh subprocess, so module-level caches, indexes
+and memory from one size never leak into the next.
+
+The mix covers every /api route except one. /api/ws/tutor is left out
+because httpx's ASGI transport cannot open WebSockets. Its turns go through
+the same answer_events() path as POST /api/ask/stream, which is measured.
+The write routes (POST /api/topics, /api/topics/import, /api/ask/batch and
+/api/admin/stats/recompute) have low weights. Each topic write invalidates
+the listing and search caches, just as in production. The /api/admin/* GET
+endpoints share one mix entry and take turns.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKEND = ROOT / "backend"
+
+DEFAULT_SIZES = "1000,10000,100000"
+
+CATEGORIES = [
+    "Behavioral Psychology", "Cognitive Psychology", "Developmental Psychology", "Social Psychology",
+    "Clinical Psychology", "Biological Psychology", "Personality Psychology", "Research Methods",
+    "Educational Psychology", "Health Psychology", "Neuropsychology", "Positive Psychology",
+]
+DIFFICULTIES = ["introductory", "intermediate", "advanced", "graduate"]
+VOCABULARY = [
+    "memory", "attention", "perception", "conditioning", "reinforcement", "cognition", "emotion",
+    "motivation", "learning", "development", "attachment", "personality", "identity", "anxiety",
+    "depression", "resilience", "stress", "neuroplasticity", "synapse", "cortex", "hippocampus",
+    "amygdala", "dopamine", "serotonin", "heuristics", "bias", "conformity", "obedience",
+    "persuasion", "prejudice", "schema", "encoding", "retrieval", "consolidation", "sleep",
+    "language", "intelligence", "creativity", "wellbeing", "therapy", "behavior", "habituation",
+    "sensation", "consciousness", "self-efficacy", "empathy", "trauma", "adolescence", "aging",
+    "temperament", "reward", "punishment", "extinction", "generalization", "modeling", "norms",
+]
+PSYCHOLOGISTS = ["Pavlov", "Skinner", "Piaget", "Bandura", "Milgram", "Freud", "Rogers", "Maslow", "Kahneman"]
+
+# (endpoint name, relative weight) of the load mix
+LOAD_MIX = [
+    ("GET /api/topics", 15),
+    ("GET /api/topics?cursor", 8),
+    ("GET /api/topics?category", 8),
+    ("GET /api/topics?fields=all", 4),
+    ("GET /api/topics/{id}", 20),
+    ("GET /api/search", 15),
+    ("GET /api/categories", 5),
+    ("GET /api/stats", 5),
+    ("GET /api/topics/{id}/related", 5),
+    ("POST /api/ask", 10),
+    ("POST /api/ask/stream", 4),
+    ("POST /api/ask/batch", 1),
+    ("GET /api/chat-history/{session_id}", 6),
+    ("GET /api/", 1),
+    ("POST /api/topics", 1),
+    ("POST /api/topics/import", 1),
+    ("GET /api/admin/*", 2),
+    ("POST /api/admin/stats/recompute", 1),
+]
+
+# Rows per POST /api/topics/import and questions per POST /api/ask/batch
+IMPORT_ROWS = 20
+BATCH_QUESTIONS = 3
+
+
+def synthetic_topic(rng: random.Random, number: int) -> Dict[str, Any]:
+    """A topic shaped like the seed corpus: markdown sections, concepts and references"""
+    words = rng.sample(VOCABULARY, 6)
+    title = f"{words[0].title()} and {words[1].title()} {number}"
+    sections = []
+    for heading in rng.sample(VOCABULARY, 4):
+        paragraphs = [
+            " ".join(rng.choice(VOCABULARY) for _ in range(rng.randint(30, 60))).capitalize() + "."
+            for _ in range(2)
+        ]
+        sections.append(f"## {heading.title()}\n\n" + "\n\n".join(paragraphs))
+    return {
+        "title": title,
+        "category": rng.choice(CATEGORIES),
+        "subcategory": words[2].title(),
+        "content": f"# {title}\n\n" + "\n\n".join(sections),
+        "difficulty_level": rng.choice(DIFFICULTIES),
+        "reading_time": rng.randint(5, 25),
+        "key_concepts": words[2:6],
+        "related_topics": [f"{rng.choice(VOCABULARY).title()} Studies" for _ in range(3)],
+        "psychologists": rng.sample(PSYCHOLOGISTS, 2),
+        "experiments": [f"{rng.choice(VOCABULARY).title()} experiment"],
+    }
+
+
+def use_stand_in():
+    """Swap Motor's client for the in-memory mongomock-motor stand-in"""
+    import motor.motor_asyncio
+    from mongomock_motor import AsyncMongoMockClient
+
+    class StandInClient(AsyncMongoMockClient):
+        def __init__(self, *args, event_listeners=None, **kwargs):
+            # mongomock emits no command events
+            super().__init__(*args, **kwargs)
+
+    motor.motor_asyncio.AsyncIOMotorClient = StandInClient
+
+
+async def seed(server, size: int, seed_value: int):
+    """Replace the benchmark database's topics with `size` synthetic ones"""
+    from platform_stats import recompute_stats
+
+    rng = random.Random(seed_value)
+    await server.db.psychology_topics.delete_many({})
+    await server.db.chat_messages.delete_many({})
+    batch = []
+    for number in range(size):
+        batch.append(server.PsychologyTopic(**synthetic_topic(rng, number)).dict())
+        if len(batch) == 1000:
+            await server.db.psychology_topics.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await server.db.psychology_topics.insert_many(batch, ordered=False)
+    await recompute_stats(server.db)
+
+
+class Workload:
+    """Request factories for the load mix, with arguments drawn from the seeded corpus"""
+
+    def __init__(self, topic_ids: List[str], second_page: str, admin_paths: List[str], rng: random.Random):
+        self.topic_ids = topic_ids
+        self.second_page = second_page
+        self.admin_paths = admin_paths
+        self.rng = rng
+        self.written = 0
+        self.sessions = [f"bench-session-{number}" for number in range(200)]
+        self.requests: Dict[str, Callable] = {
+            "GET /api/topics": lambda http: http.get("/api/topics"),
+            "GET /api/topics?cursor": lambda http: http.get("/api/topics", params={"cursor": self.second_page}),
+            "GET /api/topics?category": lambda http: http.get(
+                "/api/topics", params={"category": self.rng.choice(CATEGORIES)}
+            ),
+            "GET /api/topics?fields=all": lambda http: http.get("/api/topics", params={"fields": "all", "limit": 20}),
+            "GET /api/topics/{id}": lambda http: http.get(f"/api/topics/{self.rng.choice(self.topic_ids)}"),
+            "GET /api/search": lambda http: http.get("/api/search", params={"q": self.rng.choice(VOCABULARY)}),
+            "GET /api/categories": lambda http: http.get("/api/categories"),
+            "GET /api/stats": lambda http: http.get("/api/stats"),
+            "POST /api/ask": lambda http: http.post("/api/ask", json=self.question()),
+            "POST /api/ask/stream": lambda http: http.post("/api/ask/stream", json=self.question()),
+            "GET /api/chat-history/{session_id}": lambda http: http.get(
+                f"/api/chat-history/{self.rng.choice(self.sessions)}"
+            ),
+            "GET /api/topics/{id}/related": lambda http: http.get(
+                f"/api/topics/{self.rng.choice(self.topic_ids)}/related", params={"depth": 2}
+            ),
+            "POST /api/ask/batch": lambda http: http.post("/api/ask/batch", json={
+                "items": [self.question() for _ in range(BATCH_QUESTIONS)], "concurrency": BATCH_QUESTIONS,
+            }),
+            "GET /api/": lambda http: http.get("/api/"),
+            "POST /api/topics": lambda http: http.post("/api/topics", json=self.new_topic()),
+            "POST /api/topics/import": lambda http: http.post(
+                "/api/topics/import", json=[self.new_topic() for _ in range(IMPORT_ROWS)]
+            ),
+            "GET /api/admin/*": lambda http: http.get(self.rng.choice(self.admin_paths)),
+            "POST /api/admin/stats/recompute": lambda http: http.post("/api/admin/stats/recompute"),
+        }
+        self.names = [name for name, _ in LOAD_MIX]
+        self.weights = [weight for _, weight in LOAD_MIX]
+
+    def question(self) -> Dict[str, Any]:
+        return {
+            "question": f"What does research say about {self.rng.choice(VOCABULARY)}?",
+            "topic_id": self.rng.choice(self.topic_ids),
+            "session_id": self.rng.choice(self.sessions),
+        }
+
+    def new_topic(self) -> Dict[str, Any]:
+        self.written += 1
+        return synthetic_topic(self.rng, 10_000_000 + self.written)
+
+    def pick(self) -> Tuple[str, Callable]:
+        name = self.rng.choices(self.names, self.weights)[0]
+        return name, self.requests[name]
+
+
+async def drive(http, workload: Workload, concurrency: int, total_requests: int) -> Tuple[Dict[str, list], Dict[str, int], float]:
+    """Send total_requests from `concurrency` workers; returns latencies, errors and wall time"""
+    latencies: Dict[str, list] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            name, request = workload.pick()
+            started = time.perf_counter()
+            try:
+                response = await request(http)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies[name].append(time.perf_counter() - started)
+            if failed:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+async def run_size(args) -> Dict[str, Any]:
+    """Seed one corpus size, boot the app and run the load mix against it"""
+    import httpx
+
+    sys.path.insert(0, str(BACKEND))
+    if not args.mongo_url:
+        use_stand_in()
+    import server
+    from latency import summarize
+
+    seed_started = time.perf_counter()
+    await seed(server, args.size, args.seed)
+    seed_seconds = time.perf_counter() - seed_started
+
+    app = server.app
+    startup_started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        startup_seconds = time.perf_counter() - startup_started
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as http:
+            first_page = await http.get("/api/topics", params={"limit": 50})
+            topic_ids = [topic["id"] for topic in first_page.json()]
+            async for topic in server.db.psychology_topics.find({}, {"_id": 0, "id": 1}).limit(5000):
+                topic_ids.append(topic["id"])
+            admin_paths = [
+                route.path for route in app.routes
+                if route.path.startswith("/api/admin/") and "GET" in getattr(route, "methods", ())
+            ]
+            workload = Workload(
+                topic_ids, first_page.headers.get("X-Next-Cursor", ""), admin_paths, random.Random(args.seed)
+            )
+
+            await drive(http, workload, args.concurrency, args.warmup)
+            latencies, errors, elapsed = await drive(http, workload, args.concurrency, args.requests)
+
+        if args.mongo_url:
+            await server.client.drop_database(server.db.name)
+
+    total = sum(len(samples) for samples in latencies.values())
+    endpoints = {}
+    for name, _ in LOAD_MIX:
+        samples = latencies.get(name, [])
+        endpoints[name] = {**summarize(samples), "errors": errors.get(name, 0),
+                           "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else None}
+    return {
+        "topics": args.size,
+        "seed_seconds": round(seed_seconds, 3),
+        "startup_seconds": round(startup_seconds, 3),
+        "duration_seconds": round(elapsed, 3),
+        "requests": total,
+        "errors": sum(errors.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+        "overall": summarize(sample for samples in latencies.values() for sample in samples),
+        "endpoints": endpoints,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark every PsychLearn /api route in-process")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"comma-separated corpus sizes (default {DEFAULT_SIZES})")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per corpus size")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client workers")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="mean stub LLM latency")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the corpus and the load mix")
+    parser.add_argument("--mongo-url", help="local mongod, or MONGO_URL (default: in-memory stand-in)")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def child_environment(args, size: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "MONGO_URL": args.mongo_url or "mongodb://stand-in",
+        "DB_NAME": f"psychlearn_bench_{size}",
+        "LLM_PROVIDER": "stub",
+        "STUB_LLM_SEED": str(args.seed),
+        "STUB_LLM_LATENCY_MS": str(args.llm_latency_ms),
+    })
+    return env
+
+
+def main():
+    args = parse_args()
+    if args.size is not None:
+        # Child process: one corpus size, JSON on stdout (the app logs to stderr)
+        print(json.dumps(asyncio.run(run_size(args))))
+        return
+
+    args.mongo_url = args.mongo_url or os.environ.get("MONGO_URL")
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(",") if value.strip()]:
+        print(f"Benchmarking {size} topics...", file=sys.stderr)
+        command = [sys.executable, __file__, "--size", str(size)] + [
+            f"--{name}={value}" for name, value in (
+                ("requests", args.requests), ("warmup", args.warmup), ("concurrency", args.concurrency),
+                ("llm-latency-ms", args.llm_latency_ms), ("seed", args.seed),
+            )
+        ]
+        if args.mongo_url:
+            command.append(f"--mongo-url={args.mongo_url}")
+        completed = subprocess.run(command, env=child_environment(args, size), stdout=subprocess.PIPE, text=True)
+        if completed.returncode != 0:
+            print(f"Benchmark for {size} topics failed with exit code {completed.returncode}", file=sys.stderr)
+            sys.exit(completed.returncode)
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    report = {
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "mongo": "mongod" if args.mongo_url else "mongomock-motor",
+        "concurrency": args.concurrency,
+        "llm_latency_ms": args.llm_latency_ms,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Import time and resident memory of one API worker
+
+Each measurement imports `server` in a fresh interpreter, the way a uvicorn
+worker does, and records the wall time of the import and the process RSS
+right after it. The first import of a tree writes its bytecode cache and is
+not counted. Compile time of server.py is reported separately; that is what a
+worker pays when no bytecode cache exists.
+
+    python benchmarks/import_benchmark.py --compare HEAD~1
+
+--compare measures the backend of another git revision the same way and
+reports the per-worker difference.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKEND = ROOT / "backend"
+
+# Runs in the child interpreter; prints one JSON line
+PROBE = r"""
+import gc, json, resource, sys, time
+started = time.perf_counter()
+import server
+seconds = time.perf_counter() - started
+gc.collect()
+
+def rss_kib():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+rss = rss_kib() / 1024
+with open(server.__file__) as f:
+    source = f.read()
+started = time.perf_counter()
+compile(source, server.__file__, "exec")
+print(json.dumps({"import_seconds": seconds, "rss_mib": rss, "compile_seconds": time.perf_counter() - started}))
+"""
+
+
+def probe(backend: Path) -> Dict[str, float]:
+    env = dict(os.environ)
+    env.update({
+        "MONGO_URL": env.get("MONGO_URL", "mongodb://localhost:27017"),
+        "DB_NAME": env.get("DB_NAME", "psychlearn_import_bench"),
+        "LLM_PROVIDER": "stub",
+    })
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=backend, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def measure(backend: Path, repeats: int) -> Dict[str, Any]:
+    """One uncounted import to warm the caches, then medians over `repeats` imports"""
+    probe(backend)
+    runs = [probe(backend) for _ in range(repeats)]
+    server_py = backend / "server.py"
+    return {
+        "server_py_lines": len(server_py.read_text().splitlines()),
+        "server_py_bytes": server_py.stat().st_size,
+        "compile_ms": round(statistics.median(run["compile_seconds"] for run in runs) * 1000, 1),
+        "import_ms": round(statistics.median(run["import_seconds"] for run in runs) * 1000, 1),
+        "rss_mib": round(statistics.median(run["rss_mib"] for run in runs), 2),
+    }
+
+
+def extract_backend(revision: str, destination: Path) -> Path:
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", revision, "backend"], cwd=ROOT, capture_output=True, check=True
+    ).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(destination)
+    return destination / "backend"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and RSS of the API server module")
+    parser.add_argument("--repeats", type=int, default=5, help="warm imports per tree (default 5)")
+    parser.add_argument("--compare", metavar="REVISION", help="also measure the backend at this git revision")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"python": sys.version.split()[0], "current": measure(BACKEND, args.repeats)}
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tree:
+            report["baseline"] = {"revision": args.compare, **measure(extract_backend(args.compare, Path(tree)), args.repeats)}
+        report["saving_per_worker"] = {
+            key: round(report["baseline"][key] - report["current"][key], 2)
+            for key in ("server_py_lines", "compile_ms", "import_ms", "rss_mib")
+        }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
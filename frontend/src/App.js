@@ -1,15 +1,17 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import './App.css';
 import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const WS_API = API.replace(/^http/, 'ws');
 
 // Main App Component
 function App() {
   const [topics, setTopics] = useState([]);
   const [categories, setCategories] = useState([]);
   const [selectedTopic, setSelectedTopic] = useState(null);
+  const [relatedTopics, setRelatedTopics] = useState(null);
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedCategory, setSelectedCategory] = useState('');
   const [selectedDifficulty, setSelectedDifficulty] = useState('');
@@ -23,6 +25,9 @@ function App() {
   const [chatLoading, setChatLoading] = useState(false);
   const [sessionId, setSessionId] = useState(() => `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`);
   const [showChat, setShowChat] = useState(false);
+  // One tutor WebSocket per chat session, opened on the first question
+  const tutorSocket = useRef(null);
+  const turnHandler = useRef(null);
 
   // Fetch initial data
   useEffect(() => {
@@ -31,6 +36,9 @@ function App() {
     fetchTopics();
   }, []);
 
+  // Close the tutor connection when the app unmounts
+  useEffect(() => () => tutorSocket.current?.close(), []);
+
   const fetchTopics = async (filters = {}) => {
     try {
       setLoading(true);
@@ -99,8 +107,13 @@ function App() {
 
   const openTopic = async (topicId) => {
     try {
-      const response = await axios.get(`${API}/topics/${topicId}`);
+      // The related sidebar comes from the topic graph in the same round trip
+      const [response, related] = await Promise.all([
+        axios.get(`${API}/topics/${topicId}`),
+        axios.get(`${API}/topics/${topicId}/related`).catch(() => null)
+      ]);
       setSelectedTopic(response.data);
+      setRelatedTopics(related ? related.data : null);
       setActiveView('topic-detail');
       // Reset chat when opening a new topic
       setChatMessages([]);
@@ -111,35 +124,125 @@ function App() {
   };
 
   // AI Chat Functions
+  const openTutorSocket = () => new Promise((resolve, reject) => {
+    const current = tutorSocket.current;
+    if (current && current.readyState === WebSocket.OPEN) {
+      resolve(current);
+      return;
+    }
+    const socket = new WebSocket(`${WS_API}/ws/tutor?session_id=${encodeURIComponent(sessionId)}`);
+    socket.onopen = () => resolve(socket);
+    socket.onerror = () => reject(new Error('Tutor connection failed'));
+    socket.onclose = () => {
+      if (tutorSocket.current === socket) tutorSocket.current = null;
+      turnHandler.current?.({ event: 'error', detail: 'Tutor connection closed' });
+    };
+    socket.onmessage = (message) => turnHandler.current?.(JSON.parse(message.data));
+    tutorSocket.current = socket;
+  });
+
+  // Stream one answer over the session's WebSocket; resolves with the final answer
+  const streamOverSocket = (socket, question, onText) => new Promise((resolve, reject) => {
+    let answer = '';
+    turnHandler.current = (payload) => {
+      if (payload.event === 'token') {
+        answer += payload.text;
+        onText(answer);
+      } else if (payload.event === 'done') {
+        turnHandler.current = null;
+        resolve(payload.answer);
+      } else if (payload.event === 'error') {
+        turnHandler.current = null;
+        reject(new Error(payload.detail));
+      }
+    };
+    socket.send(JSON.stringify({ question: question, topic_id: selectedTopic?.id || null }));
+  });
+
+  // Stream one answer over Server-Sent Events, for networks that block WebSockets
+  const streamOverSSE = async (question, onText) => {
+    const response = await fetch(`${API}/ask/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({
+        question: question,
+        topic_id: selectedTopic?.id || null,
+        session_id: sessionId
+      })
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Status code: ${response.status}`);
+    }
+    
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const frames = buffer.split('\n\n');
+      buffer = frames.pop();
+      for (const frame of frames) {
+        const event = frame.match(/^event: (.*)$/m)?.[1];
+        const data = frame.match(/^data: (.*)$/m)?.[1];
+        if (!event || !data) continue;
+        const payload = JSON.parse(data);
+        if (event === 'token') {
+          answer += payload.text;
+          onText(answer);
+        } else if (event === 'done') {
+          return payload.answer;
+        } else if (event === 'error') {
+          throw new Error(payload.detail);
+        }
+      }
+    }
+    return answer;
+  };
+
   const askQuestion = async (question) => {
     if (!question.trim()) return;
     
     setChatLoading(true);
+    const messageId = Date.now();
+    const updateAnswer = (changes) => setChatMessages(prev => prev.map(message => (
+      message.id === messageId ? { ...message, ...changes } : message
+    )));
+    
     try {
-      const response = await axios.post(`${API}/ask`, {
-        question: question,
-        topic_id: selectedTopic?.id || null,
-        session_id: sessionId
-      });
-      
-      const newMessage = {
-        id: Date.now(),
+      setChatMessages(prev => [...prev, {
+        id: messageId,
         question: question,
-        answer: response.data.answer,
+        answer: '',
         timestamp: new Date()
-      };
-      
-      setChatMessages(prev => [...prev, newMessage]);
+      }]);
       setCurrentQuestion('');
+      
+      const onText = (answer) => updateAnswer({ answer });
+      let socket = null;
+      try {
+        socket = await openTutorSocket();
+      } catch (connectError) {
+        console.warn('Tutor WebSocket unavailable, streaming over HTTP instead:', connectError);
+      }
+      const answer = socket
+        ? await streamOverSocket(socket, question, onText)
+        : await streamOverSSE(question, onText);
+      updateAnswer({ answer });
     } catch (error) {
       console.error('Error asking question:', error);
-      setChatMessages(prev => [...prev, {
-        id: Date.now(),
-        question: question,
-        answer: 'Sorry, I encountered an error. Please try again.',
-        timestamp: new Date(),
-        error: true
-      }]);
+      setChatMessages(prev => [
+        ...prev.filter(message => message.id !== messageId),
+        {
+          id: messageId,
+          question: question,
+          answer: 'Sorry, I encountered an error. Please try again.',
+          timestamp: new Date(),
+          error: true
+        }
+      ]);
     } finally {
       setChatLoading(false);
     }
@@ -427,7 +530,7 @@ function App() {
                 <p className="text-blue-600 text-sm mb-3">{topic.category}</p>
                 
                 <div className="text-gray-600 text-sm mb-4 line-clamp-3">
-                  {topic.content.substring(0, 120)}...
+                  {topic.excerpt}...
                 </div>
                 
                 {topic.key_concepts.length > 0 && (
@@ -559,6 +662,10 @@ function App() {
   const TopicDetail = () => {
     if (!selectedTopic) return null;
 
+    // Related names that resolved to a topic are links; the rest stay plain tags
+    const linkedTopics = relatedTopics ? relatedTopics.nodes.filter(node => node.distance > 0) : [];
+    const unlinkedTopics = relatedTopics ? relatedTopics.dangling : selectedTopic.related_topics;
+
     return (
       <section className="py-8 bg-white min-h-screen">
         <div className="container mx-auto px-6 max-w-4xl">
@@ -642,11 +749,20 @@ function App() {
             </div>
             
             {/* Related Topics */}
-            {selectedTopic.related_topics.length > 0 && (
+            {(linkedTopics.length > 0 || unlinkedTopics.length > 0) && (
               <div className="mt-8 p-6 bg-green-50 rounded-lg">
                 <h3 className="text-xl font-bold text-gray-900 mb-4">Related Topics</h3>
                 <div className="flex flex-wrap gap-2">
-                  {selectedTopic.related_topics.map(topic => (
+                  {linkedTopics.map(topic => (
+                    <button
+                      key={topic.id}
+                      onClick={() => openTopic(topic.id)}
+                      className="px-3 py-1 bg-green-200 text-green-900 rounded-full text-sm hover:bg-green-300"
+                    >
+                      {topic.title}
+                    </button>
+                  ))}
+                  {unlinkedTopics.map(topic => (
                     <span key={topic} className="px-3 py-1 bg-green-100 text-green-800 rounded-full text-sm">
                       {topic}
                     </span>
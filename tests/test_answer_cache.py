@@ -0,0 +1,50 @@
+import pytest
+
+from answer_cache import AnswerCache, negations, normalize_question
+
+
+def cached(question, *, asked="What is classical conditioning?"):
+    cache = AnswerCache(similarity_threshold=0.9)
+    cache.put("topic-1", asked, "stored answer")
+    return cache.get("topic-1", question)
+
+
+@pytest.mark.parametrize("question", [
+    "What is classical conditioning?",
+    "what is classical conditioning",
+    "Can you explain classical conditioning",
+    "Please tell me about classical conditioning!",
+])
+def test_rephrased_question_is_a_near_duplicate(question):
+    entry = cached(question)
+    assert entry is not None and entry.answer == "stored answer"
+
+
+@pytest.mark.parametrize("question", [
+    "What is not classical conditioning?",
+    "What isn't classical conditioning?",
+    "What is operant conditioning?",
+])
+def test_negated_or_different_question_is_a_miss(question):
+    assert cached(question) is None
+
+
+def test_with_and_without_are_distinct_questions():
+    assert cached("Does memory decay with rehearsal?", asked="Does memory decay without rehearsal?") is None
+
+
+def test_negated_questions_still_match_each_other():
+    assert cached("Please explain why classical conditioning is not voluntary", asked="Why is classical conditioning not voluntary?") is not None
+
+
+def test_contractions_fold_into_not():
+    assert negations(normalize_question("Why don't we forget?")) == {"not"}
+    assert negations(normalize_question("Learning without reward, never")) == {"without", "never"}
+
+
+def test_answers_are_per_topic():
+    cache = AnswerCache()
+    cache.put("topic-1", "What is classical conditioning?", "stored answer")
+    assert cache.get("topic-2", "What is classical conditioning?") is None
+    cache.invalidate_topic("topic-1")
+    assert cache.get("topic-1", "What is classical conditioning?") is None
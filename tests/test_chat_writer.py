@@ -0,0 +1,103 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from chat_writer import ChatWriteBehind
+
+
+def message(n, session_id="s"):
+    return {"id": f"m{n}", "session_id": session_id, "question": f"q{n}", "answer": f"a{n}"}
+
+
+def run(scenario, **kwargs):
+    async def with_writer():
+        collection = AsyncMongoMockClient()["test"]["chat_messages"]
+        await scenario(collection, ChatWriteBehind(collection, **kwargs))
+
+    asyncio.run(with_writer())
+
+
+def test_put_without_a_running_writer_inserts_directly():
+    async def scenario(collection, writer):
+        await writer.put(message(1))
+        assert await collection.count_documents({}) == 1
+        assert writer.stats()["written"] == 1
+
+    run(scenario)
+
+
+def test_messages_are_written_in_full_batches():
+    async def scenario(collection, writer):
+        writer.start()
+        for n in range(10):
+            await writer.put(message(n))
+        await writer.flush()
+        assert await collection.count_documents({}) == 10
+        assert writer.batches == 3
+        await writer.stop()
+
+    run(scenario, batch_size=4, flush_interval=60)
+
+
+def test_partial_batch_is_written_after_the_flush_interval():
+    async def scenario(collection, writer):
+        writer.start()
+        await writer.put(message(1))
+        assert await collection.count_documents({}) == 0
+        await asyncio.sleep(0.1)
+        assert await collection.count_documents({}) == 1
+        await writer.stop()
+
+    run(scenario, flush_interval=0.02)
+
+
+def test_stop_drains_the_queue():
+    async def scenario(collection, writer):
+        writer.start()
+        for n in range(5):
+            await writer.put(message(n))
+        await writer.stop()
+        assert not writer.running
+        assert await collection.count_documents({}) == 5
+
+    run(scenario, flush_interval=60)
+
+
+def test_failed_inserts_are_counted_and_the_rest_written():
+    async def scenario(collection, writer):
+        await collection.create_index("id", unique=True)
+        await collection.insert_one(message(2))
+        writer.start()
+        for n in range(4):
+            await writer.put(message(n))
+        await writer.flush()
+        assert await collection.count_documents({}) == 4
+        assert (writer.written, writer.failed) == (3, 1)
+        await writer.stop()
+
+    run(scenario, flush_interval=60)
+
+
+def test_full_queue_applies_backpressure():
+    async def scenario(collection, writer):
+        writer.start()
+        await asyncio.gather(*(writer.put(message(n)) for n in range(6)))
+        await writer.stop()
+        assert writer.backpressure_waits > 0
+        assert await collection.count_documents({}) == 6
+
+    run(scenario, max_queue=2, batch_size=2, flush_interval=60)
+
+
+def test_pending_lists_a_sessions_unwritten_messages_until_written():
+    async def scenario(collection, writer):
+        writer.start()
+        await writer.put(message(1, session_id="a"))
+        await writer.put(message(2, session_id="b"))
+        assert [document["id"] for document in writer.pending("a")] == ["m1"]
+        assert writer.pending("missing") == []
+        await writer.flush()
+        assert writer.pending("a") == [] and writer.pending("b") == []
+        await writer.stop()
+
+    run(scenario, flush_interval=60)
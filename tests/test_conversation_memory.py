@@ -0,0 +1,163 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+
+from conversation_memory import ConversationMemory, SessionMemory, Turn, summarize_turn
+from passages import estimate_tokens
+
+T0 = datetime(2026, 1, 1, 9, 0, 0)
+
+
+def turn(n, answer_words=40):
+    answer = f"Answer {n} opens with one sentence. " + " ".join(["detail"] * answer_words)
+    return Turn(f"Question {n}?", answer, T0 + timedelta(minutes=n), f"m{n:02d}")
+
+
+def message(session_id, n):
+    t = turn(n)
+    return {"id": t.id, "session_id": session_id, "question": t.question, "answer": t.answer, "created_at": t.created_at}
+
+
+def make_memory(messages=None, summaries=None, **kwargs):
+    kwargs.setdefault("token_budget", 200)
+    kwargs.setdefault("summary_token_budget", 60)
+    return ConversationMemory(messages, summaries, **kwargs)
+
+
+def test_summarize_turn_keeps_the_question_and_first_sentence():
+    line = summarize_turn(turn(1))
+    assert line == "- Asked: Question 1? / Answer: Answer 1 opens with one sentence."
+    assert len(summarize_turn(turn(1, answer_words=0), max_chars=20)) == 20
+
+
+def test_compact_folds_oldest_turns_until_within_budget():
+    memory = make_memory(token_budget=300)
+    session = SessionMemory(turns=[turn(n) for n in range(6)])
+    assert memory.compact(session)
+    assert estimate_tokens(session.render()) <= memory.token_budget
+    assert len(session.turns) < 6 and session.turns[-1].id == "m05"
+    assert session.summarized_turns == 6 - len(session.turns)
+    last_folded = turn(5 - len(session.turns))
+    assert session.summarized_through == [last_folded.created_at, last_folded.id]
+    assert f"Asked: {last_folded.question}" in session.summary
+    assert not memory.compact(session)
+
+
+def test_compact_keeps_the_minimum_recent_turns_even_over_budget():
+    memory = make_memory(token_budget=10, min_recent_turns=2)
+    session = SessionMemory(turns=[turn(n) for n in range(4)])
+    memory.compact(session)
+    assert [t.id for t in session.turns] == ["m02", "m03"]
+    # The summary alone fills the budget, so render() leaves the kept turns out of the prompt
+    assert memory.render(session) == session.render_summary()
+
+
+def test_summary_rolls_oldest_lines_off_past_its_budget():
+    memory = make_memory(token_budget=60, summary_token_budget=30, min_recent_turns=1)
+    session = SessionMemory(turns=[turn(n) for n in range(8)])
+    memory.compact(session)
+    assert len(session.summary) <= 30 * 4
+    assert "Question 0?" not in session.summary
+    assert session.summarized_turns == 7
+
+
+def test_compacted_summary_is_persisted_and_reloaded_by_another_worker():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await db.chat_messages.insert_many([message("s", n) for n in range(6)])
+
+        first = make_memory(db.chat_messages, db.chat_summaries)
+        loaded = await first.load("s")
+        assert first.compactions == 1
+        saved = await db.chat_summaries.find_one({"session_id": "s"})
+        assert saved["summary"] == loaded.summary
+
+        other = make_memory(db.chat_messages, db.chat_summaries)
+        reloaded = await other.load("s")
+        assert reloaded.summary == loaded.summary
+        assert [t.id for t in reloaded.turns] == [t.id for t in loaded.turns]
+        assert other.compactions == 0
+
+    asyncio.run(scenario())
+
+
+def test_new_sessions_skip_the_database_and_append_compacts():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        memory = make_memory(db.chat_messages, db.chat_summaries)
+        session = await memory.load("fresh", new_session=True)
+        assert memory.loads == 0 and session.is_empty()
+        for n in range(6):
+            await memory.append("fresh", message("fresh", n))
+        assert session.summarized_turns > 0
+        assert await db.chat_summaries.count_documents({"session_id": "fresh"}) == 1
+
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_sessions_are_evicted():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        memory = make_memory(db.chat_messages, db.chat_summaries, max_sessions=2)
+        for session_id in ["a", "b", "a", "c"]:
+            await memory.load(session_id, new_session=True)
+        assert memory.evicted == 1
+        assert memory.hits == 1
+        await memory.load("a", new_session=True)
+        assert memory.hits == 2
+
+    asyncio.run(scenario())
+
+
+def test_cache_hit_catches_up_with_turns_other_workers_stored():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await db.chat_messages.insert_many([message("s", n) for n in range(2)])
+        memory = make_memory(db.chat_messages, db.chat_summaries, token_budget=2000)
+        session = await memory.load("s")
+        await memory.append("s", message("s", 2))
+
+        # Turn 3 was answered by another worker; turn 2 is already cached here
+        await db.chat_messages.insert_many([message("s", 2), message("s", 3)])
+        session = await memory.load("s")
+        assert [t.id for t in session.turns] == ["m00", "m01", "m02", "m03"]
+        assert memory.caught_up_turns == 1
+        assert (await memory.load("s")).turns[-1].id == "m03"
+
+    asyncio.run(scenario())
+
+
+def test_pending_messages_are_read_without_waiting_for_the_write():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await db.chat_messages.insert_one(message("s", 0))
+        queued = {"s": [message("s", 1)], "other": [message("other", 5)]}
+        memory = make_memory(db.chat_messages, db.chat_summaries, token_budget=2000,
+                             pending=lambda session_id: queued.get(session_id, []))
+        session = await memory.load("s")
+        assert [t.id for t in session.turns] == ["m00", "m01"]
+
+    asyncio.run(scenario())
+
+
+def test_an_older_summary_does_not_overwrite_a_newer_one():
+    async def scenario():
+        db = AsyncMongoMockClient()["test"]
+        await db.chat_summaries.create_index("session_id", unique=True)
+        await db.chat_messages.insert_many([message("s", n) for n in range(8)])
+        newer = make_memory(db.chat_messages, db.chat_summaries)
+        ahead = await newer.load("s")
+
+        stale = make_memory(db.chat_messages, db.chat_summaries)
+        behind = SessionMemory(turns=[turn(n) for n in range(4)])
+        stale.compact(behind)
+        stale._remember("s", behind)
+        await stale._persist("s", behind)
+
+        saved = await db.chat_summaries.find_one({"session_id": "s"})
+        assert saved["summarized_turns"] == ahead.summarized_turns > behind.summarized_turns
+        assert stale.stale_summaries == 1
+        assert len(stale) == 0
+
+    asyncio.run(scenario())
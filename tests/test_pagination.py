@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import after_keyset, decode_cursor, encode_cursor, keyset_condition, next_cursor
+
+SORT = [("created_at", 1), ("id", 1)]
+
+
+def test_cursor_round_trips_datetimes_and_scalars():
+    values = [datetime(2026, 3, 1, 9, 30, 15, 250000), "topic-7"]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == values
+
+
+@pytest.mark.parametrize("cursor", ["not base64 !", encode_cursor(["only-one"]), "eyJhIjoxfQ"])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+def test_keyset_condition_orders_by_each_key_in_turn():
+    assert keyset_condition([("score", -1), ("id", 1)], [2.5, "b"]) == {
+        "$or": [{"score": {"$lt": 2.5}}, {"score": 2.5, "id": {"$gt": "b"}}]
+    }
+
+
+def test_after_keyset_keeps_the_route_filter():
+    assert after_keyset({"session_id": "s"}, SORT, None) == {"session_id": "s"}
+    assert after_keyset({}, SORT, [1, "a"]) == keyset_condition(SORT, [1, "a"])
+    assert after_keyset({"session_id": "s"}, SORT, [1, "a"]) == {
+        "$and": [{"session_id": "s"}, keyset_condition(SORT, [1, "a"])]
+    }
+
+
+def test_next_cursor_only_when_an_extra_item_was_fetched():
+    items = [{"created_at": n, "id": f"t{n}"} for n in range(4)]
+    assert next_cursor(items[:3], SORT, 3) is None
+    assert decode_cursor(next_cursor(items, SORT, 3), 2) == [2, "t2"]
+
+
+def test_pages_walk_every_item_exactly_once():
+    items = sorted(
+        ({"created_at": n // 3, "id": f"t{n:02d}"} for n in range(10)),
+        key=lambda item: (item["created_at"], item["id"]),
+    )
+
+    def page(after, limit=4):
+        matching = [
+            item for item in items
+            if after is None or (item["created_at"], item["id"]) > tuple(after)
+        ]
+        return matching[:limit + 1]
+
+    seen, after = [], None
+    while True:
+        fetched = page(after)
+        seen.extend(fetched[:4])
+        cursor = next_cursor(fetched, SORT, 4)
+        if cursor is None:
+            break
+        after = decode_cursor(cursor, 2)
+    assert seen == items
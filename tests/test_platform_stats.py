@@ -0,0 +1,105 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from platform_stats import STATS_COLLECTION, STATS_ID, read_stats, record_topics
+
+
+def topic(category="Learning", difficulty_level="introductory"):
+    return {"category": category, "difficulty_level": difficulty_level}
+
+
+class CountingCollection:
+    def __init__(self, collection, owner):
+        self.collection = collection
+        self.owner = owner
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def update_one(self, *args, **kwargs):
+        self.owner.updates += 1
+        return await self.collection.update_one(*args, **kwargs)
+
+    def aggregate(self, *args, **kwargs):
+        self.owner.aggregations += 1
+        return self.collection.aggregate(*args, **kwargs)
+
+
+class CountingDatabase:
+    """Database proxy that counts stats updates and recompute aggregations"""
+
+    def __init__(self, db):
+        self.db = db
+        self.updates = 0
+        self.aggregations = 0
+
+    def __getitem__(self, name):
+        return CountingCollection(self.db[name], self)
+
+    def __getattr__(self, name):
+        return CountingCollection(self.db[name], self)
+
+
+def run(scenario):
+    async def with_db():
+        await scenario(CountingDatabase(AsyncMongoMockClient()["test"]))
+
+    asyncio.run(with_db())
+
+
+async def insert(db, topics):
+    await db.db.psychology_topics.insert_many([dict(t) for t in topics])
+    await record_topics(db, topics)
+
+
+def test_inserted_topics_are_applied_with_one_batched_inc():
+    async def scenario(db):
+        await read_stats(db)
+        assert db.aggregations == 1
+
+        await insert(db, [topic(), topic(), topic("Cognitive Psychology", "advanced")])
+        assert (db.updates, db.aggregations) == (1, 1)
+
+        stats = await read_stats(db)
+        assert stats["total_topics"] == 3
+        assert stats["topics_by_category"] == {"Learning": 2, "Cognitive Psychology": 1}
+        assert stats["topics_by_difficulty"]["introductory"] == 2
+        assert stats["topics_by_difficulty"]["advanced"] == 1
+
+    run(scenario)
+
+
+def test_no_topics_writes_nothing():
+    async def scenario(db):
+        await record_topics(db, [])
+        assert (db.updates, db.aggregations) == (0, 0)
+
+    run(scenario)
+
+
+def test_missing_stats_document_is_recomputed_instead_of_incremented():
+    async def scenario(db):
+        await db.db.psychology_topics.insert_many([topic(), topic()])
+        await insert(db, [topic("Social Psychology")])
+        assert db.aggregations == 1
+
+        stats = await read_stats(db)
+        assert stats["total_topics"] == 3
+        assert stats["topics_by_category"] == {"Learning": 2, "Social Psychology": 1}
+
+    run(scenario)
+
+
+def test_names_that_are_not_field_paths_fall_back_to_a_recompute():
+    async def scenario(db):
+        await read_stats(db)
+        for category in ["Psych 2.0", "$where"]:
+            await insert(db, [topic(category)])
+        assert db.updates == 0
+        assert db.aggregations == 3
+
+        stored = await db.db[STATS_COLLECTION].find_one({"_id": STATS_ID})
+        assert stored["total_topics"] == 2
+
+    run(scenario)
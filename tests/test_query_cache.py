@@ -0,0 +1,98 @@
+import asyncio
+
+from query_cache import QueryCache, normalize_fields, normalize_text
+
+
+class Loader:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return f"result {self.calls}"
+
+
+def run(scenario):
+    asyncio.run(scenario())
+
+
+def test_a_hit_does_not_call_the_loader():
+    async def scenario():
+        cache, loader = QueryCache(), Loader()
+        assert await cache.get_or_load("q", loader) == "result 1"
+        assert await cache.get_or_load("q", loader) == "result 1"
+        assert loader.calls == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    run(scenario)
+
+
+def test_bump_version_invalidates_entries():
+    async def scenario():
+        cache, loader = QueryCache(), Loader()
+        await cache.get_or_load("q", loader)
+        cache.bump_version()
+        assert await cache.get_or_load("q", loader) == "result 2"
+        assert cache.invalidations == 1
+        assert len(cache) == 1
+
+    run(scenario)
+
+
+def test_entries_expire_after_the_ttl():
+    async def scenario():
+        cache, loader = QueryCache(ttl_seconds=0.02), Loader()
+        await cache.get_or_load("q", loader)
+        await asyncio.sleep(0.05)
+        assert await cache.get_or_load("q", loader) == "result 2"
+        assert cache.expirations == 1
+
+    run(scenario)
+
+
+def test_least_recently_used_entry_is_evicted():
+    async def scenario():
+        cache, loader = QueryCache(max_entries=2), Loader()
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("b", loader)
+        await cache.get_or_load("a", loader)
+        await cache.get_or_load("c", loader)
+        assert cache.evictions == 1
+        assert await cache.get_or_load("a", loader) == "result 1"
+        assert await cache.get_or_load("b", loader) == "result 4"
+
+    run(scenario)
+
+
+def test_concurrent_misses_are_coalesced():
+    async def scenario():
+        cache, loader = QueryCache(), Loader(delay=0.02)
+        results = await asyncio.gather(*(cache.get_or_load("q", loader) for _ in range(5)))
+        assert results == ["result 1"] * 5
+        assert loader.calls == 1
+        assert cache.stats()["coalesced"] == 4
+
+    run(scenario)
+
+
+def test_a_result_loaded_across_a_version_bump_is_not_stored():
+    async def scenario():
+        cache, loader = QueryCache(), Loader(delay=0.02)
+        pending = asyncio.ensure_future(cache.get_or_load("q", loader))
+        await asyncio.sleep(0)
+        cache.bump_version()
+        assert await pending == "result 1"
+        assert len(cache) == 0
+        assert await cache.get_or_load("q", loader) == "result 2"
+
+    run(scenario)
+
+
+def test_normalizers_ignore_case_spacing_and_field_order():
+    assert normalize_text("  Classical   CONDITIONING ") == "classical conditioning"
+    assert normalize_text("   ") is None
+    assert normalize_fields("title, id,title") == "id,title"
+    assert normalize_fields("all") == "all"
+    assert normalize_fields("") is None
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, LLMGuard, OverloadedError
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise RuntimeError("boom")
+
+
+def make_guard(**kwargs):
+    breaker = CircuitBreaker(failure_threshold=2, window=4, slow_call_seconds=0.05, reset_timeout=0.05)
+    return LLMGuard(breaker, deadline_seconds=1, max_concurrency=1, queue_timeout=0.01, **kwargs)
+
+
+async def trip(guard):
+    for _ in range(guard.breaker.failure_threshold):
+        with pytest.raises(RuntimeError):
+            await guard.call(fail)
+    assert guard.breaker.state == OPEN
+
+
+def test_opens_after_consecutive_failures_and_recovers_through_half_open():
+    async def scenario():
+        guard = make_guard()
+        await trip(guard)
+        with pytest.raises(CircuitOpenError):
+            await guard.call(ok)
+        await asyncio.sleep(0.06)
+        assert guard.breaker.state == HALF_OPEN
+        assert await guard.call(ok) == "ok"
+        assert guard.breaker.state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_failed_probe_reopens():
+    async def scenario():
+        guard = make_guard()
+        await trip(guard)
+        await asyncio.sleep(0.06)
+        with pytest.raises(RuntimeError):
+            await guard.call(fail)
+        assert guard.breaker.state == OPEN
+        assert guard.breaker.times_opened == 2
+
+    asyncio.run(scenario())
+
+
+def test_overload_during_half_open_gives_the_probe_back():
+    async def scenario():
+        guard = make_guard()
+        await trip(guard)
+        await asyncio.sleep(0.06)
+        # Every slot is busy, so the admitted probe never starts
+        await guard._semaphore.acquire()
+        with pytest.raises(OverloadedError):
+            await guard.call(ok)
+        guard._semaphore.release()
+        assert guard.breaker.state == HALF_OPEN
+        assert await guard.call(ok) == "ok"
+        assert guard.breaker.state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_while_queued_gives_the_probe_back():
+    async def scenario():
+        guard = make_guard()
+        guard.queue_timeout = 1
+        await trip(guard)
+        await asyncio.sleep(0.06)
+        await guard._semaphore.acquire()
+        waiting = asyncio.create_task(guard.call(ok))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        guard._semaphore.release()
+        assert await guard.call(ok) == "ok"
+        assert guard.breaker.state == CLOSED
+
+    asyncio.run(scenario())
+
+
+def test_sustained_slow_calls_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=5, window=4, slow_call_seconds=1.0, slow_call_rate=0.5)
+    breaker.record(True, 2.0)
+    assert breaker.state == CLOSED
+    breaker.record(True, 2.0)
+    assert breaker.state == OPEN
+
+
+def test_deadline_counts_as_failure_and_is_observed():
+    observed = []
+
+    async def scenario():
+        guard = make_guard(observer=lambda seconds, success: observed.append(success))
+        guard.deadline_seconds = 0.01
+        with pytest.raises(asyncio.TimeoutError):
+            await guard.call(lambda: asyncio.sleep(1))
+        assert guard.timeouts == 1
+        assert guard.breaker.consecutive_failures == 1
+
+    asyncio.run(scenario())
+    assert observed == [False]
+
+
+def test_per_call_queue_timeout_waits_for_a_slot():
+    async def scenario():
+        guard = make_guard()
+        await guard._semaphore.acquire()
+        asyncio.get_running_loop().call_later(0.05, guard._semaphore.release)
+        with pytest.raises(OverloadedError):
+            await guard.call(ok)
+        assert await guard.call(ok, queue_timeout=1) == "ok"
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+from search_index import BM25Index, tokenize
+
+
+def topic(topic_id, title, content="", category="Learning", difficulty_level="beginner", **fields):
+    return {
+        "id": topic_id, "title": title, "content": content,
+        "category": category, "difficulty_level": difficulty_level, **fields,
+    }
+
+
+def make_index():
+    index = BM25Index()
+    index.add_many([
+        topic("classical", "Classical Conditioning", "Pavlov paired a bell with food.", key_concepts=["Stimulus"]),
+        topic("operant", "Operant Conditioning", "Behavior shaped by reinforcement and punishment."),
+        topic("memory", "Working Memory", "Short-term storage; conditioning is mentioned once.",
+              category="Cognitive Psychology", difficulty_level="intermediate"),
+        topic("attachment", "Attachment Theory", "Bowlby and the bond between infant and caregiver.",
+              category="Developmental Psychology", psychologists=["John Bowlby"]),
+    ])
+    return index
+
+
+def ids(results):
+    return [topic_id for topic_id, _ in results]
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert tokenize("Pavlov's DOG, 1897!") == ["pavlov", "s", "dog", "1897"]
+
+
+def test_title_match_outranks_body_match():
+    results = make_index().search("conditioning")
+    assert set(ids(results)[:2]) == {"classical", "operant"}
+    assert ids(results)[-1] == "memory"
+
+
+def test_rarer_terms_weigh_more():
+    assert ids(make_index().search("classical conditioning"))[0] == "classical"
+
+
+def test_prefix_expansion_matches_longer_terms():
+    assert "classical" in ids(make_index().search("condition"))
+    assert make_index().search("co") == []
+
+
+def test_filters_apply_to_category_substring_and_difficulty():
+    index = make_index()
+    assert ids(index.search("conditioning", category="cognitive")) == ["memory"]
+    assert ids(index.search("conditioning", difficulty_level="intermediate")) == ["memory"]
+
+
+def test_after_resumes_below_the_previous_page():
+    index = make_index()
+    everything = index.search("conditioning", limit=10)
+    first = index.search("conditioning", limit=2)
+    second = index.search("conditioning", limit=2, after=(first[-1][1], first[-1][0]))
+    assert first + second == everything
+
+
+def test_re_adding_a_topic_replaces_it_and_remove_forgets_terms():
+    index = make_index()
+    index.add(topic("attachment", "Attachment Styles", "Secure and anxious attachment."))
+    assert index.search("bowlby") == []
+    assert ids(index.search("anxious")) == ["attachment"]
+
+    index.remove("attachment")
+    assert "attachment" not in index
+    assert index.search("anxious") == []
+    assert "anxious" not in index.vocabulary
+    assert len(index) == 3
+
+
+def test_terms_added_between_lookups_are_found_by_prefix():
+    index = make_index()
+    assert index.search("hippo") == []
+    index.add(topic("hippocampus", "Hippocampus", "Memory consolidation in the hippocampus."))
+    index.add(topic("amygdala", "Amygdala", "Fear conditioning."))
+    assert ids(index.search("hippo")) == ["hippocampus"]
+    assert index.vocabulary == sorted(index.postings)
+
+    index.remove("amygdala")
+    index.add(topic("amygdala", "Amygdala", "Emotional memory."))
+    assert ids(index.search("amyg")) == ["amygdala"]
+    assert index.vocabulary == sorted(index.postings)
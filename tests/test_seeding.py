@@ -0,0 +1,121 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo.errors import BulkWriteError
+
+from seeding import DUPLICATE_KEY, content_hash, seed_slug, seed_topics
+
+CREATED = datetime(2025, 1, 1)
+
+
+def build_document(row):
+    return {"id": str(uuid.uuid4()), "created_at": CREATED, **row}
+
+
+def rows():
+    return [
+        {"title": "Classical Conditioning", "content": "Pavlov paired a bell with food."},
+        {"slug": "operant", "title": "Operant Conditioning", "content": "Reinforcement shapes behavior."},
+    ]
+
+
+class RacingCollection:
+    """Collection proxy whose bulk writes fail as if another worker upserted first"""
+
+    def __init__(self, collection, code=DUPLICATE_KEY):
+        self.collection = collection
+        self.code = code
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    async def bulk_write(self, operations, ordered=True):
+        await self.collection.bulk_write(operations, ordered=ordered)
+        raise BulkWriteError({"writeErrors": [{"index": 0, "code": self.code, "errmsg": "E11000"}]})
+
+
+def run(scenario):
+    async def with_collection():
+        await scenario(AsyncMongoMockClient()["test"]["psychology_topics"])
+
+    asyncio.run(with_collection())
+
+
+async def stored(collection):
+    return {doc["seed_slug"]: doc async for doc in collection.find({}, {"_id": 0})}
+
+
+def test_slug_comes_from_the_row_or_its_title():
+    classical, operant = rows()
+    assert seed_slug(classical) == "classical-conditioning"
+    assert seed_slug(operant) == "operant"
+    assert content_hash(operant) == content_hash({**operant, "slug": "renamed"})
+
+
+def test_first_run_inserts_and_a_second_run_writes_nothing():
+    async def scenario(collection):
+        first = await seed_topics(collection, rows(), build_document)
+        assert (first.inserted, first.updated, first.unchanged) == (2, 0, 0)
+        before = await stored(collection)
+
+        second = await seed_topics(collection, rows(), build_document)
+        assert (second.inserted, second.updated, second.unchanged) == (0, 0, 2)
+        assert not second.changed
+        assert await stored(collection) == before
+
+    run(scenario)
+
+
+def test_an_edited_row_updates_in_place_keeping_id_and_created_at():
+    async def scenario(collection):
+        await seed_topics(collection, rows(), build_document)
+        original = (await stored(collection))["operant"]
+
+        edited = rows()
+        edited[1]["content"] = "Consequences shape behavior."
+        result = await seed_topics(collection, edited, build_document)
+        assert (result.inserted, result.updated, result.unchanged) == (0, 1, 1)
+
+        documents = await stored(collection)
+        assert len(documents) == 2
+        updated = documents["operant"]
+        assert updated["content"] == "Consequences shape behavior."
+        assert (updated["id"], updated["created_at"]) == (original["id"], original["created_at"])
+        assert updated["seed_hash"] != original["seed_hash"]
+        assert updated["updated_at"] >= original["updated_at"]
+
+    run(scenario)
+
+
+def test_a_legacy_topic_without_a_slug_is_adopted_by_title():
+    async def scenario(collection):
+        await collection.insert_one({"id": "legacy-id", "title": "Classical Conditioning", "content": "Old text"})
+        result = await seed_topics(collection, rows(), build_document)
+        assert (result.inserted, result.updated) == (1, 1)
+
+        assert await collection.count_documents({}) == 2
+        adopted = await collection.find_one({"id": "legacy-id"}, {"_id": 0})
+        assert adopted["seed_slug"] == "classical-conditioning"
+        assert adopted["content"] == "Pavlov paired a bell with food."
+
+    run(scenario)
+
+
+def test_duplicate_keys_from_a_concurrent_seed_are_ignored():
+    async def scenario(collection):
+        result = await seed_topics(RacingCollection(collection), rows(), build_document)
+        assert result.inserted == 2
+        assert await collection.count_documents({}) == 2
+
+    run(scenario)
+
+
+def test_other_bulk_write_errors_are_raised():
+    async def scenario(collection):
+        with pytest.raises(BulkWriteError):
+            await seed_topics(RacingCollection(collection, code=121), rows(), build_document)
+
+    run(scenario)
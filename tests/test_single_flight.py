@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from query_cache import SingleFlight
+
+
+class Counter:
+    def __init__(self, result="answer", error=None, delay=0.02):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_calls_for_one_key_share_a_single_run():
+    async def scenario():
+        flight, fn = SingleFlight(), Counter()
+        results = await asyncio.gather(*(flight.do("q", fn) for _ in range(5)))
+        assert results == ["answer"] * 5
+        assert fn.calls == 1
+        assert flight.coalesced == 4
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_different_keys_and_later_calls_run_separately():
+    async def scenario():
+        flight, fn = SingleFlight(), Counter()
+        await asyncio.gather(flight.do("a", fn), flight.do("b", fn))
+        await flight.do("a", fn)
+        assert fn.calls == 3
+        assert flight.coalesced == 0
+
+    asyncio.run(scenario())
+
+
+def test_every_waiter_sees_the_error_and_the_key_is_released():
+    async def scenario():
+        flight, fn = SingleFlight(), Counter(error=RuntimeError("llm down"))
+        results = await asyncio.gather(flight.do("q", fn), flight.do("q", fn), return_exceptions=True)
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert fn.calls == 1
+        assert len(flight) == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight, fn = SingleFlight(), Counter()
+        first = asyncio.ensure_future(flight.do("q", fn))
+        second = asyncio.ensure_future(flight.do("q", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == "answer"
+        assert fn.calls == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,85 @@
+from topic_graph import TopicGraph, title_key
+
+
+def topic(topic_id, title, *related):
+    return {"id": topic_id, "title": title, "category": "Learning", "related_topics": list(related)}
+
+
+def make_graph():
+    graph = TopicGraph()
+    graph.add_many([
+        topic("cc", "Classical Conditioning", "Operant Conditioning", "Little Albert"),
+        topic("oc", "Operant Conditioning", "Reinforcement Schedules"),
+        topic("rs", "Reinforcement Schedules"),
+    ])
+    return graph
+
+
+def node_distances(result):
+    return {node["id"]: node["distance"] for node in result["nodes"]}
+
+
+def test_title_key_ignores_case_spacing_and_punctuation():
+    assert title_key("  Piaget's  Stages ") == title_key("piaget s stages") == "piaget s stages"
+
+
+def test_names_resolve_in_either_insertion_order():
+    graph = make_graph()
+    assert graph.outgoing["cc"] == ["oc"]
+    assert graph.outgoing["oc"] == ["rs"]
+    assert graph.dangling["cc"] == ["Little Albert"]
+
+    graph.add(topic("la", "little albert"))
+    assert graph.outgoing["cc"] == ["oc", "la"]
+    assert graph.dangling["cc"] == []
+
+
+def test_neighborhood_walks_links_in_both_directions_by_depth():
+    graph = make_graph()
+    assert node_distances(graph.neighborhood("oc")) == {"oc": 0, "rs": 1, "cc": 1}
+    deep = graph.neighborhood("rs", depth=2)
+    assert node_distances(deep) == {"rs": 0, "oc": 1, "cc": 2}
+    assert sorted(deep["edges"]) == [["cc", "oc"], ["oc", "rs"]]
+    assert graph.neighborhood("missing") is None
+
+
+def test_neighborhood_limit_caps_related_topics():
+    graph = TopicGraph()
+    graph.add(topic("hub", "Hub", *[f"Spoke {n}" for n in range(5)]))
+    graph.add_many(topic(f"s{n}", f"Spoke {n}") for n in range(5))
+    result = graph.neighborhood("hub", limit=2)
+    assert len(result["nodes"]) == 3
+    assert all(source == "hub" for source, _ in result["edges"])
+
+
+def test_self_references_are_ignored():
+    graph = TopicGraph()
+    graph.add(topic("a", "Attachment", "attachment"))
+    assert graph.outgoing["a"] == [] and graph.dangling["a"] == []
+
+
+def test_removing_a_topic_leaves_references_to_it_dangling_until_re_added():
+    graph = make_graph()
+    graph.remove("oc")
+    assert "oc" not in graph
+    assert graph.outgoing["cc"] == []
+    assert "Operant Conditioning" in graph.dangling["cc"]
+
+    graph.add(topic("oc2", "Operant Conditioning"))
+    assert graph.outgoing["cc"] == ["oc2"]
+
+
+def test_re_adding_a_topic_replaces_its_links():
+    graph = make_graph()
+    graph.add(topic("oc", "Operant Conditioning"))
+    assert graph.outgoing["oc"] == []
+    assert "oc" not in graph.incoming["rs"]
+    assert graph.outgoing["cc"] == ["oc"]
+
+
+def test_stats_and_dangling_report():
+    graph = make_graph()
+    assert graph.stats() == {"topics": 3, "edges": 2, "dangling_references": 1, "topics_with_dangling": 1}
+    assert graph.dangling_references() == [
+        {"topic_id": "cc", "title": "Classical Conditioning", "missing": ["Little Albert"]}
+    ]
@@ -0,0 +1,83 @@
+import asyncio
+from typing import List
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pydantic import BaseModel, TypeAdapter
+
+from topic_import import chunked, insert_chunk, is_ndjson, json_array_rows, ndjson_rows, validate_chunk
+
+
+class Row(BaseModel):
+    title: str
+    reading_time: int
+
+
+adapter = TypeAdapter(List[Row])
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+async def body(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def test_ndjson_content_types():
+    assert is_ndjson("application/x-ndjson; charset=utf-8")
+    assert not is_ndjson("application/json")
+    assert not is_ndjson(None)
+
+
+def test_ndjson_rows_reassemble_lines_split_across_chunks():
+    rows = asyncio.run(collect(ndjson_rows(body(b'{"title": "A"}\n{"ti', b'tle": "B"}\n\n{broken\n', b'{"title": "C"}'))))
+    assert rows[0] == {"title": "A"} and rows[1] == {"title": "B"} and rows[3] == {"title": "C"}
+    assert len(rows) == 4 and not isinstance(rows[2], dict)
+
+
+def test_json_array_rows_rejects_anything_but_an_array():
+    assert asyncio.run(collect(json_array_rows(b'[{"title": "A"}]'))) == [{"title": "A"}]
+    with pytest.raises(ValueError):
+        json_array_rows(b'{"title": "A"}')
+    with pytest.raises(ValueError):
+        json_array_rows(b"not json")
+
+
+def test_chunked_yields_full_chunks_then_the_rest():
+    chunks = asyncio.run(collect(chunked(body(*range(7)), 3)))
+    assert chunks == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_validate_chunk_reports_bad_rows_by_upload_index():
+    rows = [
+        {"title": "ok", "reading_time": 5},
+        {"title": "no time"},
+        {"title": "bad time", "reading_time": "soon"},
+        {"title": "also ok", "reading_time": 3},
+    ]
+    broken = asyncio.run(collect(ndjson_rows(body(b"{"))))
+    valid, errors = validate_chunk(adapter, rows + broken, first_index=100)
+
+    assert [(index, model.title) for index, model in valid] == [(100, "ok"), (103, "also ok")]
+    assert [error["index"] for error in errors] == [101, 102, 104]
+    assert errors[0]["errors"][0]["field"] == "reading_time"
+    assert errors[2]["errors"] == [{"field": "__root__", "message": "Invalid JSON"}]
+
+
+def test_insert_chunk_keeps_going_past_duplicate_keys():
+    async def scenario():
+        collection = AsyncMongoMockClient()["test"]["psychology_topics"]
+        await collection.create_index("id", unique=True)
+        await collection.insert_one({"id": "t2"})
+        documents = [(10 + n, {"id": f"t{n}"}) for n in range(4)]
+
+        inserted, errors = await insert_chunk(collection, documents)
+        assert [document["id"] for document in inserted] == ["t0", "t1", "t3"]
+        assert all("_id" not in document for document in inserted)
+        assert [error["index"] for error in errors] == [12]
+        assert await collection.count_documents({}) == 4
+        assert await insert_chunk(collection, []) == ([], [])
+
+    asyncio.run(scenario())
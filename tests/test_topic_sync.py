@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from mongomock_motor import AsyncMongoMockClient
+
+from topic_sync import TopicSync, topic_version
+
+T0 = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def topic(topic_id, updated_at):
+    return {"id": topic_id, "title": topic_id.title(), "updated_at": updated_at}
+
+
+class CountingCollection:
+    """Collection proxy that counts how many whole topic documents reads return"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.full_documents = 0
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def find(self, query, projection=None):
+        cursor = self.collection.find(query, projection)
+        if projection == {"_id": 0}:
+            return CountingCursor(cursor, self)
+        return cursor
+
+
+class CountingCursor:
+    def __init__(self, cursor, owner):
+        self.cursor = cursor
+        self.owner = owner
+
+    def sort(self, *args):
+        self.cursor = self.cursor.sort(*args)
+        return self
+
+    async def to_list(self, length):
+        documents = await self.cursor.to_list(length)
+        self.owner.full_documents += len(documents)
+        return documents
+
+
+def run(scenario):
+    async def with_collection():
+        collection = CountingCollection(AsyncMongoMockClient()["test"]["psychology_topics"])
+        applied = []
+        sync = TopicSync(collection, applied.append, interval=0.01, overlap=30)
+        await scenario(collection, sync, applied)
+
+    asyncio.run(with_collection())
+
+
+def test_topic_version_is_millisecond_precision():
+    assert topic_version({"updated_at": T0.replace(microsecond=123456)}) == T0.replace(microsecond=123000)
+    assert topic_version({}) is None
+
+
+def test_poll_applies_only_topics_this_worker_has_not_seen():
+    async def scenario(collection, sync, applied):
+        startup = [topic("a", T0), topic("b", T0 + timedelta(seconds=1))]
+        await collection.insert_many([dict(t) for t in startup])
+        sync.seen(startup)
+
+        await collection.insert_one(topic("c", T0 + timedelta(seconds=2)))
+        assert await sync.poll() == 1
+        assert [t["id"] for t in applied[0]] == ["c"]
+        assert await sync.poll() == 0
+
+    run(scenario)
+
+
+def test_write_visible_late_inside_the_overlap_is_still_applied():
+    async def scenario(collection, sync, applied):
+        local = topic("local", T0 + timedelta(seconds=10))
+        await collection.insert_one(dict(local))
+        sync.seen([local])
+
+        # Another worker's earlier write becomes visible after this worker's later one
+        await collection.insert_one(topic("remote", T0 + timedelta(seconds=5)))
+        assert await sync.poll() == 1
+        assert [t["id"] for t in applied[0]] == ["remote"]
+
+    run(scenario)
+
+
+def test_an_edited_topic_is_applied_again():
+    async def scenario(collection, sync, applied):
+        original = topic("a", T0)
+        await collection.insert_one(dict(original))
+        sync.seen([original])
+
+        await collection.update_one({"id": "a"}, {"$set": {"updated_at": T0 + timedelta(seconds=1)}})
+        assert await sync.poll() == 1
+        assert sync.watermark == T0 + timedelta(seconds=1)
+
+    run(scenario)
+
+
+def test_background_task_polls_until_stopped():
+    async def scenario(collection, sync, applied):
+        sync.start()
+        await collection.insert_one(topic("a", T0))
+        await asyncio.sleep(0.05)
+        await sync.stop()
+        assert not sync.running
+        assert [t["id"] for batch in applied for t in batch] == ["a"]
+        assert sync.stats()["applied"] == 1
+
+    run(scenario)
+
+
+def test_a_burst_of_writes_is_fetched_in_full_only_once():
+    async def scenario(collection, sync, applied):
+        # Seed topics share one updated_at, so they stay inside the overlap window
+        await collection.insert_many([topic(f"t{n}", T0) for n in range(200)])
+        assert await sync.poll() == 200
+        assert collection.full_documents == 200
+
+        for _ in range(3):
+            assert await sync.poll() == 0
+        assert collection.full_documents == 200
+
+        await collection.update_one({"id": "t7"}, {"$set": {"updated_at": T0 + timedelta(seconds=1)}})
+        assert await sync.poll() == 1
+        assert collection.full_documents == 201
+
+    run(scenario)